@@ -8,6 +8,15 @@ Models registered:
 - Stock
 - OHLCData
 - UpatoxAccessToken
+- DataGeneration
+- RefreshRun
+- RefreshShard
+- SchedulerLock
+- PatternSummary
+- SectorBreadth
+- TechnicalIndicator
+- TimeframeCandle
+- TimeframePattern
 - Various candlestick pattern models (e.g., Hammer, Doji, BullishEngulfing, etc.)
 """
 
@@ -18,13 +27,22 @@ from .models import (
     BearishKicker,
     BullishEngulfing,
     BullishKicker,
+    DataGeneration,
     Doji,
     Hammer,
     InvertedHammer,
     OHLCData,
+    PatternSummary,
     ProGapPositive,
+    RefreshRun,
+    RefreshShard,
+    SchedulerLock,
+    SectorBreadth,
     SpinningTopBottom,
     Stock,
+    TechnicalIndicator,
+    TimeframeCandle,
+    TimeframePattern,
     UpatoxAccessToken,
 )
 
@@ -58,6 +76,7 @@ class OHLCDataAdmin(admin.ModelAdmin):
         "close_price",
         "high_price",
         "low_price",
+        "volume",
     ]
     list_filter = ["data_date", "stock"]
     search_fields = ["stock__symbol"]
@@ -68,10 +87,166 @@ class UpatoxAccessTokenAdmin(admin.ModelAdmin):
     """
     Admin interface for UpatoxAccessToken model.
 
-    Displays the current stored access token used for Upstox API integration.
+    Displays the stored access tokens used for Upstox API integration, newest first.
     """
 
-    list_display = ["token"]
+    list_display = ["token", "issued_at", "expires_at"]
+    ordering = ["-issued_at"]
+
+
+@admin.register(DataGeneration)
+class DataGenerationAdmin(admin.ModelAdmin):
+    """
+    Admin interface for DataGeneration model.
+
+    Shows the currently published data generation used to version page caches.
+    """
+
+    list_display = ["generation", "published_at"]
+
+
+@admin.register(PatternSummary)
+class PatternSummaryAdmin(admin.ModelAdmin):
+    """
+    Admin interface for PatternSummary model.
+
+    Shows the daily pattern counts per sector behind the overview pages.
+    """
+
+    list_display = ["data_date", "pattern", "sector", "count"]
+    list_filter = ["pattern", "sector"]
+
+
+@admin.register(SectorBreadth)
+class SectorBreadthAdmin(admin.ModelAdmin):
+    """
+    Admin interface for SectorBreadth model.
+
+    Shows the daily breadth counts of each sector.
+    """
+
+    list_display = [
+        "data_date",
+        "sector",
+        "stocks",
+        "advances",
+        "declines",
+        "bullish",
+        "bearish",
+        "above_sma20",
+    ]
+    list_filter = ["sector"]
+
+
+@admin.register(TechnicalIndicator)
+class TechnicalIndicatorAdmin(admin.ModelAdmin):
+    """
+    Admin interface for TechnicalIndicator model.
+
+    Shows the main indicators of each candle.
+    """
+
+    list_display = [
+        "candle",
+        "sma20",
+        "sma50",
+        "sma200",
+        "rsi14",
+        "atr14",
+        "bb_upper",
+        "bb_lower",
+        "relative_volume",
+    ]
+
+
+@admin.register(TimeframeCandle)
+class TimeframeCandleAdmin(admin.ModelAdmin):
+    """
+    Admin interface for TimeframeCandle model.
+
+    Shows the weekly and monthly candles resampled from the daily data.
+    """
+
+    list_display = [
+        "period_start",
+        "timeframe",
+        "stock",
+        "open_price",
+        "high_price",
+        "low_price",
+        "close_price",
+        "volume",
+    ]
+    list_filter = ["timeframe", "period_start"]
+    search_fields = ["stock__symbol"]
+
+
+@admin.register(TimeframePattern)
+class TimeframePatternAdmin(admin.ModelAdmin):
+    """
+    Admin interface for TimeframePattern model.
+
+    Shows the patterns detected on weekly and monthly candles.
+    """
+
+    list_display = ["data_date", "timeframe", "pattern", "stock", "strength"]
+    list_filter = ["timeframe", "pattern"]
+
+
+@admin.register(RefreshRun)
+class RefreshRunAdmin(admin.ModelAdmin):
+    """
+    Admin interface for RefreshRun model.
+
+    Lists past data refreshes with their outcome and counters.
+    """
+
+    list_display = [
+        "id",
+        "start_date",
+        "end_date",
+        "status",
+        "stage",
+        "stocks_fetched",
+        "stocks_failed",
+        "patterns_found",
+        "started_at",
+        "finished_at",
+    ]
+    list_filter = ["status"]
+
+
+@admin.register(RefreshShard)
+class RefreshShardAdmin(admin.ModelAdmin):
+    """
+    Admin interface for RefreshShard model.
+
+    Shows which ingestion worker leases each range of stocks of a refresh run.
+    """
+
+    list_display = [
+        "run",
+        "first_stock_id",
+        "last_stock_id",
+        "status",
+        "owner",
+        "lease_expires_at",
+        "attempts",
+        "stocks_fetched",
+        "stocks_failed",
+    ]
+    list_filter = ["status"]
+
+
+@admin.register(SchedulerLock)
+class SchedulerLockAdmin(admin.ModelAdmin):
+    """
+    Admin interface for SchedulerLock model.
+
+    Shows which scheduler instance holds each job lock and until when.
+    """
+
+    list_display = ["name", "owner", "expires_at"]
 
 
 @admin.register(Hammer)
@@ -82,7 +257,7 @@ class HammerAdmin(admin.ModelAdmin):
     Used to review pattern detection records for Hammer pattern.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(InvertedHammer)
@@ -91,7 +266,7 @@ class InvertedHammerAdmin(admin.ModelAdmin):
     Admin interface for Inverted Hammer candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(Doji)
@@ -100,7 +275,7 @@ class DojiAdmin(admin.ModelAdmin):
     Admin interface for Doji candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(SpinningTopBottom)
@@ -109,7 +284,7 @@ class SpinningTopBottomAdmin(admin.ModelAdmin):
     Admin interface for Spinning Top Bottom candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(ProGapPositive)
@@ -118,7 +293,7 @@ class ProGapPositiveAdmin(admin.ModelAdmin):
     Admin interface for Pro Gap Positive candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(BullishEngulfing)
@@ -127,7 +302,7 @@ class BullishEngulfingAdmin(admin.ModelAdmin):
     Admin interface for Bullish Engulfing candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(BearishEngulfing)
@@ -136,7 +311,7 @@ class BearishEngulfingAdmin(admin.ModelAdmin):
     Admin interface for Bearish Engulfing candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(BullishKicker)
@@ -145,7 +320,7 @@ class BullishKickerAdmin(admin.ModelAdmin):
     Admin interface for Bullish Kicker candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
 
 
 @admin.register(BearishKicker)
@@ -154,4 +329,4 @@ class BearishKickerAdmin(admin.ModelAdmin):
     Admin interface for Bearish Kicker candlestick pattern model.
     """
 
-    list_display = ["data_date", "stock"]
+    list_display = ["data_date", "stock", "strength"]
@@ -0,0 +1,505 @@
+"""
+Module: api_views.py
+
+Read-only JSON API over pattern occurrences, stocks, OHLC ranges and sector
+breadth, the downsampled chart series of a stock and the pattern backtest, plus the
+multi-criteria screener query and shape-similarity search endpoints.
+
+All list endpoints use cursor pagination, support `?fields=` selection, are gzip
+compressed and answer conditional GETs with 304 using the data generation ETag, so
+dashboards can poll them cheaply.
+"""
+
+from datetime import date
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .backtest import get_backtest
+from .caching import generation_etag, generation_last_modified
+from .charts import CHART_MODES, DEFAULT_WIDTH, MAX_WIDTH, MIN_WIDTH, chart_series
+from .models import OHLCData, SectorBreadth, Stock, TimeframePattern
+from .patterns import MAX_TOP_K, PATTERNS, volume_confirmed
+from .screener import ScreenerQueryError, run_screener
+from .serializers import (
+    OHLCSerializer,
+    PatternOccurrenceSerializer,
+    SectorBreadthSerializer,
+    SimilarityQuerySerializer,
+    StockSerializer,
+)
+from .similarity import SimilarityQueryError, find_similar
+from .timeframes import TIMEFRAMES
+
+
+def parse_date_param(request, name):
+    """
+    Reads an optional 'YYYY-MM-DD' query parameter.
+
+    Args:
+        request (Request): The DRF request object.
+        name (str): Query parameter name.
+
+    Returns:
+        date: Parsed date, or None when the parameter is absent.
+
+    Raises:
+        ValidationError: If the parameter is present but not a valid date.
+    """
+    value = request.query_params.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        raise ValidationError({name: "Expected a date in YYYY-MM-DD format."}) from e
+
+
+class APICursorPagination(CursorPagination):
+    """
+    Cursor pagination shared by the API list endpoints.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 5000
+
+
+class PatternCursorPagination(APICursorPagination):
+    """
+    Pages pattern occurrences newest first on the (data_date, id) seek index.
+    """
+
+    ordering = ("-data_date", "id")
+
+
+class StockCursorPagination(APICursorPagination):
+    """
+    Pages stocks by primary key.
+    """
+
+    ordering = ("id",)
+
+
+class OHLCCursorPagination(APICursorPagination):
+    """
+    Pages a stock's candles in date order.
+    """
+
+    ordering = ("data_date",)
+
+
+@method_decorator(gzip_page, name="dispatch")
+@method_decorator(
+    condition(etag_func=generation_etag, last_modified_func=generation_last_modified),
+    name="dispatch",
+)
+class ReadOnlyAPIView(generics.ListAPIView):
+    """
+    Base class of the read-only list endpoints: JSON only, gzip and ETag aware.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+
+class PatternOccurrenceListAPIView(ReadOnlyAPIView):
+    """
+    Lists the occurrences of one pattern.
+
+    Query parameters: sector, symbol, date, from, to, volume, timeframe, fields,
+    page_size, cursor, top. `top=K` returns the K strongest matches (at most
+    MAX_TOP_K) read in order from the strength index, in a single page;
+    `volume=confirmed` keeps the volume-confirmed matches and `timeframe=week` or
+    `month` lists the matches on weekly or monthly candles, dated by period start.
+    """
+
+    serializer_class = PatternOccurrenceSerializer
+    pagination_class = PatternCursorPagination
+
+    def get_top_k(self):
+        """
+        Reads the optional `top` query parameter.
+
+        Returns:
+            int: Number of strongest matches requested, or None.
+
+        Raises:
+            ValidationError: If top is not a positive integer.
+        """
+        value = self.request.query_params.get("top", "").strip()
+        if not value:
+            return None
+        if not value.isdigit() or int(value) < 1:
+            raise ValidationError({"top": "Expected a positive integer."})
+        return min(int(value), MAX_TOP_K)
+
+    def paginate_queryset(self, queryset):
+        top_k = self.get_top_k()
+        if top_k is None:
+            return super().paginate_queryset(queryset)
+        return list(queryset.order_by("-strength", "id")[:top_k])
+
+    def get_paginated_response(self, data):
+        if self.get_top_k() is None:
+            return super().get_paginated_response(data)
+        return Response({"next": None, "previous": None, "results": data})
+
+    def get_queryset(self):
+        pattern = self.kwargs["pattern"]
+        if pattern not in PATTERNS:
+            raise Http404("Unknown candlestick pattern")
+
+        params = self.request.query_params
+        timeframe = params.get("timeframe", "day")
+        if timeframe not in TIMEFRAMES:
+            raise ValidationError(
+                {"timeframe": f"Expected one of {', '.join(TIMEFRAMES)}."}
+            )
+        if timeframe == "day":
+            queryset = PATTERNS[pattern]["model"].objects.all()
+        else:
+            queryset = TimeframePattern.objects.filter(
+                pattern=pattern, timeframe=timeframe
+            )
+        queryset = queryset.values(
+            "id", "data_date", "strength", "stock_id", "stock__symbol", "stock__sector"
+        )
+        if params.get("sector"):
+            queryset = queryset.filter(stock__sector=params["sector"])
+        if params.get("symbol"):
+            queryset = queryset.filter(stock__symbol=params["symbol"])
+
+        data_date = parse_date_param(self.request, "date")
+        from_date = parse_date_param(self.request, "from")
+        to_date = parse_date_param(self.request, "to")
+        if data_date:
+            queryset = queryset.filter(data_date=data_date)
+        if from_date:
+            queryset = queryset.filter(data_date__gte=from_date)
+        if to_date:
+            queryset = queryset.filter(data_date__lte=to_date)
+        if params.get("volume") == "confirmed" and timeframe == "day":
+            queryset = volume_confirmed(queryset)
+        return queryset
+
+
+class StockListAPIView(ReadOnlyAPIView):
+    """
+    Lists stocks, optionally filtered by sector.
+    """
+
+    serializer_class = StockSerializer
+    pagination_class = StockCursorPagination
+
+    def get_queryset(self):
+        queryset = Stock.objects.values(
+            "id", "symbol", "company_name", "sector", "isin_code"
+        )
+        if self.request.query_params.get("sector"):
+            queryset = queryset.filter(sector=self.request.query_params["sector"])
+        return queryset
+
+
+class OHLCListAPIView(ReadOnlyAPIView):
+    """
+    Lists the daily candles of one stock within an optional from/to date range.
+    """
+
+    serializer_class = OHLCSerializer
+    pagination_class = OHLCCursorPagination
+
+    def get_queryset(self):
+        queryset = OHLCData.objects.filter(stock_id=self.kwargs["stock_id"]).values(
+            "data_date",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price",
+            "volume",
+            "open_interest",
+        )
+        from_date = parse_date_param(self.request, "from")
+        to_date = parse_date_param(self.request, "to")
+        if from_date:
+            queryset = queryset.filter(data_date__gte=from_date)
+        if to_date:
+            queryset = queryset.filter(data_date__lte=to_date)
+        return queryset
+
+
+class BreadthCursorPagination(APICursorPagination):
+    """
+    Pages sector breadth in date order.
+    """
+
+    ordering = ("data_date", "id")
+
+
+class SectorBreadthListAPIView(ReadOnlyAPIView):
+    """
+    Lists daily sector breadth within an optional from/to date range.
+
+    Query parameters: sector, from, to, fields, page_size, cursor.
+    """
+
+    serializer_class = SectorBreadthSerializer
+    pagination_class = BreadthCursorPagination
+
+    def get_queryset(self):
+        queryset = SectorBreadth.objects.values(
+            "id",
+            "data_date",
+            "sector",
+            "stocks",
+            "advances",
+            "declines",
+            "bullish",
+            "bearish",
+            "above_sma20",
+        )
+        if self.request.query_params.get("sector"):
+            queryset = queryset.filter(sector=self.request.query_params["sector"])
+        from_date = parse_date_param(self.request, "from")
+        to_date = parse_date_param(self.request, "to")
+        if from_date:
+            queryset = queryset.filter(data_date__gte=from_date)
+        if to_date:
+            queryset = queryset.filter(data_date__lte=to_date)
+        return queryset
+
+
+@method_decorator(gzip_page, name="dispatch")
+@method_decorator(
+    condition(etag_func=generation_etag, last_modified_func=generation_last_modified),
+    name="dispatch",
+)
+class StockChartAPIView(APIView):
+    """
+    Returns a stock's candles downsampled to the chart width, with pattern markers.
+
+    Query parameters: width (pixels, default 800), mode ("ohlc" or "line"), from, to.
+    See candlestick.charts for the downsampling.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request, stock_id):
+        """
+        Builds the chart series of the stock.
+
+        Args:
+            request (Request): The DRF request object.
+            stock_id (int): Stock to chart.
+
+        Returns:
+            Response: Stock, downsampled points and pattern markers.
+        """
+        stock = get_object_or_404(
+            Stock.objects.values("id", "symbol", "company_name", "sector", "isin_code"),
+            id=stock_id,
+        )
+        mode = request.query_params.get("mode", "ohlc")
+        if mode not in CHART_MODES:
+            raise ValidationError(
+                {"mode": f"Expected one of {', '.join(CHART_MODES)}."}
+            )
+        try:
+            width = int(request.query_params.get("width", DEFAULT_WIDTH))
+        except ValueError as e:
+            raise ValidationError({"width": "Expected a number of pixels."}) from e
+        width = min(max(width, MIN_WIDTH), MAX_WIDTH)
+
+        series = chart_series(
+            stock_id,
+            width=width,
+            mode=mode,
+            from_date=parse_date_param(request, "from"),
+            to_date=parse_date_param(request, "to"),
+        )
+        series["stock"] = StockSerializer(stock).data
+        return Response(series, status=status.HTTP_200_OK)
+
+
+@method_decorator(gzip_page, name="dispatch")
+@method_decorator(
+    condition(etag_func=generation_etag, last_modified_func=generation_last_modified),
+    name="dispatch",
+)
+class BacktestAPIView(APIView):
+    """
+    Returns the forward-return backtest of the detected patterns.
+
+    Query parameters: pattern (repeatable) and sector narrow the returned results;
+    the backtest itself is computed once per data generation, see
+    candlestick.backtest.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request):
+        """
+        Returns the cached backtest, filtered by pattern and sector.
+
+        Args:
+            request (Request): The DRF request object.
+
+        Returns:
+            Response: Horizons and per-pattern results.
+        """
+        slugs = request.query_params.getlist("pattern") or list(PATTERNS)
+        if any(slug not in PATTERNS for slug in slugs):
+            raise Http404("Unknown candlestick pattern")
+        sector = request.query_params.get("sector", "").strip()
+
+        backtest = get_backtest()
+        patterns = {}
+        for slug in slugs:
+            result = backtest["patterns"][slug]
+            if sector:
+                result = {
+                    **result,
+                    "sectors": {
+                        name: value
+                        for name, value in result["sectors"].items()
+                        if name == sector
+                    },
+                }
+            patterns[slug] = result
+        return Response(
+            {
+                "generation": backtest["generation"],
+                "horizons": backtest["horizons"],
+                "patterns": patterns,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ScreenerAPIView(APIView):
+    """
+    Runs a multi-criteria screener query.
+
+    POST body: {"query": {...}, "date": "YYYY-MM-DD"}; see candlestick.screener for
+    the query format. "date" is optional and defaults to the latest session; a
+    weekend or holiday refers to the session before it.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+    def post(self, request):
+        """
+        Evaluates the posted query and returns the matching stocks.
+
+        Args:
+            request (Request): The DRF request with the JSON query body.
+
+        Returns:
+            Response: Anchor date, match count and matching stocks, or a 400 error.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"Status": "Failure", "Message": "Expected a JSON object body."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        query = request.data.get("query")
+        if not query:
+            return Response(
+                {"Status": "Failure", "Message": "query not provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            result = run_screener(query, anchor=request.data.get("date"))
+        except ScreenerQueryError as e:
+            return Response(
+                {"Status": "Failure", "Message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class SimilarityAPIView(APIView):
+    """
+    Finds the stocks whose most recent candles look most like a stock's or a sketch.
+
+    GET ?symbol=RELIANCE&k=10 compares with a stock's last candles; POST
+    {"shape": [...closes], "k": 10} compares with a sketched line of closes.
+    See candlestick.similarity for the normalisation.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+    @staticmethod
+    def search(data, field):
+        """
+        Validates the query, runs it and wraps the outcome in a Response.
+
+        Args:
+            data (dict): Request data with k and the queried field.
+            field (str): "symbol" or "shape", the find_similar() argument queried.
+
+        Returns:
+            Response: Window dates and the nearest stocks, or a 400 error.
+        """
+        serializer = SimilarityQuerySerializer(data=data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "Status": "Failure",
+                    "Message": " ".join(
+                        f"{field}: {' '.join(str(error) for error in errors)}"
+                        for field, errors in serializer.errors.items()
+                    ),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        values = serializer.validated_data
+        try:
+            result = find_similar(
+                neighbours=values["k"], **{field: values.get(field) or None}
+            )
+        except SimilarityQueryError as e:
+            return Response(
+                {"Status": "Failure", "Message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result, status=status.HTTP_200_OK)
+
+    def get(self, request):
+        """
+        Finds the stocks most similar to the stock named by the symbol parameter.
+
+        Args:
+            request (Request): The DRF request with symbol and optional k parameters.
+
+        Returns:
+            Response: Window dates and the nearest stocks, or a 400 error.
+        """
+        return self.search(
+            {
+                name: request.query_params[name].strip()
+                for name in ("symbol", "k")
+                if name in request.query_params
+            },
+            "symbol",
+        )
+
+    def post(self, request):
+        """
+        Finds the stocks most similar to a posted shape of closes.
+
+        Args:
+            request (Request): The DRF request with the JSON {"shape", "k"} body.
+
+        Returns:
+            Response: Window dates and the nearest stocks, or a 400 error.
+        """
+        return self.search(request.data, "shape")
@@ -0,0 +1,197 @@
+"""
+Forward-return backtest of the detected patterns.
+
+Every stored occurrence of every pattern is entered at the close of its detection
+day and held for each of HORIZONS sessions. All closes are loaded once into flat
+arrays ordered by (stock, date), occurrences are located in them with one
+searchsorted per pattern, and the exit close of a horizon h is simply the row h
+positions later when it still belongs to the same stock. No query is made per
+occurrence.
+
+A trade is a hit when it moved in the pattern's direction: up for bullish and
+neutral patterns, down for bearish ones. Results are aggregated per pattern and per
+(pattern, sector) and cached per data generation, so only the first request after
+a refresh runs the backtest.
+"""
+
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from .caching import get_data_generation
+from .models import OHLCData, Stock
+from .patterns import PATTERNS
+
+HORIZONS = (1, 5, 10, 20)
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def load_candles(*columns):
+    """
+    Loads price columns of every candle into flat arrays ordered by stock and date.
+
+    The rows are read straight from the database cursor, skipping the ORM's
+    per-row converters (a Decimal per price), which roughly halves the load time
+    of a long history.
+
+    Args:
+        *columns (str): OHLCData price fields to load, e.g. "close_price".
+
+    Returns:
+        tuple: (int64 keys, int64 stock ids, list of float64 arrays, one per column).
+        A key combines the stock id and the date so that (stock, date) pairs can be
+        searched in order.
+    """
+    queryset = OHLCData.objects.order_by("stock_id", "data_date").values_list(
+        "stock_id", "data_date", *columns
+    )
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, [np.zeros(0) for _ in columns]
+    stock_ids, dates, *prices = zip(*rows)
+    stock_ids = np.array(stock_ids, dtype=np.int64)
+    return (
+        date_keys(stock_ids, dates),
+        stock_ids,
+        [np.array(column, dtype=np.float64) for column in prices],
+    )
+
+
+def forward_returns(stock_ids, closes, positions, horizon):
+    """
+    Computes the return from the close at each position to the close `horizon` rows later.
+
+    Args:
+        stock_ids (ndarray): Stock id of every candle, ordered by stock and date.
+        closes (ndarray): Close of every candle in the same order.
+        positions (ndarray): Entry rows.
+        horizon (int): Holding period in sessions.
+
+    Returns:
+        ndarray: Returns, NaN where the stock has no candle `horizon` sessions later.
+    """
+    exits = positions + horizon
+    in_range = exits < len(closes)
+    exits = np.where(in_range, exits, 0)
+    # the exit must still be a candle of the same stock
+    has_exit = in_range & (stock_ids[exits] == stock_ids[positions])
+    return np.where(has_exit, closes[exits] / closes[positions] - 1, np.nan)
+
+
+def date_keys(stock_ids, dates):
+    """
+    Combines stock ids and dates into sortable int64 keys.
+    """
+    days = np.fromiter(map(date.toordinal, dates), dtype=np.int64, count=len(dates))
+    return np.asarray(stock_ids, dtype=np.int64) * 1_000_000 + days
+
+
+def summarize(returns, hits, groups=None, group_count=1):
+    """
+    Aggregates the trades of one horizon, optionally per group.
+
+    Args:
+        returns (ndarray): Forward return of each trade, NaN when it has no exit.
+        hits (ndarray): Whether each trade moved in the pattern's direction.
+        groups (ndarray, optional): Group number of each trade.
+        group_count (int): Number of groups.
+
+    Returns:
+        list: {"trades", "mean_return", "hit_rate"} per group, returns in percent.
+    """
+    valid = ~np.isnan(returns)
+    if groups is None:
+        groups = np.zeros(len(returns), dtype=np.int64)
+    trades = np.bincount(groups[valid], minlength=group_count)
+    totals = np.bincount(groups[valid], weights=returns[valid], minlength=group_count)
+    hit_counts = np.bincount(
+        groups[valid], weights=hits[valid].astype(np.float64), minlength=group_count
+    )
+    return [
+        {
+            "trades": int(trades[i]),
+            "mean_return": (
+                round(float(100 * totals[i] / trades[i]), 3) if trades[i] else None
+            ),
+            "hit_rate": (
+                round(float(100 * hit_counts[i] / trades[i]), 1) if trades[i] else None
+            ),
+        }
+        for i in range(group_count)
+    ]
+
+
+def run_backtest():
+    """
+    Backtests every pattern over the whole stored history.
+
+    Returns:
+        dict: "horizons" and "patterns", each pattern with its occurrence count, a
+        summary per horizon and the same summaries per sector.
+    """
+    keys, stock_ids, (closes,) = load_candles("close_price")
+    sectors = dict(Stock.objects.values_list("id", "sector"))
+    sector_names = sorted(set(sectors.values()))
+    sector_numbers = {name: i for i, name in enumerate(sector_names)}
+
+    patterns = {}
+    for slug, pattern in PATTERNS.items():
+        occurrences = list(
+            pattern["model"].objects.values_list("stock_id", "data_date")
+        )
+        if occurrences and len(keys):
+            occurrence_stocks, occurrence_dates = zip(*occurrences)
+            wanted = date_keys(occurrence_stocks, occurrence_dates)
+            positions = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+            positions = positions[keys[positions] == wanted]
+        else:
+            positions = np.zeros(0, dtype=np.int64)
+
+        groups = np.array(
+            [sector_numbers[sectors[int(i)]] for i in stock_ids[positions]],
+            dtype=np.int64,
+        )
+        sector_occurrences = np.bincount(groups, minlength=len(sector_names))
+        direction = -1 if pattern["bias"] == "bearish" else 1
+        horizons = {}
+        by_sector = {}
+        for horizon in HORIZONS:
+            returns = forward_returns(stock_ids, closes, positions, horizon)
+            hits = direction * np.nan_to_num(returns) > 0
+            horizons[horizon] = summarize(returns, hits)[0]
+            by_sector[horizon] = summarize(returns, hits, groups, len(sector_names))
+
+        patterns[slug] = {
+            "name": pattern["name"],
+            "bias": pattern["bias"],
+            "occurrences": int(len(positions)),
+            "horizons": horizons,
+            "sectors": {
+                name: {horizon: by_sector[horizon][i] for horizon in HORIZONS}
+                for i, name in enumerate(sector_names)
+                if sector_occurrences[i]
+            },
+        }
+    return {"horizons": list(HORIZONS), "patterns": patterns}
+
+
+def get_backtest():
+    """
+    Returns the backtest of the current data generation, running it on a cache miss.
+
+    Returns:
+        dict: Result of run_backtest plus the generation it was computed for.
+    """
+    generation = get_data_generation()[0]
+    key = f"backtest:{generation}"
+    result = cache.get(key)
+    if result is None:
+        result = {"generation": generation, **run_backtest()}
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,286 @@
+"""
+Bitset index of pattern occurrences across the whole stored history.
+
+Each (pattern, stock) pair is one Python int whose bit i is set when the stock printed
+the pattern on trading session i (sessions are numbered oldest first). Frequency
+("a Doji on at least 3 of the last 10 sessions") and streak screens then reduce to a
+shift, a mask and int.bit_count() per stock.
+
+The index is built once from the pattern tables, updated incrementally for the dates
+each refresh replaces, and saved to disk as gzipped JSON so worker processes can load
+it without rebuilding.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import date
+
+from django.conf import settings
+
+from .caching import get_data_generation
+from .models import OHLCData
+from .patterns import PATTERNS
+
+
+class PatternBitsetIndex:
+    """
+    Per-(pattern, stock) occurrence bitsets over trading sessions.
+
+    Attributes:
+        generation (int): Data generation the index reflects.
+        sessions (list): Trading dates, oldest first; list position is the bit number.
+        rows (dict): Pattern slug -> {stock id: int bitset}.
+    """
+
+    def __init__(self, generation=0, sessions=None, rows=None):
+        self.generation = generation
+        self.sessions = sessions or []
+        self.positions = {day: i for i, day in enumerate(self.sessions)}
+        self.rows = rows or {slug: {} for slug in PATTERNS}
+
+    @classmethod
+    def build(cls, generation):
+        """
+        Builds the index from every stored session and pattern occurrence.
+
+        Args:
+            generation (int): Data generation being indexed.
+
+        Returns:
+            PatternBitsetIndex: The built index.
+        """
+        sessions = list(
+            OHLCData.objects.order_by("data_date")
+            .values_list("data_date", flat=True)
+            .distinct()
+        )
+        index = cls(generation=generation, sessions=sessions)
+        for slug, pattern in PATTERNS.items():
+            index.set_bits(
+                slug, pattern["model"].objects.values_list("data_date", "stock_id")
+            )
+        return index
+
+    def set_bits(self, slug, occurrences):
+        """
+        Sets the bits of (data_date, stock_id) occurrences of one pattern.
+        """
+        row = self.rows.setdefault(slug, {})
+        for data_date, stock_id in occurrences:
+            position = self.positions.get(data_date)
+            if position is not None:
+                row[stock_id] = row.get(stock_id, 0) | (1 << position)
+
+    def update(self, start_date, end_date, generation):
+        """
+        Replaces the bits of the sessions between start_date and end_date.
+
+        New sessions after the last indexed one are appended. A session falling
+        before the end of the index (a backfill) would shift every later bit, so
+        that case rebuilds the index instead.
+
+        Args:
+            start_date (str): First refreshed date ('YYYY-MM-DD').
+            end_date (str): Last refreshed date ('YYYY-MM-DD').
+            generation (int): Data generation after the refresh.
+
+        Returns:
+            PatternBitsetIndex: This index, or a rebuilt one after a backfill.
+        """
+        refreshed = list(
+            OHLCData.objects.filter(data_date__gte=start_date, data_date__lte=end_date)
+            .order_by("data_date")
+            .values_list("data_date", flat=True)
+            .distinct()
+        )
+        new_sessions = [day for day in refreshed if day not in self.positions]
+        if new_sessions and self.sessions and new_sessions[0] < self.sessions[-1]:
+            return PatternBitsetIndex.build(generation)
+
+        for day in new_sessions:
+            self.positions[day] = len(self.sessions)
+            self.sessions.append(day)
+
+        # clear the refreshed sessions, then set them again from the pattern tables
+        clear_mask = 0
+        for day in refreshed:
+            clear_mask |= 1 << self.positions[day]
+        for slug, pattern in PATTERNS.items():
+            row = self.rows.setdefault(slug, {})
+            for stock_id in list(row):
+                row[stock_id] &= ~clear_mask
+                if not row[stock_id]:
+                    del row[stock_id]
+            self.set_bits(
+                slug,
+                pattern["model"]
+                .objects.filter(data_date__gte=start_date, data_date__lte=end_date)
+                .values_list("data_date", "stock_id"),
+            )
+
+        self.generation = generation
+        return self
+
+    def window(self, anchor, last):
+        """
+        Returns (shift, mask) selecting the `last` sessions ending at the anchor.
+
+        Args:
+            anchor (date): Last session of the window.
+            last (int): Window length in sessions.
+
+        Returns:
+            tuple: (int shift, int mask), or None if the anchor is not a session.
+        """
+        position = self.positions.get(anchor)
+        if position is None:
+            return None
+        shift = max(0, position - last + 1)
+        return shift, (1 << (position - shift + 1)) - 1
+
+    def count(self, slug, stock_id, anchor, last):
+        """
+        Counts the sessions among the last `last` ones on which the stock printed the pattern.
+        """
+        window = self.window(anchor, last)
+        if window is None:
+            return 0
+        shift, mask = window
+        return ((self.rows.get(slug, {}).get(stock_id, 0) >> shift) & mask).bit_count()
+
+    def streak(self, slug, stock_id, anchor):
+        """
+        Counts the consecutive sessions ending at the anchor on which the stock printed the pattern.
+        """
+        position = self.positions.get(anchor)
+        if position is None:
+            return 0
+        mask = (1 << (position + 1)) - 1
+        missing = ~self.rows.get(slug, {}).get(stock_id, 0) & mask
+        return position + 1 - missing.bit_length()
+
+    def frequency_screen(self, slug, anchor, last, min_count):
+        """
+        Returns the stock ids that printed the pattern on at least min_count of the last sessions.
+        """
+        window = self.window(anchor, last)
+        if window is None:
+            return frozenset()
+        shift, mask = window
+        return frozenset(
+            stock_id
+            for stock_id, bits in self.rows.get(slug, {}).items()
+            if ((bits >> shift) & mask).bit_count() >= min_count
+        )
+
+    def streak_screen(self, slug, anchor, min_streak):
+        """
+        Returns the stock ids whose streak of the pattern ending at the anchor is at least min_streak.
+        """
+        position = self.positions.get(anchor)
+        if position is None or min_streak > position + 1:
+            return frozenset()
+        # the min_streak sessions ending at the anchor must all be set
+        mask = ((1 << min_streak) - 1) << (position - min_streak + 1)
+        return frozenset(
+            stock_id
+            for stock_id, bits in self.rows.get(slug, {}).items()
+            if bits & mask == mask
+        )
+
+    def save(self, path):
+        """
+        Writes the index to disk as gzipped JSON, atomically replacing the old file
+        and creating its directory when missing.
+        """
+        payload = {
+            "generation": self.generation,
+            "sessions": [day.isoformat() for day in self.sessions],
+            "rows": {
+                slug: {
+                    str(stock_id): format(bits, "x") for stock_id, bits in row.items()
+                }
+                for slug, row in self.rows.items()
+            },
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            json.dump(payload, file, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save(), or returns None if there is no readable file.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return cls(
+            generation=payload["generation"],
+            sessions=[date.fromisoformat(day) for day in payload["sessions"]],
+            rows={
+                slug: {int(stock_id): int(bits, 16) for stock_id, bits in row.items()}
+                for slug, row in payload["rows"].items()
+            },
+        )
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def get_bitset_index():
+    """
+    Returns the bitset index of the current data generation.
+
+    The in-process copy is reused while it is current; otherwise the file on disk is
+    loaded, and only if that is stale too is the index rebuilt and saved.
+
+    Returns:
+        PatternBitsetIndex: Index for the current generation.
+    """
+    global _index  # pylint: disable=W0603
+    generation = get_data_generation()[0]
+    with _index_lock:
+        if _index is not None and _index.generation == generation:
+            return _index
+        index = PatternBitsetIndex.load(settings.PATTERN_BITSET_INDEX_PATH)
+        if index is None or index.generation != generation:
+            index = PatternBitsetIndex.build(generation)
+            index.save(settings.PATTERN_BITSET_INDEX_PATH)
+        _index = index
+        return _index
+
+
+def update_bitset_index(start_date, end_date):
+    """
+    Brings the saved bitset index up to date after a refresh of start_date..end_date.
+
+    Called by the refresh pipeline after it publishes a new data generation.
+
+    Args:
+        start_date (str): First refreshed date ('YYYY-MM-DD').
+        end_date (str): Last refreshed date ('YYYY-MM-DD').
+    """
+    global _index  # pylint: disable=W0603
+    logger = logging.getLogger("stock_screener_logger")
+    generation = get_data_generation()[0]
+    with _index_lock:
+        index = PatternBitsetIndex.load(settings.PATTERN_BITSET_INDEX_PATH)
+        if index is None or index.generation != generation - 1:
+            # missing, or it skipped a publish: an incremental update would be wrong
+            index = PatternBitsetIndex.build(generation)
+        else:
+            index = index.update(start_date, end_date, generation)
+        index.save(settings.PATTERN_BITSET_INDEX_PATH)
+        _index = index
+    logger.info(  # pylint: disable=W1203
+        f"Pattern bitset index updated to generation {generation}"
+    )
@@ -0,0 +1,134 @@
+"""
+Sector breadth analytics.
+
+For every trading day and sector the refresh pipeline stores how many stocks
+advanced or declined, printed a bullish or bearish pattern and closed above their
+20-session average close. Only the refreshed dates are computed: their candles are
+read together with the 19 sessions before them, which is all the history the
+previous close and the 20-session average need.
+"""
+
+from collections import defaultdict, deque
+from datetime import date
+
+from django.db import transaction
+
+from .models import OHLCData, SectorBreadth, Stock
+from .patterns import PATTERNS
+
+SMA_SESSIONS = 20
+BREADTH_COUNTS = (
+    "stocks",
+    "advances",
+    "declines",
+    "bullish",
+    "bearish",
+    "above_sma20",
+)
+
+
+def pattern_stocks(bias, start_date=None, end_date=None):
+    """
+    Collects the stocks that printed a pattern of the given bias on each date.
+
+    Args:
+        bias (str): "bullish" or "bearish", see PATTERNS.
+        start_date (str, optional): First date ('YYYY-MM-DD').
+        end_date (str, optional): Last date ('YYYY-MM-DD').
+
+    Returns:
+        dict: date -> set of stock ids.
+    """
+    date_filter = {}
+    if start_date:
+        date_filter["data_date__gte"] = start_date
+    if end_date:
+        date_filter["data_date__lte"] = end_date
+
+    stocks = defaultdict(set)
+    for pattern in PATTERNS.values():
+        if pattern["bias"] != bias:
+            continue
+        for data_date, stock_id in (
+            pattern["model"]
+            .objects.filter(**date_filter)
+            .values_list("data_date", "stock_id")
+        ):
+            stocks[data_date].add(stock_id)
+    return stocks
+
+
+def update_sector_breadth(start_date=None, end_date=None):
+    """
+    Recomputes the sector breadth of the dates between start_date and end_date.
+
+    Without dates every stored session is recomputed.
+
+    Args:
+        start_date (str, optional): First date to recompute ('YYYY-MM-DD').
+        end_date (str, optional): Last date to recompute ('YYYY-MM-DD').
+
+    Returns:
+        int: Number of breadth rows written.
+    """
+    date_filter = {}
+    if start_date:
+        date_filter["data_date__gte"] = start_date
+    if end_date:
+        date_filter["data_date__lte"] = end_date
+
+    # the previous close and the 20-session average need the sessions before the range
+    history_start = start_date
+    if start_date:
+        earlier = list(
+            OHLCData.objects.filter(data_date__lt=start_date)
+            .order_by("-data_date")
+            .values_list("data_date", flat=True)
+            .distinct()[: SMA_SESSIONS - 1]
+        )
+        if earlier:
+            history_start = earlier[-1]
+
+    candles = OHLCData.objects.order_by("stock_id", "data_date")
+    if history_start:
+        candles = candles.filter(data_date__gte=history_start)
+    if end_date:
+        candles = candles.filter(data_date__lte=end_date)
+
+    sectors = dict(Stock.objects.values_list("id", "sector"))
+    bullish = pattern_stocks("bullish", start_date, end_date)
+    bearish = pattern_stocks("bearish", start_date, end_date)
+    first_date = date.fromisoformat(str(start_date)) if start_date else None
+
+    breadth = defaultdict(lambda: dict.fromkeys(BREADTH_COUNTS, 0))
+    previous_stock_id = None
+    closes = deque(maxlen=SMA_SESSIONS)
+    for stock_id, data_date, close_price in candles.values_list(
+        "stock_id", "data_date", "close_price"
+    ).iterator(chunk_size=5000):
+        if stock_id != previous_stock_id:
+            previous_stock_id = stock_id
+            closes.clear()
+        previous_close = closes[-1] if closes else None
+        closes.append(close_price)
+        if first_date and data_date < first_date:
+            continue
+
+        counts = breadth[(data_date, sectors.get(stock_id, ""))]
+        counts["stocks"] += 1
+        if previous_close is not None:
+            counts["advances"] += close_price > previous_close
+            counts["declines"] += close_price < previous_close
+        counts["bullish"] += stock_id in bullish.get(data_date, ())
+        counts["bearish"] += stock_id in bearish.get(data_date, ())
+        if len(closes) == SMA_SESSIONS:
+            counts["above_sma20"] += close_price * SMA_SESSIONS > sum(closes)
+
+    rows = [
+        SectorBreadth(data_date=data_date, sector=sector, **counts)
+        for (data_date, sector), counts in breadth.items()
+    ]
+    with transaction.atomic():
+        SectorBreadth.objects.filter(**date_filter).delete()
+        SectorBreadth.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
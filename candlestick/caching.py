@@ -0,0 +1,183 @@
+"""
+Response caching for the pattern pages, versioned by data generation.
+
+Pattern data only changes when a refresh publishes, so every cache key and ETag
+embeds the current DataGeneration number. Publishing bumps the number, which makes
+all older entries unreachable at once; they simply age out of the cache backend.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from .models import DataGeneration
+
+GENERATION_ROW_ID = 1
+
+
+def get_data_generation(request=None):
+    """
+    Returns the current data generation and its publish time.
+
+    The value is read once per request and memoized on the request object, so the
+    ETag, Last-Modified and cache key lookups share a single primary key query.
+
+    Args:
+        request (HttpRequest, optional): Request to memoize the value on.
+
+    Returns:
+        tuple: (int generation, datetime published_at or None).
+    """
+    if request is not None and hasattr(request, "data_generation"):
+        return request.data_generation
+
+    row = (
+        DataGeneration.objects.filter(pk=GENERATION_ROW_ID)
+        .values_list("generation", "published_at")
+        .first()
+    )
+    data_generation = row or (0, None)
+    if request is not None:
+        request.data_generation = data_generation
+    return data_generation
+
+
+async def aget_data_generation(request=None):
+    """
+    Async version of get_data_generation, reading the row with the async ORM.
+    """
+    if request is not None and hasattr(request, "data_generation"):
+        return request.data_generation
+
+    row = await (
+        DataGeneration.objects.filter(pk=GENERATION_ROW_ID)
+        .values_list("generation", "published_at")
+        .afirst()
+    )
+    data_generation = row or (0, None)
+    if request is not None:
+        request.data_generation = data_generation
+    return data_generation
+
+
+def with_data_generation(view_func):
+    """
+    Decorator for async views loading the data generation onto the request first.
+
+    condition() calls its ETag and Last-Modified functions synchronously, even for
+    async views, so they must not query the database there. Placed above
+    condition(), this decorator loads the generation with the async ORM and the
+    functions then read the memoized value.
+
+    Args:
+        view_func (function): Async view function.
+
+    Returns:
+        function: Wrapped async view.
+    """
+
+    @wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        await aget_data_generation(request)
+        return await view_func(request, *args, **kwargs)
+
+    return wrapped
+
+
+def bump_data_generation():
+    """
+    Publishes a new data generation, invalidating every versioned cache entry.
+
+    Returns:
+        int: The new generation number.
+    """
+    now = timezone.now()
+    updated = DataGeneration.objects.filter(pk=GENERATION_ROW_ID).update(
+        generation=F("generation") + 1, published_at=now
+    )
+    if not updated:
+        DataGeneration.objects.get_or_create(
+            pk=GENERATION_ROW_ID, defaults={"generation": 1, "published_at": now}
+        )
+    return get_data_generation()[0]
+
+
+def generation_etag(request, *args, **kwargs):
+    """
+    ETag function for django.views.decorators.http.condition.
+    """
+    return f"gen-{get_data_generation(request)[0]}"
+
+
+def generation_last_modified(request, *args, **kwargs):
+    """
+    Last-Modified function for django.views.decorators.http.condition.
+    """
+    return get_data_generation(request)[1]
+
+
+def cache_per_generation(prefix):
+    """
+    Decorator caching successful GET responses of a view per data generation.
+
+    The key combines the prefix, the generation and the full request path, so
+    different filters and pages are cached separately and a new generation never
+    serves an older page. Responses are marked no-cache so browsers revalidate
+    with the ETag instead of reusing a copy blindly. Works on sync and async
+    views; async views must load the generation first with with_data_generation.
+
+    Args:
+        prefix (str): Namespace for the view's cache keys.
+
+    Returns:
+        function: View decorator.
+    """
+
+    def cache_key(request):
+        generation = get_data_generation(request)[0]
+        path_hash = hashlib.md5(
+            request.get_full_path().encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        return f"{prefix}:{generation}:{path_hash}"
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapped(request, *args, **kwargs):
+                if request.method != "GET":
+                    return await view_func(request, *args, **kwargs)
+
+                key = cache_key(request)
+                response = await cache.aget(key)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if response.status_code == 200:
+                        await cache.aset(key, response)
+                patch_cache_control(response, no_cache=True)
+                return response
+
+            return async_wrapped
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method != "GET":
+                return view_func(request, *args, **kwargs)
+
+            key = cache_key(request)
+            response = cache.get(key)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response)
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapped
+
+    return decorator
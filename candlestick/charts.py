@@ -0,0 +1,195 @@
+"""
+Chart series for the stock detail page.
+
+A stock's candles are downsampled on the server to roughly one point per pixel of the
+chart: candlestick charts merge consecutive sessions into OHLC buckets (first open,
+highest high, lowest low, last close), line charts keep the closes picked by
+Largest-Triangle-Three-Buckets (LTTB), which preserves the visual shape of the line.
+Pattern occurrences are grouped into one marker per downsampled point covering
+them, so a 10-year chart is a few hundred points and markers instead of thousands
+of rows.
+"""
+
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+from .models import OHLCData
+from .patterns import PATTERNS
+
+CHART_MODES = ("ohlc", "line")
+DEFAULT_WIDTH = 800
+MIN_WIDTH = 50
+MAX_WIDTH = 4000
+
+
+def bucket_ohlc(candles, buckets):
+    """
+    Merges consecutive candles into at most `buckets` OHLC candles.
+
+    Args:
+        candles (list): (date, open, high, low, close) tuples in date order.
+        buckets (int): Maximum number of candles to return.
+
+    Returns:
+        list: (first date, first open, max high, min low, last close) tuples.
+    """
+    if len(candles) <= buckets:
+        return list(candles)
+
+    merged = []
+    size = len(candles) / buckets
+    for bucket in range(buckets):
+        chunk = candles[int(bucket * size) : int((bucket + 1) * size)]
+        if not chunk:
+            continue
+        merged.append(
+            (
+                chunk[0][0],
+                chunk[0][1],
+                max(candle[2] for candle in chunk),
+                min(candle[3] for candle in chunk),
+                chunk[-1][4],
+            )
+        )
+    return merged
+
+
+def lttb(points, threshold):
+    """
+    Picks `threshold` points of a line with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket. Sessions are evenly spaced on the chart, so the
+    x coordinate is the point's position.
+
+    Args:
+        points (list): (date, value) tuples in date order.
+        threshold (int): Number of points to keep (at least 3).
+
+    Returns:
+        list: The kept (date, value) tuples.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    size = (len(points) - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * size) + 1
+        end = int((bucket + 1) * size) + 1
+        next_end = min(int((bucket + 2) * size) + 1, len(points))
+        next_points = points[end:next_end] or [points[-1]]
+        average_x = (end + next_end - 1) / 2 if end < next_end else len(points) - 1
+        average_y = sum(point[1] for point in next_points) / len(next_points)
+
+        previous_y = points[previous][1]
+        best, best_area = start, -1.0
+        for position in range(start, end):
+            area = abs(
+                (previous - average_x) * (points[position][1] - previous_y)
+                - (previous - position) * (average_y - previous_y)
+            )
+            if area > best_area:
+                best, best_area = position, area
+        sampled.append(points[best])
+        previous = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def pattern_markers(stock_id, dates, from_date=None, to_date=None):
+    """
+    Groups the stock's pattern occurrences by the chart point covering them.
+
+    A downsampled point can cover many sessions, so a long chart gets at most one
+    marker per point instead of one per occurrence.
+
+    Args:
+        stock_id (int): Stock to list occurrences of.
+        dates (list): Dates of the chart points, oldest first.
+        from_date (date, optional): First date of the chart.
+        to_date (date, optional): Last date of the chart.
+
+    Returns:
+        list: {"index", "date", "patterns"} dicts ordered by index, where index is
+        the position of the chart point, date its date and patterns maps each
+        pattern slug printed within the point to its number of occurrences.
+    """
+    counts = defaultdict(Counter)
+    for slug, pattern in PATTERNS.items():
+        queryset = pattern["model"].objects.filter(stock_id=stock_id)
+        if from_date:
+            queryset = queryset.filter(data_date__gte=from_date)
+        if to_date:
+            queryset = queryset.filter(data_date__lte=to_date)
+        for data_date in queryset.values_list("data_date", flat=True):
+            index = bisect_right(dates, data_date) - 1
+            if index >= 0:
+                counts[index][slug] += 1
+    return [
+        {
+            "index": index,
+            "date": dates[index].isoformat(),
+            "patterns": dict(sorted(counts[index].items())),
+        }
+        for index in sorted(counts)
+    ]
+
+
+def chart_series(
+    stock_id, width=DEFAULT_WIDTH, mode="ohlc", from_date=None, to_date=None
+):
+    """
+    Builds the downsampled chart series of one stock.
+
+    Candlestick mode keeps one bucket per two pixels so candles stay readable; line
+    mode keeps one close per pixel.
+
+    Args:
+        stock_id (int): Stock to chart.
+        width (int): Chart width in pixels.
+        mode (str): "ohlc" for candles or "line" for closes.
+        from_date (date, optional): First date to chart.
+        to_date (date, optional): Last date to chart.
+
+    Returns:
+        dict: mode, number of stored sessions, points, pattern markers and the names
+        of the patterns marked. OHLC points are [date, open, high, low, close] and
+        line points are [date, close].
+    """
+    queryset = OHLCData.objects.filter(stock_id=stock_id).order_by("data_date")
+    if from_date:
+        queryset = queryset.filter(data_date__gte=from_date)
+    if to_date:
+        queryset = queryset.filter(data_date__lte=to_date)
+
+    if mode == "line":
+        rows = [
+            (data_date, float(close))
+            for data_date, close in queryset.values_list("data_date", "close_price")
+        ]
+        sampled = lttb(rows, width)
+    else:
+        rows = [
+            (data_date, float(open_), float(high), float(low), float(close))
+            for data_date, open_, high, low, close in queryset.values_list(
+                "data_date", "open_price", "high_price", "low_price", "close_price"
+            )
+        ]
+        sampled = bucket_ohlc(rows, max(1, width // 2))
+
+    dates = [point[0] for point in sampled]
+    markers = pattern_markers(stock_id, dates, from_date, to_date)
+    slugs = {slug for marker in markers for slug in marker["patterns"]}
+    return {
+        "mode": mode,
+        "sessions": len(rows),
+        "points": [
+            [point[0].isoformat(), *(round(value, 2) for value in point[1:])]
+            for point in sampled
+        ],
+        "markers": markers,
+        "pattern_names": {slug: PATTERNS[slug]["name"] for slug in sorted(slugs)},
+    }
@@ -0,0 +1,149 @@
+"""
+Vectorized candlestick pattern detection with strength scores.
+
+The detectors take numpy arrays of prices in paise (prices * 100 as integers, so
+every comparison is exact like comparing the stored Decimal prices) and return,
+for each pattern, a boolean mask of the candles matching it and a strength score
+per candle.
+
+Strength scores rank matches of the same pattern; they are not comparable across
+patterns:
+- hammer / inverted hammer: long shadow / body, the body floored at 5% of the range
+  so it stays finite (2 to 20).
+- spinning top/bottom: shorter shadow / floored body.
+- doji: high-low range as a percentage of the close (longer legs score higher).
+- bullish / bearish engulfing: second body / first body.
+- bullish / bearish kicker: gap between the two candles as a percentage of the
+  first close.
+- pro gap positive: gap between the first close and the second open as a
+  percentage of the first close.
+"""
+
+import numpy as np
+
+BODY_FLOOR = 0.05
+
+
+def to_paise(prices):
+    """
+    Converts a sequence of 2-decimal prices to an int64 array of paise.
+    """
+    return np.rint(np.asarray(prices, dtype=np.float64) * 100).astype(np.int64)
+
+
+def candle_measurements(open_, high, low, close):
+    """
+    Computes the body and shadow measurements the detectors share.
+
+    Args:
+        open_, high, low, close (ndarray): int64 prices in paise.
+
+    Returns:
+        tuple: (body, upper shadow, lower shadow, range) int64 arrays.
+    """
+    body = np.abs(close - open_)
+    upper_shadow = high - np.maximum(open_, close)
+    lower_shadow = np.minimum(open_, close) - low
+    return body, upper_shadow, lower_shadow, high - low
+
+
+def _ratio(numerator, denominator):
+    """
+    Divides element-wise, giving 0 where the denominator is 0.
+    """
+    numerator = numerator.astype(np.float64)
+    denominator = denominator.astype(np.float64)
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros_like(numerator),
+        where=denominator != 0,
+    )
+
+
+def single_candle_signals(open_, high, low, close):
+    """
+    Detects the single candlestick patterns on arrays of candles.
+
+    Args:
+        open_, high, low, close (ndarray): int64 prices in paise.
+
+    Returns:
+        dict: Pattern slug -> (boolean mask, float64 strength array).
+    """
+    body, upper_shadow, lower_shadow, candle_range = candle_measurements(
+        open_, high, low, close
+    )
+    # candles with a single price (including all-zero rows) match nothing
+    valid = candle_range != 0
+    floored_body = np.maximum(body, BODY_FLOOR * candle_range)
+
+    return {
+        "hammer": (
+            valid & (lower_shadow >= 2 * body) & (2 * upper_shadow <= body),
+            _ratio(lower_shadow, floored_body),
+        ),
+        "inverted-hammer": (
+            valid & (upper_shadow >= 2 * body) & (2 * lower_shadow <= body),
+            _ratio(upper_shadow, floored_body),
+        ),
+        "doji": (
+            valid & (open_ == close),
+            100 * _ratio(candle_range, close),
+        ),
+        "spinning-top-bottom": (
+            valid & (2 * lower_shadow >= 3 * body) & (2 * upper_shadow >= 3 * body),
+            _ratio(np.minimum(upper_shadow, lower_shadow), floored_body),
+        ),
+    }
+
+
+def double_candle_signals(first, second):
+    """
+    Detects the double candlestick patterns on pairs of consecutive candles.
+
+    Args:
+        first (tuple): (open, high, low, close) int64 arrays of the first candles.
+        second (tuple): (open, high, low, close) int64 arrays of the second candles.
+
+    Returns:
+        dict: Pattern slug -> (boolean mask, float64 strength array).
+    """
+    first_open, first_high, first_low, first_close = first
+    second_open, second_high, second_low, second_close = second
+    first_bullish = first_close > first_open
+    first_bearish = first_close < first_open
+    second_bullish = second_close > second_open
+    second_bearish = second_close < second_open
+    body_ratio = _ratio(
+        np.abs(second_close - second_open), np.abs(first_close - first_open)
+    )
+
+    return {
+        "pro-gap-positive": (
+            first_bearish & second_bullish & (second_open > first_close),
+            100 * _ratio(second_open - first_close, first_close),
+        ),
+        "bullish-engulfing": (
+            first_bearish
+            & second_bullish
+            & (second_open <= first_close)
+            & (second_close >= first_open),
+            body_ratio,
+        ),
+        "bearish-engulfing": (
+            first_bullish
+            & second_bearish
+            & (second_open >= first_close)
+            & (second_close <= first_open),
+            body_ratio,
+        ),
+        "bullish-kicker": (
+            first_bearish & second_bullish & (first_high <= second_low),
+            100 * _ratio(second_low - first_high, first_close),
+        ),
+        "bearish-kicker": (
+            first_bullish & second_bearish & (first_low >= second_high),
+            100 * _ratio(first_low - second_high, first_close),
+        ),
+    }
@@ -0,0 +1,223 @@
+"""
+Streaming exports of pattern occurrences and OHLC history.
+
+Rows are read with `.values_list().iterator(chunk_size=...)` and encoded chunk by
+chunk as CSV or JSON Lines, so exports of any size run in constant memory and the
+header goes out before the first database chunk is read. Both the export views and
+the export_data management command consume these generators.
+
+Every generator has an async twin reading with `.values().aiterator()`: an ASGI server
+consumes a sync generator to the end before sending anything, and a WSGI server
+does the same with an async one, so the export views pick the kind matching the
+server.
+"""
+
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+from .models import OHLCData
+from .patterns import PATTERNS
+
+CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "jsonl")
+PATTERN_HEADER = ("pattern", "date", "symbol", "sector", "strength")
+OHLC_HEADER = (
+    "date",
+    "symbol",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "open_interest",
+)
+# columns read for each header
+PATTERN_FIELDS = ("data_date", "stock__symbol", "stock__sector", "strength")
+OHLC_FIELDS = (
+    "data_date",
+    "stock__symbol",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "open_interest",
+)
+
+
+def pattern_querysets(patterns=None, sector=None, from_date=None, to_date=None):
+    """
+    Returns the querysets of the pattern occurrences to export.
+
+    Args:
+        patterns (list, optional): Pattern slugs to export, default all of them.
+        sector (str, optional): Only export stocks from this sector.
+        from_date (date, optional): First date to export.
+        to_date (date, optional): Last date to export.
+
+    Returns:
+        list: (pattern slug, queryset) pairs, the querysets ordered by date.
+    """
+    querysets = []
+    for slug in patterns or PATTERNS:
+        queryset = PATTERNS[slug]["model"].objects.order_by("data_date", "id")
+        if sector:
+            queryset = queryset.filter(stock__sector=sector)
+        if from_date:
+            queryset = queryset.filter(data_date__gte=from_date)
+        if to_date:
+            queryset = queryset.filter(data_date__lte=to_date)
+        querysets.append((slug, queryset))
+    return querysets
+
+
+def pattern_rows(patterns=None, sector=None, from_date=None, to_date=None):
+    """
+    Yields pattern occurrences as tuples matching PATTERN_HEADER.
+
+    Takes the arguments of pattern_querysets().
+
+    Yields:
+        tuple: (pattern, date, symbol, sector, strength).
+    """
+    for slug, queryset in pattern_querysets(patterns, sector, from_date, to_date):
+        rows = queryset.values_list(*PATTERN_FIELDS)
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield slug, *row
+
+
+async def apattern_rows(patterns=None, sector=None, from_date=None, to_date=None):
+    """
+    Async version of pattern_rows, reading with the async ORM.
+    """
+    for slug, queryset in pattern_querysets(patterns, sector, from_date, to_date):
+        # .values() since values_list().aiterator() runs its query on the event loop
+        rows = queryset.values(*PATTERN_FIELDS)
+        async for row in rows.aiterator(chunk_size=CHUNK_SIZE):
+            yield slug, *row.values()
+
+
+def ohlc_queryset(symbols=None, sector=None, from_date=None, to_date=None):
+    """
+    Returns the queryset of the daily candles to export, ordered by stock and date.
+
+    Args:
+        symbols (list, optional): Stock symbols to export, default every stock.
+        sector (str, optional): Only export stocks from this sector.
+        from_date (date, optional): First date to export.
+        to_date (date, optional): Last date to export.
+
+    Returns:
+        QuerySet: The candles.
+    """
+    queryset = OHLCData.objects.order_by("stock_id", "data_date")
+    if symbols:
+        queryset = queryset.filter(stock__symbol__in=symbols)
+    if sector:
+        queryset = queryset.filter(stock__sector=sector)
+    if from_date:
+        queryset = queryset.filter(data_date__gte=from_date)
+    if to_date:
+        queryset = queryset.filter(data_date__lte=to_date)
+    return queryset
+
+
+def ohlc_rows(symbols=None, sector=None, from_date=None, to_date=None):
+    """
+    Yields daily candles as tuples matching OHLC_HEADER, ordered by stock and date.
+
+    Takes the arguments of ohlc_queryset().
+
+    Yields:
+        tuple: (date, symbol, open, high, low, close, volume, open interest).
+    """
+    rows = ohlc_queryset(symbols, sector, from_date, to_date).values_list(*OHLC_FIELDS)
+    yield from rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+async def aohlc_rows(symbols=None, sector=None, from_date=None, to_date=None):
+    """
+    Async version of ohlc_rows, reading with the async ORM.
+    """
+    # .values() since values_list().aiterator() runs its query on the event loop
+    rows = ohlc_queryset(symbols, sector, from_date, to_date).values(*OHLC_FIELDS)
+    async for row in rows.aiterator(chunk_size=CHUNK_SIZE):
+        yield tuple(row.values())
+
+
+class _LineBuffer:
+    """
+    File-like object handing csv.writer's output straight back to the caller.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _encoder(header, export_format):
+    """
+    Returns the encoded header line (None for JSON Lines) and the row encoder.
+    """
+    if export_format == "csv":
+        writer = csv.writer(_LineBuffer())
+        return writer.writerow(header), writer.writerow
+
+    def encode(row):
+        return json.dumps(dict(zip(header, row)), default=_json_value) + "\n"
+
+    return None, encode
+
+
+def encode_rows(rows, header, export_format="csv", lines_per_chunk=500):
+    """
+    Encodes rows as CSV or JSON Lines, yielding text in blocks of lines.
+
+    Args:
+        rows (iterable): Row tuples in header order.
+        header (tuple): Column names.
+        export_format (str): "csv" or "jsonl".
+        lines_per_chunk (int): Rows joined into each yielded block.
+
+    Yields:
+        str: Encoded text; the CSV header is yielded on its own first.
+    """
+    header_line, encode = _encoder(header, export_format)
+    if header_line is not None:
+        yield header_line
+
+    block = []
+    for row in rows:
+        block.append(encode(row))
+        if len(block) >= lines_per_chunk:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
+
+async def aencode_rows(rows, header, export_format="csv", lines_per_chunk=500):
+    """
+    Async version of encode_rows, encoding rows from an async iterable.
+    """
+    header_line, encode = _encoder(header, export_format)
+    if header_line is not None:
+        yield header_line
+
+    block = []
+    async for row in rows:
+        block.append(encode(row))
+        if len(block) >= lines_per_chunk:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
@@ -0,0 +1,284 @@
+"""
+Offline stand-in for the Upstox API, for benchmarks and load tests of ingestion.
+
+FakeUpstoxServer answers the endpoints the app uses:
+
+- GET  /v3/historical-candle/<isin>/days/1/<to>/<from>: daily candles
+- GET  /v2/user/profile: the access token check
+- GET  /v2/login/authorization/dialog: redirects straight back with a code
+- POST /v2/login/authorization/token: issues an access token
+
+Candles are synthetic but deterministic: each (ISIN, session) candle is derived from
+a hash of the two, so any range returns the same values on every run and machine,
+with one candle per session of the trading calendar, newest first like Upstox.
+Response latency follows a log-normal distribution around a configurable median,
+a token bucket answers 429 beyond a configurable request rate, a share of the
+candle requests can be failed with 503s, and padding can enlarge every payload.
+
+Serve it with `python manage.py run_fake_upstox` and set UPSTOX_API_URL (and
+ACCESS_TOKEN_URL) to its address to ingest without network access or API quota.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from .trading_calendar import get_trading_calendar
+
+CANDLE_PATH = re.compile(
+    r"^/v3/historical-candle/(?P<isin>[^/]+)/days/1/"
+    r"(?P<to>\d{4}-\d{2}-\d{2})/(?P<from>\d{4}-\d{2}-\d{2})$"
+)
+
+
+def synthetic_candle(isin, day):
+    """
+    Returns the deterministic daily candle of an ISIN on a date.
+
+    The price oscillates slowly around a level picked by the ISIN, with daily noise
+    drawn from a generator seeded by the ISIN and the date.
+
+    Returns:
+        list: [timestamp, open, high, low, close, volume, open interest].
+    """
+    isin_hash = zlib.crc32(isin.encode())
+    rng = random.Random(zlib.crc32(f"{isin}|{day.isoformat()}".encode()))
+    level = (50 + isin_hash % 4950) * (
+        1 + 0.2 * math.sin(day.toordinal() / 40 + isin_hash % 628 / 100)
+    )
+    open_price = level * (1 + rng.uniform(-0.01, 0.01))
+    close_price = level * (1 + rng.uniform(-0.03, 0.03))
+    high_price = max(open_price, close_price) * (1 + rng.uniform(0, 0.02))
+    low_price = min(open_price, close_price) * (1 - rng.uniform(0, 0.02))
+    return [
+        f"{day.isoformat()}T00:00:00+05:30",
+        round(open_price, 2),
+        round(high_price, 2),
+        round(low_price, 2),
+        round(close_price, 2),
+        int(rng.lognormvariate(12, 0.6)),
+        0,
+    ]
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """
+        Takes a token, returning False when the bucket is empty.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FakeUpstoxServer(ThreadingHTTPServer):
+    """
+    HTTP server faking the Upstox API, one thread per connection.
+
+    Args:
+        address (tuple): (host, port) to listen on.
+        latency (float): Median response latency in seconds.
+        latency_sigma (float): Sigma of the log-normal latency distribution.
+        rate_limit (float): Requests per second allowed before 429s, 0 for none.
+        burst (int): Requests allowed at once above the rate, default the rate.
+        error_rate (float): Share of candle requests failed with a 503.
+        padding (int): Bytes of filler added to every candle payload.
+        reject_auth (bool): Answer 401 to every authorized request, as Upstox does
+            for an expired token.
+        seed (int): Seed of the latency and error draws.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency=0.05,
+        latency_sigma=0.5,
+        rate_limit=0,
+        burst=None,
+        error_rate=0.0,
+        padding=0,
+        reject_auth=False,
+        seed=0,
+    ):
+        super().__init__(address, FakeUpstoxHandler)
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.bucket = (
+            TokenBucket(rate_limit, burst or max(1, int(rate_limit)))
+            if rate_limit
+            else None
+        )
+        self.error_rate = error_rate
+        self.padding = "x" * padding
+        self.reject_auth = reject_auth
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "rate_limited": 0, "errors": 0, "tokens": 0}
+
+    def count(self, name):
+        """
+        Increments a request counter, returning its new value.
+        """
+        with self.lock:
+            self.counts[name] += 1
+            return self.counts[name]
+
+    def draw(self):
+        """
+        Returns a response delay in seconds and whether to inject an error.
+        """
+        with self.lock:
+            delay = self.latency * math.exp(self.rng.gauss(0, self.latency_sigma))
+            return delay, self.rng.random() < self.error_rate
+
+
+class FakeUpstoxHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of FakeUpstoxServer.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+    def respond(self, status, payload, headers=None):
+        """
+        Sends a JSON response.
+        """
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def error(self, status, code, message):
+        """
+        Sends an error in the Upstox error format.
+        """
+        self.respond(
+            status,
+            {
+                "status": "error",
+                "errors": [{"errorCode": code, "message": message}],
+            },
+        )
+
+    def authorized(self):
+        """
+        Answers 401 and returns False unless the request carries an accepted token.
+        """
+        if self.headers.get("Authorization") and not self.server.reject_auth:
+            return True
+        self.error(401, "UDAPI100050", "Invalid token used to access API")
+        return False
+
+    def do_GET(self):  # pylint: disable=C0103
+        """
+        Serves candles, the profile and the login dialog.
+        """
+        url = urlparse(self.path)
+        match = CANDLE_PATH.match(url.path)
+        if match:
+            self.candles(match)
+        elif url.path == "/v2/user/profile":
+            if self.authorized():
+                self.respond(
+                    200,
+                    {"status": "success", "data": {"user_name": "Fake Upstox"}},
+                )
+        elif url.path == "/v2/login/authorization/dialog":
+            redirect_uri = parse_qs(url.query).get("redirect_uri", [""])[0]
+            self.send_response(302)
+            self.send_header(
+                "Location", f"{redirect_uri}?{urlencode({'code': 'fake-code'})}"
+            )
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.error(404, "UDAPI100060", "Resource not Found")
+
+    def do_POST(self):  # pylint: disable=C0103
+        """
+        Issues an access token for any authorization code.
+        """
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != "/v2/login/authorization/token":
+            self.error(404, "UDAPI100060", "Resource not Found")
+            return
+        number = self.server.count("tokens")
+        self.respond(
+            200,
+            {
+                "access_token": f"fake-token-{number}",
+                "user_name": "Fake Upstox",
+            },
+        )
+
+    def candles(self, match):
+        """
+        Serves the daily candles of an ISIN, subject to the rate limit, the error
+        injection and the latency distribution.
+        """
+        server = self.server
+        server.count("requests")
+        if server.bucket is not None and not server.bucket.take():
+            server.count("rate_limited")
+            self.error(429, "UDAPI10005", "Too Many Request Sent")
+            return
+        if not self.authorized():
+            return
+        delay, fail = server.draw()
+        time.sleep(delay)
+        if fail:
+            server.count("errors")
+            self.error(503, "UDAPI100500", "Something went wrong")
+            return
+        try:
+            first = date.fromisoformat(match["from"])
+            last = date.fromisoformat(match["to"])
+            sessions = get_trading_calendar().sessions_between(first, last)
+        except ValueError:
+            self.error(400, "UDAPI1022", "Invalid date range")
+            return
+        payload = {
+            "status": "success",
+            "data": {
+                "candles": [
+                    synthetic_candle(match["isin"], day) for day in reversed(sessions)
+                ]
+            },
+        }
+        if server.padding:
+            payload["padding"] = server.padding
+        self.respond(200, payload)
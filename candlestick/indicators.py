@@ -0,0 +1,374 @@
+"""
+Rolling technical indicators of every candle.
+
+SMA/EMA 20/50/200, 14-session Wilder RSI and ATR, 20-session Bollinger bands and
+the relative volume (volume over the median volume of the previous 20 sessions) are
+stored per candle in TechnicalIndicator. Each stock's candles are processed in date
+order by a RollingIndicators state that advances in constant time per candle:
+running sums over the last WINDOW closes for the averages and bands, a sorted list
+of the last 20 volumes for the median, and the previous EMA, RSI and ATR values for
+the rest.
+
+A refresh does not recompute history. The state of each stock is restored from
+its last stored row before the refreshed range plus its last WINDOW candles, and
+only the new candles are advanced. Stocks without a usable previous row (new
+stocks, or history stored before the table existed) are computed from their full
+history instead.
+"""
+
+import bisect
+import logging
+import math
+from collections import deque
+
+from django.db import transaction
+
+from .models import OHLCData, TechnicalIndicator
+
+SMA_PERIODS = (20, 50, 200)
+EMA_PERIODS = (20, 50, 200)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_WIDTH = 2
+VOLUME_PERIOD = 20
+# relative volume needed for a volume-confirmed pattern and for a volume spike
+VOLUME_CONFIRMATION = 1.5
+VOLUME_SPIKE = 2.0
+WINDOW = max(SMA_PERIODS + EMA_PERIODS)
+# decimals stored; the carried EMA/RSI/ATR state is rounded the same way so that
+# a state restored from a stored row continues exactly like an uninterrupted one
+PRECISION = 4
+
+INDICATOR_FIELDS = (
+    "sma20",
+    "sma50",
+    "sma200",
+    "ema20",
+    "ema50",
+    "ema200",
+    "rsi14",
+    "atr14",
+    "bb_upper",
+    "bb_lower",
+    "relative_volume",
+)
+STATE_FIELDS = ("rsi_avg_gain", "rsi_avg_loss", "candles")
+
+
+def true_range(high, low, previous_close):
+    """
+    Returns the true range of a candle, its high-low range for a stock's first candle.
+    """
+    if previous_close is None:
+        return high - low
+    return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+
+class RollingIndicators:
+    """
+    Indicator state of one stock, advanced one candle at a time.
+
+    Attributes:
+        window (deque): (high, low, close, volume) of the last WINDOW candles,
+            oldest first.
+        candles (int): Number of candles seen.
+        sums (dict): Period -> sum of the last `period` closes.
+        squares (float): Sum of the squares of the last BOLLINGER_PERIOD closes.
+        volumes (list): The last VOLUME_PERIOD volumes, sorted.
+        ema (dict): Period -> previous EMA, None until seeded.
+        rsi_avg_gain, rsi_avg_loss (float): Previous Wilder averages, None until seeded.
+        atr (float): Previous ATR, None until seeded.
+    """
+
+    def __init__(self, window=(), previous=None):
+        """
+        Restores the state after a stock's last processed candle.
+
+        Args:
+            window (iterable): (high, low, close, volume) of the stock's last
+                candles up to and including that one, oldest first.
+            previous (dict, optional): Stored TechnicalIndicator values of that
+                candle; None for a stock without candles.
+        """
+        self.window = deque(window, maxlen=WINDOW)
+        closes = [candle[2] for candle in self.window]
+        previous = previous or {}
+        self.candles = previous.get("candles", 0)
+        self.sums = {period: sum(closes[-period:]) for period in SMA_PERIODS}
+        self.squares = sum(close * close for close in closes[-BOLLINGER_PERIOD:])
+        self.volumes = sorted(
+            candle[3] for candle in list(self.window)[-VOLUME_PERIOD:]
+        )
+        self.ema = {period: previous.get(f"ema{period}") for period in EMA_PERIODS}
+        self.rsi_avg_gain = previous.get("rsi_avg_gain")
+        self.rsi_avg_loss = previous.get("rsi_avg_loss")
+        self.atr = previous.get("atr14")
+
+    def update(self, high, low, close, volume=0):
+        """
+        Advances the state by one candle.
+
+        Args:
+            high, low, close (float): Prices of the candle.
+            volume (int): Traded volume of the candle.
+
+        Returns:
+            dict: The candle's INDICATOR_FIELDS and STATE_FIELDS values.
+        """
+        window = self.window
+        previous_close = window[-1][2] if window else None
+        # the closes leaving each window, before the new candle is appended
+        for period in SMA_PERIODS:
+            self.sums[period] += close
+            if len(window) >= period:
+                self.sums[period] -= window[-period][2]
+        self.squares += close * close
+        if len(window) >= BOLLINGER_PERIOD:
+            self.squares -= window[-BOLLINGER_PERIOD][2] ** 2
+        # against the median of the previous sessions, then the volume joins them
+        relative_volume = None
+        if len(self.volumes) == VOLUME_PERIOD:
+            middle = VOLUME_PERIOD // 2
+            median = (self.volumes[middle - 1] + self.volumes[middle]) / 2
+            if median:
+                relative_volume = volume / median
+            self.volumes.pop(
+                bisect.bisect_left(self.volumes, window[-VOLUME_PERIOD][3])
+            )
+        bisect.insort(self.volumes, volume)
+        window.append((high, low, close, volume))
+        self.candles += 1
+        candles = self.candles
+
+        values = {
+            f"sma{period}": self.sums[period] / period if candles >= period else None
+            for period in SMA_PERIODS
+        }
+
+        for period in EMA_PERIODS:
+            if self.ema[period] is not None:
+                self.ema[period] = round(
+                    self.ema[period] + 2 / (period + 1) * (close - self.ema[period]),
+                    PRECISION,
+                )
+            elif candles == period:
+                # seeded with the simple average of the first `period` closes
+                self.ema[period] = round(self.sums[period] / period, PRECISION)
+            values[f"ema{period}"] = self.ema[period]
+
+        if previous_close is not None and self.rsi_avg_gain is not None:
+            change = close - previous_close
+            self.rsi_avg_gain = round(
+                (self.rsi_avg_gain * (RSI_PERIOD - 1) + max(change, 0)) / RSI_PERIOD,
+                PRECISION,
+            )
+            self.rsi_avg_loss = round(
+                (self.rsi_avg_loss * (RSI_PERIOD - 1) + max(-change, 0)) / RSI_PERIOD,
+                PRECISION,
+            )
+        elif candles == RSI_PERIOD + 1:
+            closes = [candle[2] for candle in window]
+            changes = [b - a for a, b in zip(closes, closes[1:])]
+            self.rsi_avg_gain = round(
+                sum(max(change, 0) for change in changes) / RSI_PERIOD, PRECISION
+            )
+            self.rsi_avg_loss = round(
+                sum(max(-change, 0) for change in changes) / RSI_PERIOD, PRECISION
+            )
+        rsi = None
+        if self.rsi_avg_gain is not None:
+            rsi = (
+                100 - 100 / (1 + self.rsi_avg_gain / self.rsi_avg_loss)
+                if self.rsi_avg_loss
+                else 100.0
+            )
+
+        if self.atr is not None:
+            self.atr = round(
+                (self.atr * (ATR_PERIOD - 1) + true_range(high, low, previous_close))
+                / ATR_PERIOD,
+                PRECISION,
+            )
+        elif candles == ATR_PERIOD:
+            ranges = [
+                true_range(h, l, window[i - 1][2] if i else None)
+                for i, (h, l, *_) in enumerate(window)
+            ]
+            self.atr = round(sum(ranges) / ATR_PERIOD, PRECISION)
+
+        bb_upper = bb_lower = None
+        if candles >= BOLLINGER_PERIOD:
+            mean = self.sums[BOLLINGER_PERIOD] / BOLLINGER_PERIOD
+            deviation = math.sqrt(max(self.squares / BOLLINGER_PERIOD - mean * mean, 0))
+            bb_upper = mean + BOLLINGER_WIDTH * deviation
+            bb_lower = mean - BOLLINGER_WIDTH * deviation
+
+        values.update(
+            rsi14=rsi,
+            atr14=self.atr,
+            bb_upper=bb_upper,
+            bb_lower=bb_lower,
+            relative_volume=relative_volume,
+            rsi_avg_gain=self.rsi_avg_gain,
+            rsi_avg_loss=self.rsi_avg_loss,
+            candles=candles,
+        )
+        return values
+
+
+def indicator_row(candle_id, values):
+    """
+    Builds the TechnicalIndicator of a candle, rounding the stored values.
+    """
+    return TechnicalIndicator(
+        candle_id=candle_id,
+        **{
+            name: (
+                value if value is None or name == "candles" else round(value, PRECISION)
+            )
+            for name, value in values.items()
+        },
+    )
+
+
+CANDLE_FIELDS = ("high_price", "low_price", "close_price", "volume")
+
+
+def as_candle(high, low, close, volume):
+    """
+    Converts a row of CANDLE_FIELDS to the (high, low, close, volume) tuple the
+    state keeps, prices as floats.
+    """
+    return float(high), float(low), float(close), volume
+
+
+def candle_rows(candles):
+    """
+    Reads the candles of a queryset ordered by stock and date.
+
+    Yields:
+        tuple: (candle id, stock id, (high, low, close, volume)).
+    """
+    for candle_id, stock_id, *candle in (
+        candles.order_by("stock_id", "data_date")
+        .values_list("id", "stock_id", *CANDLE_FIELDS)
+        .iterator(chunk_size=5000)
+    ):
+        yield candle_id, stock_id, as_candle(*candle)
+
+
+def restored_states(start_date):
+    """
+    Restores the indicator state of every stock just before start_date.
+
+    Args:
+        start_date (str): First date to be recomputed ('YYYY-MM-DD').
+
+    Returns:
+        tuple: (dict stock id -> RollingIndicators for the stocks whose state could
+        be restored, set of stock ids with candles before start_date).
+    """
+    # the last WINDOW sessions hold the window of every stock trading regularly
+    sessions = list(
+        OHLCData.objects.filter(data_date__lt=start_date)
+        .order_by("-data_date")
+        .values_list("data_date", flat=True)
+        .distinct()[:WINDOW]
+    )
+    if not sessions:
+        return {}, set()
+
+    windows = {}
+    last_candles = {}
+    for candle_id, stock_id, candle in candle_rows(
+        OHLCData.objects.filter(data_date__gte=sessions[-1], data_date__lt=start_date)
+    ):
+        windows.setdefault(stock_id, deque(maxlen=WINDOW)).append(candle)
+        last_candles[stock_id] = candle_id
+
+    previous_rows = {
+        row["candle_id"]: row
+        for row in TechnicalIndicator.objects.filter(
+            candle_id__in=last_candles.values()
+        ).values("candle_id", *INDICATOR_FIELDS, *STATE_FIELDS)
+    }
+    states = {}
+    for stock_id, window in windows.items():
+        previous = previous_rows.get(last_candles[stock_id])
+        if previous is None:
+            continue
+        if len(window) < min(previous["candles"], WINDOW):
+            # the stock missed sessions, so its window reaches further back
+            window = [
+                as_candle(*candle)
+                for candle in reversed(
+                    OHLCData.objects.filter(stock_id=stock_id, data_date__lt=start_date)
+                    .order_by("-data_date")
+                    .values_list(*CANDLE_FIELDS)[:WINDOW]
+                )
+            ]
+        states[stock_id] = RollingIndicators(window, previous)
+
+    earlier_stocks = set(
+        OHLCData.objects.filter(data_date__lt=start_date)
+        .values_list("stock_id", flat=True)
+        .distinct()
+    )
+    return states, earlier_stocks
+
+
+def update_indicators(start_date=None):
+    """
+    Computes the indicators of the candles from start_date on.
+
+    Later indicators depend on earlier ones, so every candle from start_date to
+    the latest stored session is recomputed, also when a backfill ends before it,
+    and the stage takes no end date. Without start_date the whole history is
+    recomputed.
+
+    Args:
+        start_date (str, optional): First date to compute ('YYYY-MM-DD').
+
+    Returns:
+        int: Number of indicator rows written.
+    """
+    logger = logging.getLogger("stock_screener_logger")
+    states, earlier_stocks = restored_states(start_date) if start_date else ({}, set())
+    # stocks with history but no restorable state are recomputed from their start
+    rebuilt = earlier_stocks - set(states)
+
+    candles = OHLCData.objects.all()
+    if start_date:
+        candles = candles.filter(data_date__gte=start_date)
+    rows = []
+    for candle_id, stock_id, candle in candle_rows(candles):
+        if stock_id in rebuilt:
+            continue
+        state = states.get(stock_id)
+        if state is None:
+            state = states[stock_id] = RollingIndicators()
+        rows.append(indicator_row(candle_id, state.update(*candle)))
+    if rebuilt:
+        state = None
+        previous_stock_id = None
+        for candle_id, stock_id, candle in candle_rows(
+            OHLCData.objects.filter(stock_id__in=rebuilt)
+        ):
+            if stock_id != previous_stock_id:
+                previous_stock_id = stock_id
+                state = RollingIndicators()
+            rows.append(indicator_row(candle_id, state.update(*candle)))
+
+    with transaction.atomic():
+        stale = TechnicalIndicator.objects.all()
+        if start_date:
+            stale = stale.filter(candle__data_date__gte=start_date)
+        stale.delete()
+        TechnicalIndicator.objects.filter(candle__stock_id__in=rebuilt).delete()
+        TechnicalIndicator.objects.bulk_create(rows, batch_size=1000)
+    logger.info(  # pylint: disable=W1203
+        f"Indicators computed for {len(rows)} candles, "
+        f"{len(rebuilt)} stocks from their full history"
+    )
+    return len(rows)
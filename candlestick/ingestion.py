@@ -0,0 +1,450 @@
+"""
+Sharded OHLC ingestion from Upstox.
+
+A refresh run splits the stocks into RefreshShard rows of SHARD_SIZE consecutive
+ids. Any number of workers, the refreshing process itself and run_ingest_worker
+processes on the same or other hosts, claim pending shards with an expiring lease,
+fetch and write the candles of their stocks and renew the lease as stocks complete,
+and every RENEW_INTERVAL while requests are still pending.
+A shard whose lease expires, because its worker died, is claimed again by the next
+worker that looks for work. Each stock's candles of the range are replaced in one
+transaction, so a shard fetched twice leaves the same rows.
+
+The refreshing process waits until every shard of its run is done before the
+pipeline moves on to the indicators and pattern detection.
+
+Within a shard the requests run concurrently, as many at a time as an
+AdaptiveLimiter allows. Every response is classified as a success, rate limited,
+transient or permanent failure: the limit grows by one request per round trip while
+responses stay healthy and halves on a 429 or a latency spike (AIMD), and rate
+limited or transient requests are retried with jittered exponential backoff. A
+stock that still fails is counted as failed without stopping the shard.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import OHLCData, RefreshShard, Stock
+
+SHARD_SIZE = 50
+LEASE_TTL = timedelta(minutes=5)
+# a shard's lease is renewed at least this often while its requests are pending,
+# however long a single stock's retries take
+RENEW_INTERVAL = LEASE_TTL.total_seconds() / 3
+# pending shards tried per claim, in case other workers win the first ones
+CLAIM_CANDIDATES = 10
+WAIT_INTERVAL = 1.0
+# concurrent Upstox requests of one worker
+INITIAL_CONCURRENCY = 2
+MAX_CONCURRENCY = 16
+# the limit is multiplied by DECREASE on a 429 or a response LATENCY_SPIKE times
+# slower than the moving average latency
+DECREASE = 0.5
+LATENCY_SPIKE = 3.0
+LATENCY_SMOOTHING = 0.1
+FETCH_RETRIES = 4
+RETRY_DELAY = 0.5
+# also caps a 429's Retry-After; well below LEASE_TTL so a waiting stock keeps
+# its shard's lease
+MAX_RETRY_DELAY = 30.0
+# response classes
+SUCCESS = "success"
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+
+def worker_name():
+    """
+    Returns the identity a worker leases shards under, "<host>:<pid>".
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit of the Upstox requests, adjusted by additive increase and
+    multiplicative decrease.
+
+    Attributes:
+        limit (float): Current limit; int(limit) requests may be in flight.
+        in_flight (int): Requests currently in flight.
+        latency (float): Moving average latency of healthy responses in seconds.
+    """
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, maximum=MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.in_flight = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds one of the limited request slots, waiting until one is free.
+        """
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def record(self, outcome, latency):
+        """
+        Adjusts the limit after a response.
+
+        Args:
+            outcome (str): Class of the response, see classify_response().
+            latency (float): Seconds the request took.
+        """
+        with self.condition:
+            spike = self.latency is not None and latency > LATENCY_SPIKE * self.latency
+            if outcome == RATE_LIMITED or spike:
+                now = time.monotonic()
+                # back off once per round trip, not once per request in flight
+                if now - self.last_decrease > (self.latency or 1.0):
+                    self.limit = max(1.0, self.limit * DECREASE)
+                    self.last_decrease = now
+            elif outcome == SUCCESS:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if outcome == SUCCESS:
+                self.latency = (
+                    latency
+                    if self.latency is None
+                    else self.latency + LATENCY_SMOOTHING * (latency - self.latency)
+                )
+            self.condition.notify_all()
+
+
+def classify_response(response):
+    """
+    Classifies an Upstox historical candle response.
+
+    Args:
+        response (Response): Response of the request.
+
+    Returns:
+        tuple: (SUCCESS, RATE_LIMITED, TRANSIENT or PERMANENT, candles of a
+        successful response or None).
+    """
+    if response.status_code == 429:
+        return RATE_LIMITED, None
+    if response.status_code >= 500 or response.status_code == 408:
+        return TRANSIENT, None
+    if response.status_code >= 400:
+        return PERMANENT, None
+    try:
+        response_data = response.json()
+    except ValueError:
+        # a truncated body
+        return TRANSIENT, None
+    candles = (response_data.get("data") or {}).get("candles")
+    if response_data.get("status") != "success" or candles is None:
+        return PERMANENT, None
+    return SUCCESS, candles
+
+
+def retry_delay(attempt, response=None):
+    """
+    Returns the jittered backoff before a retry, at least the Retry-After of a 429.
+
+    The delay never exceeds MAX_RETRY_DELAY, so a long Retry-After cannot hold a
+    stock past the shard's LEASE_TTL; the retry is rate limited again instead.
+    """
+    delay = random.uniform(0, min(MAX_RETRY_DELAY, RETRY_DELAY * 2**attempt))
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = min(max(delay, float(retry_after)), MAX_RETRY_DELAY)
+    return delay
+
+
+def request_candles(session, limiter, stock, start_date, end_date, access_token):
+    """
+    Requests one stock's daily candles, retrying rate limited and transient failures.
+
+    Args:
+        session (Session): HTTP session shared by the worker's requests.
+        limiter (AdaptiveLimiter): Concurrency limit of the requests.
+        stock (Stock): Stock to fetch.
+        start_date (date): First date of the range.
+        end_date (date): Last date of the range.
+        access_token (str): Upstox access token.
+
+    Returns:
+        tuple: (response class, candles or None) of the last attempt.
+    """
+    url = f"{settings.UPSTOX_API_URL}/v3/historical-candle/{stock.isin_code}/days/1/{end_date}/{start_date}"
+    headers = {"Accept": "application/json", "Authorization": access_token}
+    for attempt in range(FETCH_RETRIES + 1):
+        response = None
+        with limiter.slot():
+            started = time.monotonic()
+            try:
+                response = session.get(url, headers=headers, timeout=120)
+                outcome, candles = classify_response(response)
+            except requests.RequestException:
+                outcome, candles = TRANSIENT, None
+            limiter.record(outcome, time.monotonic() - started)
+        if outcome in (SUCCESS, PERMANENT) or attempt == FETCH_RETRIES:
+            return outcome, candles
+        time.sleep(retry_delay(attempt, response))
+    return outcome, candles
+
+
+def store_stock_candles(stock, start_date, end_date, candles):
+    """
+    Replaces a stock's stored candles of the range with the fetched ones.
+    """
+    ohlc_objects = [
+        OHLCData(
+            data_date=datetime.fromisoformat(ohlc[0]).date(),
+            open_price=ohlc[1],
+            high_price=ohlc[2],
+            low_price=ohlc[3],
+            close_price=ohlc[4],
+            volume=ohlc[5],
+            open_interest=ohlc[6],
+            stock=stock,
+        )
+        for ohlc in candles
+    ]
+    with transaction.atomic():
+        OHLCData.objects.filter(
+            stock=stock, data_date__gte=start_date, data_date__lte=end_date
+        ).delete()
+        OHLCData.objects.bulk_create(ohlc_objects, batch_size=100)
+
+
+_limiter_lock = threading.Lock()
+_limiter = None
+
+
+def get_limiter():
+    """
+    Returns the process's AdaptiveLimiter, so the limit learnt on one shard
+    carries over to the next.
+    """
+    global _limiter  # pylint: disable=W0603
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter()
+        return _limiter
+
+
+def create_shards(run, shard_size=SHARD_SIZE):
+    """
+    Splits every stock into shards of the run.
+
+    Returns:
+        int: Number of stocks to fetch.
+    """
+    stock_ids = list(Stock.objects.order_by("id").values_list("id", flat=True))
+    RefreshShard.objects.bulk_create(
+        [
+            RefreshShard(
+                run=run,
+                first_stock_id=chunk[0],
+                last_stock_id=chunk[-1],
+                stocks=len(chunk),
+            )
+            for chunk in (
+                stock_ids[i : i + shard_size]
+                for i in range(0, len(stock_ids), shard_size)
+            )
+        ]
+    )
+    return len(stock_ids)
+
+
+def claim_shard(owner, run=None):
+    """
+    Leases a pending shard, or one whose lease expired.
+
+    Args:
+        owner (str): Identity of the claiming worker.
+        run (RefreshRun, optional): Only claim shards of this run; by default any
+            running refresh's shards.
+
+    Returns:
+        RefreshShard: The leased shard, or None if there is nothing to claim.
+    """
+    now = timezone.now()
+    claimable = Q(status="pending") | Q(status="leased", lease_expires_at__lt=now)
+    shards = RefreshShard.objects.filter(claimable)
+    shards = shards.filter(run=run) if run else shards.filter(run__status="Running")
+    for shard_id in shards.order_by("id").values_list("id", flat=True)[
+        :CLAIM_CANDIDATES
+    ]:
+        # the conditional update lets exactly one of the racing workers win
+        claimed = RefreshShard.objects.filter(claimable, pk=shard_id).update(
+            status="leased",
+            owner=owner,
+            lease_expires_at=now + LEASE_TTL,
+            attempts=F("attempts") + 1,
+            stocks_fetched=0,
+            stocks_failed=0,
+        )
+        if claimed:
+            return RefreshShard.objects.select_related("run").get(pk=shard_id)
+    return None
+
+
+def renew_lease(shard, owner, fetched, failed):
+    """
+    Extends the worker's lease of a shard and records its progress.
+
+    Returns:
+        bool: False if the lease was lost to another worker.
+    """
+    return bool(
+        RefreshShard.objects.filter(pk=shard.pk, owner=owner, status="leased").update(
+            lease_expires_at=timezone.now() + LEASE_TTL,
+            stocks_fetched=fetched,
+            stocks_failed=failed,
+        )
+    )
+
+
+def process_shard(shard, owner, access_token, on_stock=None):
+    """
+    Fetches the candles of a leased shard's stocks and marks the shard done.
+
+    Requests run concurrently within the limit of the process's AdaptiveLimiter;
+    their candles are written as each stock completes, and the lease is renewed
+    then and every RENEW_INTERVAL while requests are pending.
+
+    Args:
+        shard (RefreshShard): Shard leased by the worker.
+        owner (str): Identity of the worker.
+        access_token (str): Upstox access token.
+        on_stock (callable, optional): Called as stocks complete.
+
+    Returns:
+        bool: True if the shard was completed, False if its lease was lost.
+    """
+    logger = logging.getLogger("stock_screener_logger")
+    start_date, end_date = shard.run.start_date, shard.run.end_date
+    stocks = Stock.objects.filter(
+        id__gte=shard.first_stock_id, id__lte=shard.last_stock_id
+    ).order_by("id")
+    limiter = get_limiter()
+    fetched = failed = 0
+    with requests.Session() as session, ThreadPoolExecutor(
+        max_workers=MAX_CONCURRENCY
+    ) as executor:
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENCY)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        requested = {
+            executor.submit(
+                request_candles,
+                session,
+                limiter,
+                stock,
+                start_date,
+                end_date,
+                access_token,
+            ): stock
+            for stock in stocks
+        }
+        pending = set(requested)
+        while pending:
+            completed, pending = wait(
+                pending, timeout=RENEW_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            for future in completed:
+                stock = requested[future]
+                try:
+                    outcome, candles = future.result()
+                    if outcome == SUCCESS:
+                        store_stock_candles(stock, start_date, end_date, candles)
+                except Exception as e:  # pylint: disable=W0718
+                    logger.error(f"Error : {e}", exc_info=True)  # pylint: disable=W1203
+                    outcome = PERMANENT
+                if outcome == SUCCESS:
+                    fetched += 1
+                    if candles:
+                        logger.info(  # pylint: disable=W1203
+                            f"Data for {stock.symbol} fetched"
+                        )
+                else:
+                    failed += 1
+                    logger.warning(  # pylint: disable=W1203
+                        f"Data for {stock.symbol} not fetched ({outcome})"
+                    )
+            if not renew_lease(shard, owner, fetched, failed):
+                logger.warning(  # pylint: disable=W1203
+                    f"Lease of shard {shard.pk} lost, leaving it to its new worker"
+                )
+                executor.shutdown(cancel_futures=True)
+                return False
+            if completed and on_stock:
+                on_stock()
+    return bool(
+        RefreshShard.objects.filter(pk=shard.pk, owner=owner, status="leased").update(
+            status="done", lease_expires_at=None
+        )
+    )
+
+
+def shard_totals(run):
+    """
+    Returns the run's fetched and failed stocks and its done and total shards.
+    """
+    return RefreshShard.objects.filter(run=run).aggregate(
+        fetched=Sum("stocks_fetched", default=0),
+        failed=Sum("stocks_failed", default=0),
+        done=Count("id", filter=Q(status="done")),
+        total=Count("id"),
+    )
+
+
+def ingest_run(run, owner, access_token, progress):
+    """
+    Works on the run's shards alongside any other workers until all are done.
+
+    Shards leased by other workers are waited for; if their lease expires they are
+    claimed and fetched here.
+
+    Args:
+        run (RefreshRun): Run whose shards to fetch.
+        owner (str): Identity of this worker.
+        access_token (str): Upstox access token.
+        progress (RefreshProgress): Progress of the run, updated with the fetch
+            counts of every worker.
+    """
+
+    def report():
+        totals = shard_totals(run)
+        progress.set_fetch_counts(totals["fetched"], totals["failed"])
+        return totals
+
+    while True:
+        shard = claim_shard(owner, run)
+        if shard is not None:
+            process_shard(shard, owner, access_token, on_stock=report)
+        totals = report()
+        if totals["done"] == totals["total"]:
+            return
+        if shard is None:
+            time.sleep(WAIT_INTERVAL)
@@ -0,0 +1,247 @@
+"""
+Streaming intraday candles with live pattern evaluation.
+
+A feed source yields ticks or 1-minute candles as
+(timestamp, symbol, open, high, low, close, volume) events; a tick simply has the
+same open, high, low and close. IntradayAggregator folds the events of every stock
+into its current 5/15/60-minute bar, held in preallocated flat arrays indexed by
+the stock's position (no object per bar or per tick), so the per-event work is a
+handful of array writes.
+
+Whenever the feed's clock crosses into a new bucket, every bar of an earlier
+bucket is closed, also those of stocks without an event in the new bucket: it
+becomes the stock's last closed bar and the stock is queued. The vectorized
+single- and double-candle detectors then run over the queued stocks only, pairing
+each just-closed bar with the stock's previous bar, so no other bar is
+re-evaluated. Events must arrive in time order; late events of a bucket the
+clock has already left are dropped.
+
+Sources are pluggable through INTRADAY_SOURCES. ReplaySource replays a recorded
+CSV feed and stands in for the Upstox market data feed.
+"""
+
+import csv
+from array import array
+from datetime import datetime
+
+import numpy as np
+from django.utils import timezone
+
+from .detection import double_candle_signals, single_candle_signals, to_paise
+
+INTERVALS = (5, 15, 60)
+# bars are aligned on the 09:15 IST market open (03:45 UTC)
+SESSION_OFFSET = 3 * 3600 + 45 * 60
+BAR_FIELDS = ("open", "high", "low", "close")
+
+
+class ReplaySource:
+    """
+    Replays a recorded feed from a CSV file, oldest event first.
+
+    Each row is either a tick, `timestamp,symbol,price,volume`, or a 1-minute
+    candle, `timestamp,symbol,open,high,low,close,volume`. Timestamps are epoch
+    seconds or ISO 8601 datetimes with an offset. A header row is skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, newline="", encoding="utf-8") as file:
+            for row in csv.reader(file):
+                if not row or not row[0][:1].isdigit():
+                    continue
+                timestamp = (
+                    int(row[0])
+                    if row[0].isdigit()
+                    else int(datetime.fromisoformat(row[0]).timestamp())
+                )
+                if len(row) == 4:
+                    price = float(row[2])
+                    yield timestamp, row[1], price, price, price, price, int(row[3])
+                else:
+                    yield (
+                        timestamp,
+                        row[1],
+                        float(row[2]),
+                        float(row[3]),
+                        float(row[4]),
+                        float(row[5]),
+                        int(row[6]),
+                    )
+
+
+# source name -> class taking the source's location; the Upstox market data feed
+# plugs in here with the same event tuples
+INTRADAY_SOURCES = {
+    "replay": ReplaySource,
+}
+
+
+class IntradayAggregator:
+    """
+    Rolling intraday bars of a fixed set of stocks at one interval.
+
+    Attributes:
+        symbols (list): Symbols in buffer order.
+        minutes (int): Bar interval in minutes.
+        bucket (array): Bucket number of each stock's current bar, -1 before its
+            first event.
+        current, last, previous (dict): Field -> array of the current bar, the
+            bar that closed last and the one before it, one slot per stock.
+        volume (array): Volume of each stock's current bar.
+        pending (list): Stock positions whose bar closed since the last evaluate().
+        clock (int): Latest bucket seen in the feed.
+    """
+
+    def __init__(self, symbols, minutes):
+        self.symbols = list(symbols)
+        self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.minutes = minutes
+        self.seconds = minutes * 60
+        count = len(self.symbols)
+        self.bucket = array("q", [-1]) * count
+        self.volume = array("q", [0]) * count
+        self.current, self.last, self.previous = (
+            {field: array("d", [0.0]) * count for field in BAR_FIELDS} for _ in range(3)
+        )
+        self.last_bucket = array("q", [-1]) * count
+        self.previous_bucket = array("q", [-1]) * count
+        self.pending = []
+        self.clock = -1
+
+    def add(self, timestamp, symbol, open_, high, low, close, volume):
+        """
+        Folds one tick or 1-minute candle into its stock's current bar.
+
+        Events of symbols outside the aggregator are ignored.
+
+        Returns:
+            list: Matches on the bars that closed before this event's bucket began,
+            see evaluate(); empty unless the event moved the clock to a new bucket.
+        """
+        bucket = (timestamp - SESSION_OFFSET) // self.seconds
+        matches = []
+        if bucket > self.clock:
+            matches = self.advance(bucket)
+        i = self.positions.get(symbol)
+        # every bar of a bucket before the clock is closed, so a late event would
+        # open a bar behind the feed
+        if i is None or bucket < self.clock:
+            return matches
+        current = self.current
+        if bucket != self.bucket[i]:
+            if self.bucket[i] >= 0:
+                self.close_bar(i)
+            self.bucket[i] = bucket
+            current["open"][i] = open_
+            current["high"][i] = high
+            current["low"][i] = low
+            self.volume[i] = 0
+        else:
+            if high > current["high"][i]:
+                current["high"][i] = high
+            if low < current["low"][i]:
+                current["low"][i] = low
+        current["close"][i] = close
+        self.volume[i] += volume
+        return matches
+
+    def close_bar(self, i):
+        """
+        Closes a stock's current bar, shifting its last closed bar to previous.
+        """
+        for field in BAR_FIELDS:
+            self.previous[field][i] = self.last[field][i]
+            self.last[field][i] = self.current[field][i]
+        self.previous_bucket[i] = self.last_bucket[i]
+        self.last_bucket[i] = self.bucket[i]
+        self.bucket[i] = -1
+        self.pending.append(i)
+
+    def advance(self, bucket):
+        """
+        Moves the clock to `bucket`, closing every bar of an earlier bucket.
+
+        Returns:
+            list: Matches on the closed bars, see evaluate().
+        """
+        buckets = np.frombuffer(self.bucket, dtype=np.int64)
+        closing = np.flatnonzero((buckets >= 0) & (buckets < bucket))
+        if closing.size:
+            # the same shift as close_bar(), on the closing stocks at once
+            for field in BAR_FIELDS:
+                previous, last, current = (
+                    np.frombuffer(bars[field], dtype=np.float64)
+                    for bars in (self.previous, self.last, self.current)
+                )
+                previous[closing] = last[closing]
+                last[closing] = current[closing]
+            previous_buckets = np.frombuffer(self.previous_bucket, dtype=np.int64)
+            last_buckets = np.frombuffer(self.last_bucket, dtype=np.int64)
+            previous_buckets[closing] = last_buckets[closing]
+            last_buckets[closing] = buckets[closing]
+            buckets[closing] = -1
+            # every stock closes at most one bar per bucket, so none is queued twice
+            self.pending.extend(closing.tolist())
+        self.clock = max(self.clock, bucket)
+        return self.evaluate()
+
+    def flush(self, timestamp):
+        """
+        Closes every bar whose interval ended by `timestamp`, e.g. on a timer or at
+        the end of a replay, so stocks without a later event are evaluated too.
+
+        Returns:
+            list: Matches on the closed bars, see evaluate().
+        """
+        return self.advance((timestamp - SESSION_OFFSET) // self.seconds)
+
+    def bar_start(self, bucket):
+        """
+        Returns the start of a bucket as an aware datetime in the project time zone.
+        """
+        return datetime.fromtimestamp(
+            bucket * self.seconds + SESSION_OFFSET, tz=timezone.get_current_timezone()
+        )
+
+    def evaluate(self):
+        """
+        Runs the pattern detectors on the bars closed since the last call.
+
+        Returns:
+            list: (symbol, bar start, pattern slug, strength) of every match.
+        """
+        if not self.pending:
+            return []
+        positions = np.array(self.pending)
+        self.pending = []
+
+        def gather(bars):
+            return tuple(
+                to_paise(np.frombuffer(bars[field], dtype=np.float64)[positions])
+                for field in BAR_FIELDS
+            )
+
+        last = gather(self.last)
+        previous_buckets = np.frombuffer(self.previous_bucket, dtype=np.int64)
+        has_previous = previous_buckets[positions] >= 0
+        matches = []
+        for signals, selected in (
+            (single_candle_signals(*last), None),
+            (double_candle_signals(gather(self.previous), last), has_previous),
+        ):
+            for slug, (mask, strength) in signals.items():
+                if selected is not None:
+                    mask = mask & selected
+                matches += [
+                    (
+                        self.symbols[positions[j]],
+                        self.bar_start(self.last_bucket[positions[j]]),
+                        slug,
+                        round(float(strength[j]), 4),
+                    )
+                    for j in np.flatnonzero(mask)
+                ]
+        return matches
@@ -0,0 +1,34 @@
+"""
+Management command recomputing the technical indicators of the stored candles.
+
+The refresh pipeline advances the indicators for the candles it ingests; run this
+once to backfill the OHLC history stored before the table existed, or to recompute
+everything from a date on.
+
+Examples:
+    python manage.py build_indicators
+    python manage.py build_indicators --from 2025-01-01
+"""
+
+from django.core.management.base import BaseCommand
+
+from candlestick.caching import bump_data_generation
+from candlestick.indicators import update_indicators
+from candlestick.management.commands.export_data import iso_date
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the TechnicalIndicator rows from a date on, default all candles.
+    """
+
+    help = "Recompute the SMA/EMA, RSI, ATR and Bollinger values of every candle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from_date", type=iso_date)
+
+    def handle(self, *args, **options):
+        written = update_indicators(start_date=options["from_date"])
+        # publish the new values like the refresh pipeline does
+        bump_data_generation()
+        self.stdout.write(f"Wrote {written} indicator rows.")
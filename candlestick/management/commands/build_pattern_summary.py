@@ -0,0 +1,36 @@
+"""
+Management command recomputing the daily pattern summary counts.
+
+The refresh pipeline keeps the summary up to date; run this once to backfill it for
+history detected before the summary existed, or to repair a date range.
+
+Examples:
+    python manage.py build_pattern_summary
+    python manage.py build_pattern_summary --from 2025-01-01 --to 2025-03-31
+"""
+
+from django.core.management.base import BaseCommand
+
+from candlestick.caching import bump_data_generation
+from candlestick.management.commands.export_data import iso_date
+from candlestick.summary import update_pattern_summary
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the PatternSummary rows of a date range, default all dates.
+    """
+
+    help = "Recompute the daily pattern counts per sector shown on the overview pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from_date", type=iso_date)
+        parser.add_argument("--to", dest="to_date", type=iso_date)
+
+    def handle(self, *args, **options):
+        written = update_pattern_summary(
+            start_date=options["from_date"], end_date=options["to_date"]
+        )
+        # the overview pages are cached per generation
+        bump_data_generation()
+        self.stdout.write(f"Wrote {written} pattern summary rows.")
@@ -0,0 +1,36 @@
+"""
+Management command recomputing the daily sector breadth table.
+
+The refresh pipeline computes breadth for the dates it ingests; run this once to
+backfill the OHLC history stored before the table existed, or to repair a range.
+
+Examples:
+    python manage.py build_sector_breadth
+    python manage.py build_sector_breadth --from 2025-01-01 --to 2025-03-31
+"""
+
+from django.core.management.base import BaseCommand
+
+from candlestick.breadth import update_sector_breadth
+from candlestick.caching import bump_data_generation
+from candlestick.management.commands.export_data import iso_date
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the SectorBreadth rows of a date range, default all dates.
+    """
+
+    help = "Recompute the daily breadth counts of every sector."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from_date", type=iso_date)
+        parser.add_argument("--to", dest="to_date", type=iso_date)
+
+    def handle(self, *args, **options):
+        written = update_sector_breadth(
+            start_date=options["from_date"], end_date=options["to_date"]
+        )
+        # the breadth API is ETagged per generation
+        bump_data_generation()
+        self.stdout.write(f"Wrote {written} sector breadth rows.")
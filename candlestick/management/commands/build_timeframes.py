@@ -0,0 +1,28 @@
+"""
+Management command rebuilding the weekly and monthly candles and their patterns.
+
+The refresh pipeline folds new daily candles into the current bars; run this once
+to resample the daily history stored before the tables existed.
+
+Example:
+    python manage.py build_timeframes
+"""
+
+from django.core.management.base import BaseCommand
+
+from candlestick.caching import bump_data_generation
+from candlestick.timeframes import update_timeframes
+
+
+class Command(BaseCommand):
+    """
+    Resamples every stored daily candle into weekly and monthly bars.
+    """
+
+    help = "Rebuild the weekly and monthly candles and detect patterns on them."
+
+    def handle(self, *args, **options):
+        stored = update_timeframes()
+        # the pattern pages are cached per generation
+        bump_data_generation()
+        self.stdout.write(f"Stored {stored} weekly and monthly pattern matches.")
@@ -0,0 +1,88 @@
+"""
+Management command streaming pattern occurrences or OHLC history to a file or stdout.
+
+Examples:
+    python manage.py export_data patterns --pattern hammer --from 2025-01-01 > hammers.csv
+    python manage.py export_data ohlc --symbol RELIANCE --format jsonl --output reliance.jsonl
+"""
+
+import argparse
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from candlestick.exports import (
+    EXPORT_FORMATS,
+    OHLC_HEADER,
+    PATTERN_HEADER,
+    encode_rows,
+    ohlc_rows,
+    pattern_rows,
+)
+from candlestick.patterns import PATTERNS
+
+
+def iso_date(value):
+    """
+    argparse type for 'YYYY-MM-DD' dates.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(
+            f"Invalid date '{value}', expected YYYY-MM-DD"
+        ) from e
+
+
+class Command(BaseCommand):
+    """
+    Exports pattern occurrences or OHLC history as CSV or JSON Lines.
+    """
+
+    help = "Stream pattern occurrences or OHLC history as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=["patterns", "ohlc"])
+        parser.add_argument(
+            "--pattern",
+            action="append",
+            choices=list(PATTERNS),
+            help="Pattern to export (repeatable, default all).",
+        )
+        parser.add_argument(
+            "--symbol",
+            action="append",
+            help="Stock symbol to export OHLC for (repeatable, default all).",
+        )
+        parser.add_argument("--sector", help="Only export stocks from this sector.")
+        parser.add_argument("--from", dest="from_date", type=iso_date)
+        parser.add_argument("--to", dest="to_date", type=iso_date)
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", help="File to write, default stdout.")
+
+    def handle(self, *args, **options):
+        if options["dataset"] == "patterns":
+            header = PATTERN_HEADER
+            rows = pattern_rows(
+                patterns=options["pattern"],
+                sector=options["sector"],
+                from_date=options["from_date"],
+                to_date=options["to_date"],
+            )
+        else:
+            header = OHLC_HEADER
+            rows = ohlc_rows(
+                symbols=options["symbol"],
+                sector=options["sector"],
+                from_date=options["from_date"],
+                to_date=options["to_date"],
+            )
+
+        chunks = encode_rows(rows, header, options["format"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
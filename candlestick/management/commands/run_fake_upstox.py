@@ -0,0 +1,95 @@
+"""
+Management command serving the offline Upstox stand-in.
+
+Point the app at it to benchmark or load-test ingestion without network access or
+API quota, see candlestick.fake_upstox:
+
+    UPSTOX_API_URL=http://127.0.0.1:8765 \
+    ACCESS_TOKEN_URL=http://127.0.0.1:8765/v2/login/authorization/token \
+    python manage.py runserver
+
+Examples:
+    python manage.py run_fake_upstox
+    python manage.py run_fake_upstox --latency 120 --rate-limit 25 --error-rate 0.02
+"""
+
+from django.core.management.base import BaseCommand
+
+from candlestick.fake_upstox import FakeUpstoxServer
+
+
+class Command(BaseCommand):
+    """
+    Serves synthetic Upstox candles with configurable latency, limits and errors.
+    """
+
+    help = "Serve a local fake of the Upstox candle and token endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=50,
+            help="Median response latency in milliseconds.",
+        )
+        parser.add_argument(
+            "--latency-sigma",
+            type=float,
+            default=0.5,
+            help="Spread of the log-normal latency distribution.",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=0,
+            help="Candle requests per second before 429s (0 for no limit).",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            help="Requests allowed at once above the rate, default the rate.",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0.0,
+            help="Share of candle requests failed with a 503.",
+        )
+        parser.add_argument(
+            "--padding",
+            type=int,
+            default=0,
+            help="Bytes of filler added to every candle payload.",
+        )
+        parser.add_argument(
+            "--reject-auth",
+            action="store_true",
+            help="Reject every access token, like an expired one.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        server = FakeUpstoxServer(
+            (options["host"], options["port"]),
+            latency=options["latency"] / 1000,
+            latency_sigma=options["latency_sigma"],
+            rate_limit=options["rate_limit"],
+            burst=options["burst"],
+            error_rate=options["error_rate"],
+            padding=options["padding"],
+            reject_auth=options["reject_auth"],
+            seed=options["seed"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Fake Upstox serving on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write(
+            ", ".join(f"{name}: {count}" for name, count in server.counts.items())
+        )
@@ -0,0 +1,65 @@
+"""
+Management command running an ingestion worker.
+
+The worker claims shards of running refreshes, fetches their stocks' candles from
+Upstox and writes them, alongside the refreshing process and any other workers on
+this or other hosts. See candlestick.ingestion.
+
+Examples:
+    python manage.py run_ingest_worker
+    python manage.py run_ingest_worker --once
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from candlestick.ingestion import claim_shard, process_shard, worker_name
+from candlestick.tokens import get_access_token
+
+
+class Command(BaseCommand):
+    """
+    Fetches shards of running refreshes until stopped.
+    """
+
+    help = "Claim and fetch shards of running data refreshes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when no shard is claimable.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as no shard is claimable.",
+        )
+
+    def handle(self, *args, **options):
+        logger = logging.getLogger("stock_screener_logger")
+        owner = worker_name()
+        self.stdout.write(f"Ingestion worker {owner} started")
+        shards = 0
+        try:
+            while True:
+                shard = claim_shard(owner)
+                if shard is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll"])
+                    continue
+                try:
+                    if process_shard(shard, owner, get_access_token()):
+                        shards += 1
+                except Exception as e:  # pylint: disable=W0718
+                    # the lease expires and another worker claims the shard again
+                    logger.error(  # pylint: disable=W1203
+                        f"Shard {shard.pk} failed: {e}", exc_info=True
+                    )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Fetched {shards} shards.")
@@ -0,0 +1,69 @@
+"""
+Management command running the end-of-day refresh scheduler.
+
+After the run time on every trading session, the sessions missing since the latest
+stored candle are fetched and detected in one refresh, retried with jittered
+backoff while Upstox data is incomplete. Start it on as many hosts as needed for
+failover: a database lock lets only one instance act. See candlestick.scheduler.
+
+Examples:
+    python manage.py run_scheduler
+    python manage.py run_scheduler --run-at 17:30 --retries 8
+    python manage.py run_scheduler --once
+"""
+
+from datetime import time
+
+from django.core.management.base import BaseCommand
+
+from candlestick.scheduler import RETRIES, RETRY_DELAY, RUN_AT, Scheduler
+
+
+class Command(BaseCommand):
+    """
+    Runs the refresh pipeline after market close on trading sessions.
+    """
+
+    help = "Refresh candles and patterns after market close on every trading session."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--run-at",
+            type=time.fromisoformat,
+            default=RUN_AT,
+            help="Local time of day (HH:MM) a session's refresh runs.",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=RETRIES,
+            help="Retries while the fetched data is incomplete.",
+        )
+        parser.add_argument(
+            "--retry-delay",
+            type=int,
+            default=RETRY_DELAY,
+            help="Base delay in seconds before the first retry, doubled each time.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Refresh the pending sessions if any are due, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(
+            run_at=options["run_at"],
+            retries=options["retries"],
+            retry_delay=options["retry_delay"],
+        )
+        self.stdout.write(f"Scheduler {scheduler.owner} running at {scheduler.run_at}")
+        try:
+            if options["once"]:
+                scheduler.tick()
+            else:
+                scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.release()
@@ -0,0 +1,89 @@
+"""
+Management command running the intraday aggregator over a feed source.
+
+Every event of the feed is folded into 5, 15 and 60-minute bars of all stocks (or
+the --interval values given) and the patterns found on each bar as it closes are
+printed. With the replay source, the feed is a recorded CSV file, see
+candlestick.intraday.ReplaySource.
+
+Examples:
+    python manage.py stream_intraday --location ticks.csv
+    python manage.py stream_intraday --location candles_1m.csv --interval 15 --pattern hammer
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from candlestick.intraday import INTERVALS, INTRADAY_SOURCES, IntradayAggregator
+from candlestick.models import Stock
+from candlestick.patterns import PATTERNS
+
+
+class Command(BaseCommand):
+    """
+    Aggregates a tick or 1-minute feed into intraday bars and evaluates patterns.
+    """
+
+    help = "Stream a tick or 1-minute feed into intraday bars and print the patterns found."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", choices=list(INTRADAY_SOURCES), default="replay"
+        )
+        parser.add_argument(
+            "--location",
+            default=settings.INTRADAY_REPLAY_PATH,
+            help="Location of the feed, the CSV file for the replay source.",
+        )
+        parser.add_argument(
+            "--interval",
+            action="append",
+            type=int,
+            choices=INTERVALS,
+            help="Bar interval in minutes (repeatable, default all).",
+        )
+        parser.add_argument(
+            "--pattern",
+            action="append",
+            choices=list(PATTERNS),
+            help="Only print this pattern (repeatable, default all).",
+        )
+
+    def handle(self, *args, **options):
+        symbols = list(Stock.objects.order_by("id").values_list("symbol", flat=True))
+        aggregators = [
+            IntradayAggregator(symbols, minutes)
+            for minutes in options["interval"] or INTERVALS
+        ]
+        patterns = set(options["pattern"] or PATTERNS)
+        source = INTRADAY_SOURCES[options["source"]](options["location"])
+
+        def report(aggregator, matches):
+            for symbol, bar_start, slug, strength in matches:
+                if slug in patterns:
+                    self.stdout.write(
+                        f"{bar_start:%Y-%m-%d %H:%M} {aggregator.minutes}m "
+                        f"{symbol}: {PATTERNS[slug]['name']} ({strength})"
+                    )
+
+        events = 0
+        timestamp = None
+        started = time.perf_counter()
+        for event in source:
+            timestamp = event[0]
+            for aggregator in aggregators:
+                matches = aggregator.add(*event)
+                if matches:
+                    report(aggregator, matches)
+            events += 1
+        if timestamp is not None:
+            # close the bars still open at the end of the feed
+            for aggregator in aggregators:
+                report(aggregator, aggregator.flush(timestamp + aggregator.seconds))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Processed {events} events in {elapsed:.1f}s "
+            f"({events / max(elapsed, 1e-9):,.0f} events/s)."
+        )
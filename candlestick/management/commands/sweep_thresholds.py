@@ -0,0 +1,84 @@
+"""
+Management command sweeping the shadow/body multiples of a single-candle pattern.
+
+Each --grid option gives the values of one parameter, either a comma separated
+list or start:stop:step (stop included); parameters left out keep the value the
+detector uses today. The parameter sets are printed best first by the mean return
+of the chosen horizon.
+
+Examples:
+    python manage.py sweep_thresholds hammer
+    python manage.py sweep_thresholds hammer --grid long_shadow=1.5:4:0.1 --grid short_shadow=0.1,0.25,0.5,1
+    python manage.py sweep_thresholds spinning-top-bottom --grid shadows=1:3:0.05 --horizon 10 --top 20
+"""
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from candlestick.backtest import HORIZONS
+from candlestick.sweep import SWEEPS, run_sweep
+
+
+def parameter_values(value):
+    """
+    Parses a --grid option: 'name=v1,v2,...' or 'name=start:stop:step'.
+
+    Returns:
+        tuple: (parameter name, list of float values).
+    """
+    name, _, values = value.partition("=")
+    try:
+        if ":" in values:
+            start, stop, step = (float(part) for part in values.split(":"))
+            if step <= 0:
+                raise ValueError
+            count = int(round((stop - start) / step)) + 1
+            return name, [round(start + i * step, 6) for i in range(count)]
+        return name, [float(part) for part in values.split(",")]
+    except ValueError as e:
+        raise CommandError(
+            f"Invalid grid '{value}', expected name=v1,v2 or name=start:stop:step."
+        ) from e
+
+
+class Command(BaseCommand):
+    """
+    Evaluates a grid of pattern thresholds against the stored history.
+    """
+
+    help = "Sweep the thresholds of a single-candle pattern and rank them by forward return."
+
+    def add_arguments(self, parser):
+        parser.add_argument("pattern", choices=sorted(SWEEPS))
+        parser.add_argument("--grid", action="append", default=[])
+        parser.add_argument("--horizon", type=int, choices=HORIZONS, default=5)
+        parser.add_argument("--top", type=int, default=10)
+
+    def handle(self, *args, **options):
+        grid = dict(parameter_values(value) for value in options["grid"])
+        try:
+            results = run_sweep(options["pattern"], grid)
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        horizon = options["horizon"]
+        results.sort(
+            key=lambda result: (
+                -np.inf
+                if result["horizons"][horizon]["mean_return"] is None
+                else result["horizons"][horizon]["mean_return"]
+            ),
+            reverse=True,
+        )
+        self.stdout.write(
+            f"{len(results)} parameter sets, ranked by {horizon}-session mean return:"
+        )
+        for result in results[: options["top"]]:
+            parameters = ", ".join(
+                f"{name}={value:g}" for name, value in result["parameters"].items()
+            )
+            stats = result["horizons"][horizon]
+            self.stdout.write(
+                f"{parameters}: {result['matches']} matches, {stats['trades']} trades, "
+                f"mean return {stats['mean_return']}%, hit rate {stats['hit_rate']}%"
+            )
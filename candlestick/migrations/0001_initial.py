@@ -0,0 +1,281 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Stock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("company_name", models.CharField(max_length=255)),
+                ("symbol", models.CharField(max_length=255)),
+                ("sector", models.CharField(max_length=255)),
+                ("isin_code", models.CharField(blank=True, max_length=255, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UpatoxAccessToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SpinningTopBottom",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spinning_top_bottom",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ProGapPositive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pro_gap_positive",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OHLCData",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                ("open_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("close_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("high_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("low_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ohlc_data",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="InvertedHammer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inverted_hammer",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Hammer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hammer",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Doji",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="doji",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BullishKicker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bullish_kicker",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BullishEngulfing",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bullish_engulfing",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BearishKicker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bearish_kicker",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BearishEngulfing",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bearish_engulfing",
+                        to="candlestick.stock",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,469 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candlestick", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("generation", models.PositiveIntegerField(default=0)),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PatternSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                ("pattern", models.CharField(max_length=50)),
+                ("sector", models.CharField(max_length=255)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RefreshRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("status", models.CharField(default="Running", max_length=20)),
+                ("stage", models.CharField(blank=True, max_length=50)),
+                ("stocks_total", models.PositiveIntegerField(default=0)),
+                ("stocks_fetched", models.PositiveIntegerField(default=0)),
+                ("stocks_failed", models.PositiveIntegerField(default=0)),
+                ("patterns_found", models.PositiveIntegerField(default=0)),
+                ("stage_timings", models.JSONField(default=dict)),
+                ("message", models.TextField(blank=True)),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RefreshShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_stock_id", models.PositiveBigIntegerField()),
+                ("last_stock_id", models.PositiveBigIntegerField()),
+                ("stocks", models.PositiveIntegerField(default=0)),
+                ("status", models.CharField(default="pending", max_length=10)),
+                ("owner", models.CharField(blank=True, max_length=255)),
+                ("lease_expires_at", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("stocks_fetched", models.PositiveIntegerField(default=0)),
+                ("stocks_failed", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SchedulerLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("owner", models.CharField(max_length=255)),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SectorBreadth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_date", models.DateField()),
+                ("sector", models.CharField(max_length=255)),
+                ("stocks", models.PositiveIntegerField(default=0)),
+                ("advances", models.PositiveIntegerField(default=0)),
+                ("declines", models.PositiveIntegerField(default=0)),
+                ("bullish", models.PositiveIntegerField(default=0)),
+                ("bearish", models.PositiveIntegerField(default=0)),
+                ("above_sma20", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TechnicalIndicator",
+            fields=[
+                (
+                    "candle",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="indicators",
+                        serialize=False,
+                        to="candlestick.ohlcdata",
+                    ),
+                ),
+                ("sma20", models.FloatField(blank=True, null=True)),
+                ("sma50", models.FloatField(blank=True, null=True)),
+                ("sma200", models.FloatField(blank=True, null=True)),
+                ("ema20", models.FloatField(blank=True, null=True)),
+                ("ema50", models.FloatField(blank=True, null=True)),
+                ("ema200", models.FloatField(blank=True, null=True)),
+                ("rsi14", models.FloatField(blank=True, null=True)),
+                ("atr14", models.FloatField(blank=True, null=True)),
+                ("bb_upper", models.FloatField(blank=True, null=True)),
+                ("bb_lower", models.FloatField(blank=True, null=True)),
+                ("relative_volume", models.FloatField(blank=True, null=True)),
+                ("rsi_avg_gain", models.FloatField(blank=True, null=True)),
+                ("rsi_avg_loss", models.FloatField(blank=True, null=True)),
+                ("candles", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TimeframeCandle",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timeframe", models.CharField(max_length=5)),
+                ("period_start", models.DateField()),
+                ("data_date", models.DateField()),
+                ("open_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("high_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("low_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("close_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("volume", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TimeframePattern",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timeframe", models.CharField(max_length=5)),
+                ("pattern", models.CharField(max_length=50)),
+                ("data_date", models.DateField()),
+                ("strength", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="bearishengulfing",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="bearishkicker",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="bullishengulfing",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="bullishkicker",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="doji",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="hammer",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="invertedhammer",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ohlcdata",
+            name="open_interest",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ohlcdata",
+            name="volume",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="progappositive",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="spinningtopbottom",
+            name="strength",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="upatoxaccesstoken",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="upatoxaccesstoken",
+            name="issued_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="stock",
+            name="sector",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="bearishengulfing",
+            index=models.Index(
+                fields=["-data_date", "id"], name="bearishengulfing_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bearishengulfing",
+            index=models.Index(
+                fields=["-strength", "id"], name="bearishengulfing_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bearishkicker",
+            index=models.Index(
+                fields=["-data_date", "id"], name="bearishkicker_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bearishkicker",
+            index=models.Index(
+                fields=["-strength", "id"], name="bearishkicker_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bullishengulfing",
+            index=models.Index(
+                fields=["-data_date", "id"], name="bullishengulfing_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bullishengulfing",
+            index=models.Index(
+                fields=["-strength", "id"], name="bullishengulfing_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bullishkicker",
+            index=models.Index(
+                fields=["-data_date", "id"], name="bullishkicker_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bullishkicker",
+            index=models.Index(
+                fields=["-strength", "id"], name="bullishkicker_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doji",
+            index=models.Index(fields=["-data_date", "id"], name="doji_seek_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="doji",
+            index=models.Index(fields=["-strength", "id"], name="doji_strength_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="hammer",
+            index=models.Index(fields=["-data_date", "id"], name="hammer_seek_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="hammer",
+            index=models.Index(fields=["-strength", "id"], name="hammer_strength_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="invertedhammer",
+            index=models.Index(
+                fields=["-data_date", "id"], name="invertedhammer_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invertedhammer",
+            index=models.Index(
+                fields=["-strength", "id"], name="invertedhammer_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ohlcdata",
+            index=models.Index(
+                fields=["stock", "data_date"], name="ohlc_stock_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ohlcdata",
+            index=models.Index(fields=["data_date"], name="ohlc_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="progappositive",
+            index=models.Index(
+                fields=["-data_date", "id"], name="progappositive_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="progappositive",
+            index=models.Index(
+                fields=["-strength", "id"], name="progappositive_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="spinningtopbottom",
+            index=models.Index(
+                fields=["-data_date", "id"], name="spinningtopbottom_seek_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="spinningtopbottom",
+            index=models.Index(
+                fields=["-strength", "id"], name="spinningtopbottom_strength_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patternsummary",
+            index=models.Index(fields=["-data_date"], name="pattern_summary_date_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="patternsummary",
+            constraint=models.UniqueConstraint(
+                fields=("data_date", "pattern", "sector"), name="pattern_summary_unique"
+            ),
+        ),
+        migrations.AddField(
+            model_name="refreshshard",
+            name="run",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="shards",
+                to="candlestick.refreshrun",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sectorbreadth",
+            index=models.Index(
+                fields=["sector", "data_date"], name="sector_breadth_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sectorbreadth",
+            constraint=models.UniqueConstraint(
+                fields=("data_date", "sector"), name="sector_breadth_unique"
+            ),
+        ),
+        migrations.AddField(
+            model_name="timeframecandle",
+            name="stock",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeframe_candles",
+                to="candlestick.stock",
+            ),
+        ),
+        migrations.AddField(
+            model_name="timeframepattern",
+            name="stock",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeframe_patterns",
+                to="candlestick.stock",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="refreshshard",
+            index=models.Index(
+                fields=["run", "status"], name="refresh_shard_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timeframecandle",
+            index=models.Index(
+                fields=["timeframe", "period_start"], name="timeframe_candle_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="timeframecandle",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "timeframe", "period_start"),
+                name="timeframe_candle_unique",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timeframepattern",
+            index=models.Index(
+                fields=["pattern", "timeframe", "-data_date", "id"],
+                name="timeframe_pattern_seek_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timeframepattern",
+            index=models.Index(
+                fields=["pattern", "timeframe", "-strength", "id"],
+                name="timeframe_pattern_strength_idx",
+            ),
+        ),
+    ]
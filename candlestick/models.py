@@ -4,11 +4,21 @@ Defines database models for stock information, OHLC data, and candlestick patter
 Models:
 - Stock: Basic metadata about companies and their stocks.
 - OHLCData: Daily open-high-low-close data for each stock.
+- PatternOccurrence: Abstract base shared by every candlestick pattern model.
 - Multiple candlestick pattern models: Used to record the detection of specific patterns on certain dates.
-- UpatoxAccessToken: Stores the latest Upstox access token for API authentication.
+- UpatoxAccessToken: Stores the Upstox access tokens with their issue and expiry times.
+- DataGeneration: Counter bumped every time a refresh publishes new results.
+- RefreshRun: Progress of one data refresh, streamed to the browser while it runs.
+- RefreshShard: Range of stocks fetched by whichever ingestion worker leases it.
+- PatternSummary: Daily match counts per pattern and sector for the overview pages.
+- SectorBreadth: Daily breadth counts of each sector.
+- TechnicalIndicator: Rolling technical indicators of one daily candle.
+- TimeframeCandle / TimeframePattern: Weekly and monthly candles and their patterns.
+- SchedulerLock: Expiring lock held by the scheduler instance allowed to refresh.
 """
 
 from django.db import models
+from django.utils import timezone
 
 
 # Create your models here.
@@ -25,7 +35,7 @@ class Stock(models.Model):
 
     company_name = models.CharField(max_length=255)
     symbol = models.CharField(max_length=255)
-    sector = models.CharField(max_length=255)
+    sector = models.CharField(max_length=255, db_index=True)
     isin_code = models.CharField(max_length=255, null=True, blank=True)
 
     objects = models.Manager()
@@ -47,6 +57,8 @@ class OHLCData(models.Model):
         close_price (decimal): Closing price.
         high_price (decimal): Highest price.
         low_price (decimal): Lowest price.
+        volume (int): Traded volume.
+        open_interest (int): Open interest, 0 for cash equities.
         stock (ForeignKey): Reference to the related Stock.
     """
 
@@ -55,28 +67,58 @@ class OHLCData(models.Model):
     close_price = models.DecimalField(max_digits=10, decimal_places=2)
     high_price = models.DecimalField(max_digits=10, decimal_places=2)
     low_price = models.DecimalField(max_digits=10, decimal_places=2)
+    volume = models.PositiveBigIntegerField(default=0)
+    open_interest = models.PositiveBigIntegerField(default=0)
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="ohlc_data")
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["stock", "data_date"], name="ohlc_stock_date_idx"),
+            models.Index(fields=["data_date"], name="ohlc_date_idx"),
+        ]
+
 
-class Hammer(models.Model):
+class PatternOccurrence(models.Model):
     """
-    Records the detection of a Hammer candlestick pattern for a given stock on a specific date.
+    Abstract base for candlestick pattern models.
+
+    Every pattern table records one row per (stock, data_date) match. Listing pages
+    page through them newest first using the (data_date, id) seek key, or read the
+    strongest matches first; the indexes below serve both orders directly.
+
+    Fields:
+        data_date (date): The date on which the pattern was detected.
+        strength (float): How pronounced the match is, comparable within a pattern.
     """
 
     data_date = models.DateField()
+    strength = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+        indexes = [
+            models.Index(fields=["-data_date", "id"], name="%(class)s_seek_idx"),
+            models.Index(fields=["-strength", "id"], name="%(class)s_strength_idx"),
+        ]
+
+
+class Hammer(PatternOccurrence):
+    """
+    Records the detection of a Hammer candlestick pattern for a given stock on a specific date.
+    """
+
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="hammer")
 
     objects = models.Manager()
 
 
-class InvertedHammer(models.Model):
+class InvertedHammer(PatternOccurrence):
     """
     Records the detection of an Inverted Hammer candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="inverted_hammer"
     )
@@ -84,23 +126,21 @@ class InvertedHammer(models.Model):
     objects = models.Manager()
 
 
-class Doji(models.Model):
+class Doji(PatternOccurrence):
     """
     Records the detection of a Doji candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="doji")
 
     objects = models.Manager()
 
 
-class SpinningTopBottom(models.Model):
+class SpinningTopBottom(PatternOccurrence):
     """
     Records the detection of a Spinning Top Bottom candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="spinning_top_bottom"
     )
@@ -108,12 +148,11 @@ class SpinningTopBottom(models.Model):
     objects = models.Manager()
 
 
-class ProGapPositive(models.Model):
+class ProGapPositive(PatternOccurrence):
     """
     Records the detection of a Pro Gap Positive pattern (gap-up with momentum).
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="pro_gap_positive"
     )
@@ -121,12 +160,11 @@ class ProGapPositive(models.Model):
     objects = models.Manager()
 
 
-class BullishEngulfing(models.Model):
+class BullishEngulfing(PatternOccurrence):
     """
     Records the detection of a Bullish Engulfing candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="bullish_engulfing"
     )
@@ -134,12 +172,11 @@ class BullishEngulfing(models.Model):
     objects = models.Manager()
 
 
-class BearishEngulfing(models.Model):
+class BearishEngulfing(PatternOccurrence):
     """
     Records the detection of a Bearish Engulfing candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="bearish_engulfing"
     )
@@ -147,12 +184,11 @@ class BearishEngulfing(models.Model):
     objects = models.Manager()
 
 
-class BullishKicker(models.Model):
+class BullishKicker(PatternOccurrence):
     """
     Records the detection of a Bullish Kicker candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="bullish_kicker"
     )
@@ -160,12 +196,11 @@ class BullishKicker(models.Model):
     objects = models.Manager()
 
 
-class BearishKicker(models.Model):
+class BearishKicker(PatternOccurrence):
     """
     Records the detection of a Bearish Kicker candlestick pattern.
     """
 
-    data_date = models.DateField()
     stock = models.ForeignKey(
         Stock, on_delete=models.CASCADE, related_name="bearish_kicker"
     )
@@ -176,8 +211,332 @@ class BearishKicker(models.Model):
 class UpatoxAccessToken(models.Model):
     """
     Stores the current access token required for authenticating with the Upstox API.
+
+    Fields:
+        token (str): The access token.
+        issued_at (datetime): When the token was obtained.
+        expires_at (datetime, optional): When Upstox stops accepting the token.
     """
 
     token = models.TextField()
+    issued_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+
+class DataGeneration(models.Model):
+    """
+    Single-row counter identifying the currently published pattern data.
+
+    The refresh pipeline bumps it when it publishes results. Page caches and ETags
+    are keyed by the generation, so a bump invalidates them all at once.
+
+    Fields:
+        generation (int): Monotonic data generation number.
+        published_at (datetime): When the generation was published.
+    """
+
+    generation = models.PositiveIntegerField(default=0)
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+
+class RefreshRun(models.Model):
+    """
+    Records the progress of one refresh of OHLC data and pattern detection.
+
+    The refresh pipeline updates the row as it goes and the refresh events view
+    polls it to stream progress to the browser.
+
+    Fields:
+        start_date (date): First date being refreshed.
+        end_date (date): Last date being refreshed.
+        status (str): "Running", "Success" or "Error".
+        stage (str): Pipeline stage currently running.
+        stocks_total (int): Number of stocks to fetch.
+        stocks_fetched (int): Stocks fetched so far.
+        stocks_failed (int): Stocks whose fetch failed so far.
+        patterns_found (int): Pattern occurrences detected so far.
+        stage_timings (dict): Seconds spent in each finished stage.
+        message (str): Error message of a failed run.
+    """
+
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=20, default="Running")
+    stage = models.CharField(max_length=50, blank=True)
+    stocks_total = models.PositiveIntegerField(default=0)
+    stocks_fetched = models.PositiveIntegerField(default=0)
+    stocks_failed = models.PositiveIntegerField(default=0)
+    patterns_found = models.PositiveIntegerField(default=0)
+    stage_timings = models.JSONField(default=dict)
+    message = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+
+class RefreshShard(models.Model):
+    """
+    A range of stocks whose candles one ingestion worker fetches for a refresh run.
+
+    Workers lease pending shards, renew the lease after every stock and mark the
+    shard done once its candles are written. A lease that expires, because its
+    worker died, makes the shard claimable again.
+
+    Fields:
+        run (ForeignKey): Refresh run the shard belongs to.
+        first_stock_id (int): Id of the shard's first stock.
+        last_stock_id (int): Id of the shard's last stock.
+        stocks (int): Number of stocks in the shard.
+        status (str): "pending", "leased" or "done".
+        owner (str): Worker holding the lease, "<host>:<pid>".
+        lease_expires_at (datetime): When the lease lapses unless renewed.
+        attempts (int): Number of times the shard was claimed.
+        stocks_fetched (int): Stocks fetched by the current holder.
+        stocks_failed (int): Stocks whose fetch failed for the current holder.
+    """
+
+    run = models.ForeignKey(RefreshRun, on_delete=models.CASCADE, related_name="shards")
+    first_stock_id = models.PositiveBigIntegerField()
+    last_stock_id = models.PositiveBigIntegerField()
+    stocks = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, default="pending")
+    owner = models.CharField(max_length=255, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    stocks_fetched = models.PositiveIntegerField(default=0)
+    stocks_failed = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "status"], name="refresh_shard_status_idx"),
+        ]
+
+
+class PatternSummary(models.Model):
+    """
+    Number of stocks of one sector that printed one pattern on one date.
+
+    Maintained by the refresh pipeline when it publishes detection results, so the
+    overview pages read a handful of rows instead of counting the pattern tables.
+
+    Fields:
+        data_date (date): Date of the occurrences.
+        pattern (str): Pattern slug, a key of candlestick.patterns.PATTERNS.
+        sector (str): Sector of the stocks.
+        count (int): Number of occurrences.
+    """
+
+    data_date = models.DateField()
+    pattern = models.CharField(max_length=50)
+    sector = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data_date", "pattern", "sector"],
+                name="pattern_summary_unique",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["-data_date"], name="pattern_summary_date_idx"),
+        ]
+
+
+class SectorBreadth(models.Model):
+    """
+    Breadth of one sector on one trading day.
+
+    Computed by the refresh pipeline for the dates it ingests only, so breadth
+    history can be charted without rescanning the OHLC table. Percentages are
+    derived from the counts against `stocks`.
+
+    Fields:
+        data_date (date): Trading day.
+        sector (str): Sector name.
+        stocks (int): Stocks of the sector with a candle that day.
+        advances (int): Stocks closing above their previous close.
+        declines (int): Stocks closing below their previous close.
+        bullish (int): Stocks printing at least one bullish pattern.
+        bearish (int): Stocks printing at least one bearish pattern.
+        above_sma20 (int): Stocks closing above their 20-session average close.
+    """
+
+    data_date = models.DateField()
+    sector = models.CharField(max_length=255)
+    stocks = models.PositiveIntegerField(default=0)
+    advances = models.PositiveIntegerField(default=0)
+    declines = models.PositiveIntegerField(default=0)
+    bullish = models.PositiveIntegerField(default=0)
+    bearish = models.PositiveIntegerField(default=0)
+    above_sma20 = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data_date", "sector"], name="sector_breadth_unique"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["sector", "data_date"], name="sector_breadth_idx"),
+        ]
+
+
+class TechnicalIndicator(models.Model):
+    """
+    Technical indicators of one candle.
+
+    Computed by the refresh pipeline for the candles it ingests by advancing each
+    stock's rolling state from its previous row, see candlestick.indicators. Values
+    are null until the stock has enough history for them.
+
+    Fields:
+        candle (OneToOneField): The OHLCData row the values belong to.
+        sma20, sma50, sma200 (float): Simple moving averages of the close.
+        ema20, ema50, ema200 (float): Exponential moving averages of the close.
+        rsi14 (float): 14-session Wilder RSI.
+        atr14 (float): 14-session Wilder average true range.
+        bb_upper, bb_lower (float): Bollinger bands, sma20 +/- 2 standard deviations.
+        relative_volume (float): Volume over the median volume of the previous 20
+            sessions.
+        rsi_avg_gain, rsi_avg_loss (float): Wilder averages the RSI is advanced from.
+        candles (int): Number of candles of the stock up to this one.
+    """
+
+    candle = models.OneToOneField(
+        OHLCData,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="indicators",
+    )
+    sma20 = models.FloatField(null=True, blank=True)
+    sma50 = models.FloatField(null=True, blank=True)
+    sma200 = models.FloatField(null=True, blank=True)
+    ema20 = models.FloatField(null=True, blank=True)
+    ema50 = models.FloatField(null=True, blank=True)
+    ema200 = models.FloatField(null=True, blank=True)
+    rsi14 = models.FloatField(null=True, blank=True)
+    atr14 = models.FloatField(null=True, blank=True)
+    bb_upper = models.FloatField(null=True, blank=True)
+    bb_lower = models.FloatField(null=True, blank=True)
+    relative_volume = models.FloatField(null=True, blank=True)
+    rsi_avg_gain = models.FloatField(null=True, blank=True)
+    rsi_avg_loss = models.FloatField(null=True, blank=True)
+    candles = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+
+class TimeframeCandle(models.Model):
+    """
+    Weekly or monthly candle of a stock resampled from its daily OHLCData.
+
+    The refresh pipeline folds each new daily candle into the bar of its period, so
+    the current week's and month's bars stay up to date without resampling history.
+
+    Fields:
+        stock (ForeignKey): Reference to the related Stock.
+        timeframe (str): "week" or "month".
+        period_start (date): Monday of the week or first day of the month.
+        data_date (date): Last daily candle folded into the bar.
+        open_price, high_price, low_price, close_price (decimal): Prices of the period.
+        volume (int): Traded volume of the period.
+    """
+
+    stock = models.ForeignKey(
+        Stock, on_delete=models.CASCADE, related_name="timeframe_candles"
+    )
+    timeframe = models.CharField(max_length=5)
+    period_start = models.DateField()
+    data_date = models.DateField()
+    open_price = models.DecimalField(max_digits=10, decimal_places=2)
+    high_price = models.DecimalField(max_digits=10, decimal_places=2)
+    low_price = models.DecimalField(max_digits=10, decimal_places=2)
+    close_price = models.DecimalField(max_digits=10, decimal_places=2)
+    volume = models.PositiveBigIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["stock", "timeframe", "period_start"],
+                name="timeframe_candle_unique",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["timeframe", "period_start"], name="timeframe_candle_idx"
+            ),
+        ]
+
+
+class TimeframePattern(models.Model):
+    """
+    Pattern detected on a weekly or monthly candle.
+
+    Higher-timeframe matches of every pattern share this table; data_date is the
+    start of the period, so listing pages page and rank them like the daily
+    pattern tables.
+
+    Fields:
+        stock (ForeignKey): Reference to the related Stock.
+        timeframe (str): "week" or "month".
+        pattern (str): Pattern slug, a key of candlestick.patterns.PATTERNS.
+        data_date (date): Start of the period the pattern completed in.
+        strength (float): How pronounced the match is, comparable within a pattern.
+    """
+
+    stock = models.ForeignKey(
+        Stock, on_delete=models.CASCADE, related_name="timeframe_patterns"
+    )
+    timeframe = models.CharField(max_length=5)
+    pattern = models.CharField(max_length=50)
+    data_date = models.DateField()
+    strength = models.FloatField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["pattern", "timeframe", "-data_date", "id"],
+                name="timeframe_pattern_seek_idx",
+            ),
+            models.Index(
+                fields=["pattern", "timeframe", "-strength", "id"],
+                name="timeframe_pattern_strength_idx",
+            ),
+        ]
+
+
+class SchedulerLock(models.Model):
+    """
+    Expiring lock naming the process allowed to run a scheduled job.
+
+    The holder renews the lock while it runs; a lock whose holder died expires and
+    is taken over by the next instance that asks for it.
+
+    Fields:
+        name (str): Name of the job the lock guards.
+        owner (str): Holder of the lock, "<host>:<pid>".
+        expires_at (datetime): When the lock lapses unless renewed.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    owner = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
 
     objects = models.Manager()
@@ -0,0 +1,246 @@
+"""
+Registry of the candlestick patterns detected by the screener.
+
+Each entry is keyed by the pattern slug used in URLs and maps to its display name,
+the model its occurrences are stored in, the URL name of its listing page and its
+bias ("bullish", "bearish" or "neutral"), which the sector breadth analytics use.
+Views, the API and the analytics modules iterate this registry instead of
+referring to the nine pattern models one by one.
+"""
+
+from datetime import date
+
+from django.db.models import Exists, OuterRef, Q
+
+from .indicators import VOLUME_CONFIRMATION
+from .models import (
+    BearishEngulfing,
+    BearishKicker,
+    BullishEngulfing,
+    BullishKicker,
+    Doji,
+    Hammer,
+    InvertedHammer,
+    ProGapPositive,
+    SpinningTopBottom,
+    TechnicalIndicator,
+    TimeframePattern,
+)
+
+PATTERNS = {
+    "hammer": {
+        "name": "Hammer",
+        "model": Hammer,
+        "uri": "Hammer-Page",
+        "bias": "bullish",
+    },
+    "inverted-hammer": {
+        "name": "Inverted Hammer",
+        "model": InvertedHammer,
+        "uri": "Inverted-Hammer-Page",
+        "bias": "bullish",
+    },
+    "doji": {
+        "name": "Doji",
+        "model": Doji,
+        "uri": "Doji-Page",
+        "bias": "neutral",
+    },
+    "spinning-top-bottom": {
+        "name": "Spinning Top Bottom",
+        "model": SpinningTopBottom,
+        "uri": "Spinning-Top-Bottom-Page",
+        "bias": "neutral",
+    },
+    "pro-gap-positive": {
+        "name": "Pro Gap Positive",
+        "model": ProGapPositive,
+        "uri": "Pro-Gap-Page",
+        "bias": "bullish",
+    },
+    "bullish-kicker": {
+        "name": "Bullish Kicker",
+        "model": BullishKicker,
+        "uri": "Bullish-Kicker-Page",
+        "bias": "bullish",
+    },
+    "bullish-engulfing": {
+        "name": "Bullish Engulfing",
+        "model": BullishEngulfing,
+        "uri": "Bullish-Engulfing-Page",
+        "bias": "bullish",
+    },
+    "bearish-kicker": {
+        "name": "Bearish Kicker",
+        "model": BearishKicker,
+        "uri": "Bearish-Kicker-Page",
+        "bias": "bearish",
+    },
+    "bearish-engulfing": {
+        "name": "Bearish Engulfing",
+        "model": BearishEngulfing,
+        "uri": "Bearish-Engulfing-Page",
+        "bias": "bearish",
+    },
+}
+
+PAGE_SIZE = 50
+
+
+PATTERN_ORDERINGS = {
+    "date": ("-data_date", "id"),
+    "strength": ("-strength", "id"),
+}
+MAX_TOP_K = 500
+
+
+def volume_confirmed(queryset):
+    """
+    Keeps the occurrences printed on a volume of at least VOLUME_CONFIRMATION times
+    the stock's 20-session median volume.
+
+    Args:
+        queryset (QuerySet): Occurrences of a pattern model.
+
+    Returns:
+        QuerySet: The volume-confirmed occurrences.
+    """
+    return queryset.filter(
+        Exists(
+            TechnicalIndicator.objects.filter(
+                candle__stock_id=OuterRef("stock_id"),
+                candle__data_date=OuterRef("data_date"),
+                relative_volume__gte=VOLUME_CONFIRMATION,
+            )
+        )
+    )
+
+
+def get_pattern_queryset(
+    pattern, sector=None, data_date=None, sort="date", confirmed=False, timeframe="day"
+):
+    """
+    Builds the listing queryset for a pattern, newest or strongest first.
+
+    The stock is joined in the same query and only the columns shown on the
+    listing page are loaded, so rendering never goes back to the database per row.
+    Both orders are served by an index of the pattern table, so slicing the
+    strength order gives the top K matches without sorting the whole table.
+
+    Args:
+        pattern (str): Pattern slug, a key of PATTERNS.
+        sector (str, optional): Only keep stocks from this sector.
+        data_date (str, optional): Only keep matches from this date ('YYYY-MM-DD').
+        sort (str): "date" for (-data_date, id) or "strength" for (-strength, id).
+        confirmed (bool): Only keep volume-confirmed matches, see volume_confirmed;
+            daily matches only.
+        timeframe (str): "day" for the pattern's table, "week" or "month" for its
+            TimeframePattern rows, whose data_date is the start of the period.
+
+    Returns:
+        QuerySet: Pattern occurrences in the requested order.
+    """
+    if timeframe == "day":
+        queryset = PATTERNS[pattern]["model"].objects.all()
+    else:
+        queryset = TimeframePattern.objects.filter(pattern=pattern, timeframe=timeframe)
+    queryset = (
+        queryset.select_related("stock")
+        .only(
+            "id",
+            "data_date",
+            "strength",
+            "stock__symbol",
+            "stock__company_name",
+            "stock__sector",
+        )
+        .order_by(*PATTERN_ORDERINGS[sort])
+    )
+    if sector:
+        queryset = queryset.filter(stock__sector=sector)
+    if data_date:
+        queryset = queryset.filter(data_date=data_date)
+    if confirmed and timeframe == "day":
+        queryset = volume_confirmed(queryset)
+    return queryset
+
+
+def parse_cursor(cursor):
+    """
+    Parses a seek cursor of the form 'YYYY-MM-DD_id'.
+
+    Args:
+        cursor (str): Cursor taken from the query string.
+
+    Returns:
+        tuple: (date, int) position of the last row already shown, or None if the
+        cursor is missing or malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        data_date, row_id = cursor.split("_", 1)
+        return date.fromisoformat(data_date), int(row_id)
+    except ValueError:
+        return None
+
+
+def seek_queryset(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    Narrows a queryset ordered by (-data_date, id) to the page after the cursor.
+
+    Rows after the cursor are selected with a range condition on the seek key
+    instead of an OFFSET, so every page costs the same no matter how deep it is.
+    One extra row is included to tell whether another page follows.
+
+    Args:
+        queryset (QuerySet): Queryset from get_pattern_queryset.
+        cursor (str, optional): Cursor of the last row on the previous page.
+        page_size (int): Number of rows per page.
+
+    Returns:
+        QuerySet: At most page_size + 1 rows.
+    """
+    position = parse_cursor(cursor)
+    if position:
+        last_date, last_id = position
+        queryset = queryset.filter(
+            Q(data_date__lt=last_date) | Q(data_date=last_date, id__gt=last_id)
+        )
+    return queryset[: page_size + 1]
+
+
+def split_page(rows, page_size=PAGE_SIZE):
+    """
+    Splits the rows of seek_queryset into the page and the cursor of the next one.
+
+    Args:
+        rows (list): Rows fetched from seek_queryset.
+        page_size (int): Number of rows per page.
+
+    Returns:
+        tuple: (list of rows, cursor of the next page or None on the last page).
+    """
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = f"{last.data_date.isoformat()}_{last.id}"
+    return rows, next_cursor
+
+
+async def aseek_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    Returns one page of a queryset ordered by (-data_date, id) using keyset pagination,
+    reading the rows with the async ORM.
+
+    Args:
+        queryset (QuerySet): Queryset from get_pattern_queryset.
+        cursor (str, optional): Cursor of the last row on the previous page.
+        page_size (int): Number of rows per page.
+
+    Returns:
+        tuple: (list of rows, cursor of the next page or None on the last page).
+    """
+    rows = [row async for row in seek_queryset(queryset, cursor, page_size).aiterator()]
+    return split_page(rows, page_size)
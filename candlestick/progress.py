@@ -0,0 +1,226 @@
+"""
+Progress reporting for data refresh runs.
+
+The refresh pipeline reports through a RefreshProgress, which keeps counters in
+memory and writes them to the run's RefreshRun row at most a few times per second.
+The refresh events view polls that row and streams it to the browser as
+Server-Sent Events, so progress is visible from any worker process. The stream
+comes as a sync and an async generator because each server type buffers the other
+kind whole: WSGI consumes an async generator to the end before sending it, and
+ASGI does the same with a sync one.
+"""
+
+import asyncio
+import json
+import time
+
+from django.utils import timezone
+
+from .models import RefreshRun
+
+FLUSH_INTERVAL = 0.5
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 15
+STREAM_TIMEOUT = 60 * 60
+
+
+class RefreshProgress:
+    """
+    Reports the progress of one refresh run.
+
+    Args:
+        start_date (str): First date being refreshed ('YYYY-MM-DD').
+        end_date (str): Last date being refreshed ('YYYY-MM-DD').
+    """
+
+    def __init__(self, start_date, end_date):
+        self.run = RefreshRun.objects.create(start_date=start_date, end_date=end_date)
+        self.stocks_total = 0
+        self.stocks_fetched = 0
+        self.stocks_failed = 0
+        self.patterns_found = 0
+        self.stage_timings = {}
+        self.current_stage = ""
+        self.stage_started = time.perf_counter()
+        self.last_flush = 0.0
+
+    def stage(self, name):
+        """
+        Marks the start of a pipeline stage, closing the timing of the previous one.
+        """
+        self._close_stage()
+        self.current_stage = name
+        self.stage_started = time.perf_counter()
+        self.flush(force=True)
+
+    def set_stocks_total(self, stocks_total):
+        """
+        Records how many stocks the run will fetch.
+        """
+        self.stocks_total = stocks_total
+        self.flush(force=True)
+
+    def set_fetch_counts(self, stocks_fetched, stocks_failed):
+        """
+        Records how many stocks every ingestion worker fetched and failed so far.
+        """
+        self.stocks_fetched = stocks_fetched
+        self.stocks_failed = stocks_failed
+        self.flush()
+
+    def found_patterns(self, count):
+        """
+        Adds newly detected pattern occurrences.
+        """
+        self.patterns_found += count
+        self.flush()
+
+    def finish(self, status, message=""):
+        """
+        Closes the last stage and records the final status of the run.
+
+        Args:
+            status (str): "Success" or "Error".
+            message (str): Error message for a failed run.
+        """
+        self._close_stage()
+        self.current_stage = ""
+        RefreshRun.objects.filter(pk=self.run.pk).update(
+            **self._fields(),
+            status=status,
+            message=message,
+            finished_at=timezone.now(),
+        )
+
+    def flush(self, force=False):
+        """
+        Writes the counters to the run row, throttled to one write per FLUSH_INTERVAL.
+        """
+        now = time.perf_counter()
+        if not force and now - self.last_flush < FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        RefreshRun.objects.filter(pk=self.run.pk).update(**self._fields())
+
+    def _close_stage(self):
+        if self.current_stage:
+            self.stage_timings[self.current_stage] = round(
+                time.perf_counter() - self.stage_started, 3
+            )
+
+    def _fields(self):
+        return {
+            "stage": self.current_stage,
+            "stocks_total": self.stocks_total,
+            "stocks_fetched": self.stocks_fetched,
+            "stocks_failed": self.stocks_failed,
+            "patterns_found": self.patterns_found,
+            "stage_timings": self.stage_timings,
+            "updated_at": timezone.now(),
+        }
+
+
+def serialize_run(run):
+    """
+    Converts a RefreshRun into the JSON payload of a progress event.
+    """
+    return {
+        "id": run.id,
+        "status": run.status,
+        "stage": run.stage,
+        "start_date": run.start_date.isoformat(),
+        "end_date": run.end_date.isoformat(),
+        "stocks_total": run.stocks_total,
+        "stocks_fetched": run.stocks_fetched,
+        "stocks_failed": run.stocks_failed,
+        "patterns_found": run.patterns_found,
+        "stage_timings": run.stage_timings,
+        "message": run.message,
+    }
+
+
+class RefreshEventFollower:
+    """
+    Turns successive reads of the newest RefreshRun into Server-Sent Events.
+
+    Follows the newest run that is still running or finishes after the stream was
+    opened, so a client can subscribe just before submitting a refresh. A
+    "progress" event is sent whenever the run row changes and a final "done" event
+    once it finishes; comment lines keep idle connections alive. Shared by the sync
+    and async streams, which only differ in how they read the row and sleep.
+    """
+
+    def __init__(self):
+        self.opened_at = timezone.now()
+        self.deadline = time.monotonic() + STREAM_TIMEOUT
+        self.last_sent = time.monotonic()
+        self.last_update = None
+        self.done = False
+
+    @property
+    def running(self):
+        """
+        Whether the stream should keep polling.
+        """
+        return not self.done and time.monotonic() < self.deadline
+
+    def events(self, run):
+        """
+        Returns the encoded events announcing the state of the newest run.
+
+        Args:
+            run (RefreshRun): Newest run, or None.
+
+        Returns:
+            list: Encoded Server-Sent Events, empty when nothing changed.
+        """
+        is_current = run is not None and (
+            run.finished_at is None or run.finished_at >= self.opened_at
+        )
+        if is_current and run.updated_at != self.last_update:
+            self.last_update = run.updated_at
+            self.last_sent = time.monotonic()
+            events = [f"event: progress\ndata: {json.dumps(serialize_run(run))}\n\n"]
+            if run.finished_at is not None:
+                self.done = True
+                events.append(
+                    f"event: done\ndata: {json.dumps({'status': run.status})}\n\n"
+                )
+            return events
+        if time.monotonic() - self.last_sent > HEARTBEAT_INTERVAL:
+            self.last_sent = time.monotonic()
+            return [": keep-alive\n\n"]
+        return []
+
+
+def refresh_event_stream():
+    """
+    Streams the progress of the current refresh run as Server-Sent Events.
+
+    Synchronous version for WSGI servers, which send each chunk of a sync
+    generator as it is produced but hold a worker thread while the stream is open.
+
+    Yields:
+        str: Encoded Server-Sent Events.
+    """
+    follower = RefreshEventFollower()
+    while follower.running:
+        yield from follower.events(RefreshRun.objects.order_by("-id").first())
+        if follower.running:
+            time.sleep(POLL_INTERVAL)
+
+
+async def arefresh_event_stream():
+    """
+    Async version of refresh_event_stream for ASGI servers, which stream an async
+    generator without holding a thread.
+
+    Yields:
+        str: Encoded Server-Sent Events.
+    """
+    follower = RefreshEventFollower()
+    while follower.running:
+        for event in follower.events(await RefreshRun.objects.order_by("-id").afirst()):
+            yield event
+        if follower.running:
+            await asyncio.sleep(POLL_INTERVAL)
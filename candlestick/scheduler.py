@@ -0,0 +1,359 @@
+"""
+End-of-day refresh scheduler.
+
+The run_scheduler command keeps a Scheduler polling: once the run time has passed
+on a trading session, it runs the refresh pipeline for every session missing since
+the latest stored candle, so a scheduler coming back from downtime catches up in
+one batched refresh. A session is complete when at least MIN_COVERAGE of the stocks
+have its candle; while Upstox has not published all of them the refresh is retried
+with jittered exponential backoff, and the last stored session is fetched again on
+the next pass if it was left incomplete.
+
+Every refresh, scheduled or started from the patterns page with start_refresh(),
+runs under the "refresh" SchedulerLock row, so only one runs at a time across all
+processes. Several scheduler instances may run for failover: whichever takes the
+lock when a session is due refreshes it, the others find it held or the data
+complete. The holder renews the lock while it waits and while a refresh runs, and
+another instance takes over once the lock of a dead holder expires. A holder that
+fails to renew, e.g. after stalling past LOCK_TTL, flags the lock as lost: the
+refresh in progress finishes, but it is neither retried nor given up on, as the new
+holder fetches the same sessions.
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import time as clock_time
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ingestion import worker_name
+from .models import OHLCData, SchedulerLock, Stock
+from .trading_calendar import get_trading_calendar
+from .utils import refresh_candlestick_data
+
+LOCK_NAME = "refresh"
+LOCK_TTL = timedelta(minutes=5)
+POLL_INTERVAL = 60
+RUN_AT = clock_time(16, 0)
+RETRIES = 6
+RETRY_DELAY = 300
+MAX_RETRY_DELAY = 60 * 60
+# share of the stocks that must have a session's candle for it to be complete
+MIN_COVERAGE = 0.95
+# refresh() result when the lock was lost while the refresh ran
+LOCK_LOST = "Lock Lost"
+
+
+def acquire_lock(name, owner, ttl=LOCK_TTL):
+    """
+    Takes or renews a lock if it is free, expired or already held by the owner.
+
+    Args:
+        name (str): Name of the lock.
+        owner (str): Identity of the caller.
+        ttl (timedelta): How long the lock is held unless renewed.
+
+    Returns:
+        bool: True if the caller holds the lock.
+    """
+    now = timezone.now()
+    taken = (
+        SchedulerLock.objects.filter(name=name)
+        .filter(Q(owner=owner) | Q(expires_at__lt=now))
+        .update(owner=owner, expires_at=now + ttl)
+    )
+    if taken:
+        return True
+    try:
+        # a savepoint keeps a lost race from breaking the caller's transaction
+        with transaction.atomic():
+            SchedulerLock.objects.create(name=name, owner=owner, expires_at=now + ttl)
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_lock(name, owner):
+    """
+    Releases a lock held by the owner.
+    """
+    SchedulerLock.objects.filter(name=name, owner=owner).delete()
+
+
+@contextmanager
+def heartbeat(renew):
+    """
+    Calls renew every POLL_INTERVAL from a background thread until it returns False
+    or the block exits.
+    """
+    stopped = threading.Event()
+
+    def beat():
+        while not stopped.wait(POLL_INTERVAL):
+            if not renew():
+                break
+        connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def start_refresh(start_date, end_date):
+    """
+    Runs refresh_candlestick_data in a background thread under the refresh lock.
+
+    The page that starts a refresh returns at once and follows the run through the
+    refresh events stream instead of waiting for it. The lock is the one scheduled
+    refreshes take, so a refresh started here never overlaps another one, in this
+    or any other process.
+
+    Args:
+        start_date (str): First session to fetch ('YYYY-MM-DD').
+        end_date (str): Last session to fetch ('YYYY-MM-DD').
+
+    Returns:
+        bool: False if another refresh holds the lock.
+    """
+    logger = logging.getLogger("stock_screener_logger")
+    # unique per refresh, so two requests of one process don't share the lock
+    owner = f"{worker_name()}:{uuid.uuid4().hex[:8]}"
+    if not acquire_lock(LOCK_NAME, owner):
+        return False
+
+    def renew():
+        if acquire_lock(LOCK_NAME, owner):
+            return True
+        logger.error("Refresh lock lost to another instance")
+        return False
+
+    def run():
+        try:
+            with heartbeat(renew):
+                refresh_candlestick_data(start_date=start_date, end_date=end_date)
+        finally:
+            release_lock(LOCK_NAME, owner)
+            connection.close()
+
+    threading.Thread(target=run, name="refresh", daemon=True).start()
+    return True
+
+
+def session_coverage(data_date):
+    """
+    Returns the share of stocks that have a candle on the date.
+    """
+    stocks = Stock.objects.count()
+    if not stocks:
+        return 1.0
+    return OHLCData.objects.filter(data_date=data_date).count() / stocks
+
+
+def due_session(now, run_at=RUN_AT):
+    """
+    Returns the latest session whose scheduled run time has passed.
+
+    Args:
+        now (datetime): Current local time.
+        run_at (time): Time of day a session's refresh runs.
+
+    Returns:
+        date: The session, or None before the first one.
+    """
+    calendar = get_trading_calendar()
+    today = now.date()
+    session = calendar.session_on_or_before(today)
+    if session == today and now.time() < run_at:
+        session = calendar.previous_session(today)
+    return session
+
+
+def pending_sessions(due):
+    """
+    Returns the sessions to refresh so the data is complete up to the due session.
+
+    The range starts after the latest stored candle, or on it when that session is
+    incomplete; with no data stored yet only the due session is fetched.
+
+    Args:
+        due (date): Last session that should be stored.
+
+    Returns:
+        tuple: (start date, end date) as 'YYYY-MM-DD' strings, or None when the
+        data is complete.
+    """
+    latest = (
+        OHLCData.objects.order_by("-data_date")
+        .values_list("data_date", flat=True)
+        .first()
+    )
+    if latest is None:
+        start = due
+    elif session_coverage(latest) < MIN_COVERAGE:
+        start = latest
+    else:
+        start = get_trading_calendar().next_session(latest)
+    if start is None or start > due:
+        return None
+    return start.isoformat(), due.isoformat()
+
+
+class Scheduler:
+    """
+    Runs the refresh pipeline after market close on trading sessions.
+
+    Attributes:
+        owner (str): Lock owner identity, "<host>:<pid>".
+        run_at (time): Time of day a session's refresh runs.
+        retries (int): Retries of a refresh whose data is incomplete.
+        retry_delay (int): Base delay in seconds before the first retry.
+        abandoned (date): Due session given up on after the retries ran out, not
+            retried until the next session is due.
+        lock_lost (Event): Set when a renewal of the lock failed, cleared when the
+            lock is taken again.
+    """
+
+    def __init__(self, run_at=RUN_AT, retries=RETRIES, retry_delay=RETRY_DELAY):
+        self.owner = worker_name()
+        self.run_at = run_at
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.abandoned = None
+        self.lock_lost = threading.Event()
+        self.logger = logging.getLogger("stock_screener_logger")
+
+    def hold_lock(self):
+        """
+        Takes or renews the scheduler lock, returning whether it is held.
+        """
+        return acquire_lock(LOCK_NAME, self.owner)
+
+    def renew_lock(self):
+        """
+        Renews the lock held for a run, flagging it as lost if another instance took
+        it over.
+
+        Returns:
+            bool: False if the lock is lost.
+        """
+        if self.lock_lost.is_set():
+            return False
+        if self.hold_lock():
+            return True
+        self.lock_lost.set()
+        self.logger.error("Scheduler lock lost to another instance")
+        return False
+
+    def release(self):
+        """
+        Releases the scheduler lock.
+        """
+        release_lock(LOCK_NAME, self.owner)
+
+    def wait(self, seconds):
+        """
+        Sleeps, renewing the lock every POLL_INTERVAL.
+
+        Returns:
+            bool: False if the lock was lost while waiting.
+        """
+        deadline = time.monotonic() + seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            time.sleep(min(POLL_INTERVAL, remaining))
+            if not self.renew_lock():
+                return False
+        return True
+
+    def refresh(self, start_date, end_date):
+        """
+        Runs one refresh while a heartbeat thread keeps the lock renewed.
+
+        Returns:
+            str: Result of refresh_candlestick_data(), or LOCK_LOST if a renewal
+            failed while it ran.
+        """
+        with heartbeat(self.renew_lock):
+            result = refresh_candlestick_data(start_date=start_date, end_date=end_date)
+        return LOCK_LOST if self.lock_lost.is_set() else result
+
+    def run(self, start_date, end_date):
+        """
+        Refreshes the sessions, retrying with jittered backoff until the last one
+        is complete.
+
+        Returns:
+            bool: True once the data is complete.
+        """
+        for attempt in range(self.retries + 1):
+            result = self.refresh(start_date, end_date)
+            if result == LOCK_LOST:
+                self.logger.warning("Scheduler lock lost, stopping retries")
+                return False
+            coverage = session_coverage(end_date)
+            if result == "Success" and coverage >= MIN_COVERAGE:
+                return True
+            if attempt == self.retries:
+                break
+            # full jitter keeps several failing schedulers from retrying in step
+            delay = random.uniform(
+                0, min(MAX_RETRY_DELAY, self.retry_delay * 2**attempt)
+            )
+            self.logger.warning(  # pylint: disable=W1203
+                f"Refresh of {start_date} to {end_date} incomplete ({result}, "
+                f"{coverage:.0%} of stocks), retrying in {delay:.0f}s"
+            )
+            if not self.wait(delay):
+                self.logger.warning("Scheduler lock lost, stopping retries")
+                return False
+        return False
+
+    def tick(self, now=None):
+        """
+        Refreshes the pending sessions if a session is due and the lock is free.
+
+        The lock is held from the first attempt until the last retry, and released
+        afterwards so a refresh can be started from the patterns page.
+
+        Returns:
+            bool: True if a refresh ran.
+        """
+        due = due_session(now or timezone.localtime(), self.run_at)
+        if due is None or due == self.abandoned:
+            return False
+        sessions = pending_sessions(due)
+        if sessions is None or not self.hold_lock():
+            return False
+        self.lock_lost.clear()
+        self.logger.info(  # pylint: disable=W1203
+            f"Scheduled refresh of {sessions[0]} to {sessions[1]} starting"
+        )
+        try:
+            completed = self.run(*sessions)
+        finally:
+            self.release()
+        if not completed and not self.lock_lost.is_set():
+            self.abandoned = due
+            self.logger.error(  # pylint: disable=W1203
+                f"Scheduled refresh of {sessions[0]} to {sessions[1]} gave up "
+                f"after {self.retries} retries"
+            )
+        return True
+
+    def run_forever(self):
+        """
+        Polls every POLL_INTERVAL until interrupted.
+        """
+        while True:
+            self.tick()
+            time.sleep(POLL_INTERVAL)
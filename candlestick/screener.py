@@ -0,0 +1,366 @@
+"""
+Multi-criteria stock screener.
+
+Screens combine pattern, sector and close price conditions with and/or/not, e.g.
+"Hammer today AND Bullish Engulfing in the previous session, in sector IT, close > 500":
+
+    {
+        "and": [
+            {"pattern": "hammer"},
+            {"pattern": "bullish-engulfing", "session": 1},
+            {"sector": "IT"},
+            {"close": {"gt": 500}}
+        ]
+    }
+
+`session` counts trading sessions back from the anchor date (0, the default, is the
+anchor itself). Pattern nodes may also ask for history: {"pattern": "doji",
+"min_count": 3, "last": 10} or {"pattern": "doji", "streak": 2}, answered from the
+pattern bitset index.
+
+Close price and technical indicator conditions compare a field with a number or with
+another field, e.g. "Hammer in a downtrend with RSI below 30":
+
+    {
+        "and": [
+            {"pattern": "hammer"},
+            {"close": {"lt": "sma50"}},
+            {"rsi14": {"lt": 30}}
+        ]
+    }
+
+The indicator fields are those stored per candle by candlestick.indicators, and
+"volume" compares the raw volume. A pattern node with "volume_confirmed": true only
+keeps matches printed on at least VOLUME_CONFIRMATION times the 20-session median
+volume, and {"volume_spike": true} (or {"volume_spike": 3} for a custom ratio) keeps
+stocks trading at least VOLUME_SPIKE times their median volume.
+
+Pattern and sector conditions are answered from a PatternSetIndex of stock-id sets
+built once per data generation, so combining them is plain set algebra in memory
+rather than a chain of SQL joins.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import date
+
+from django.db.models import F
+
+from .bitset_index import get_bitset_index
+from .caching import get_data_generation
+from .indicators import INDICATOR_FIELDS, VOLUME_CONFIRMATION, VOLUME_SPIKE
+from .models import OHLCData, Stock
+from .patterns import PATTERNS
+from .trading_calendar import get_trading_calendar
+
+COMPARISONS = ("gt", "gte", "lt", "lte")
+# stock ids per IN query of the results, below SQLite's bound variable limit
+STOCK_BATCH = 500
+# node key -> OHLCData lookup of the compared value
+FIELDS = {
+    "close": "close_price",
+    "volume": "volume",
+    **{name: f"indicators__{name}" for name in INDICATOR_FIELDS},
+}
+
+
+class ScreenerQueryError(ValueError):
+    """
+    Raised when a screener query is malformed.
+    """
+
+
+class PatternSetIndex:
+    """
+    In-memory index of the stock ids matching each pattern on each date.
+
+    Attributes:
+        generation (int): Data generation the index was built from.
+        occurrences (dict): (pattern slug, date) -> frozenset of stock ids.
+        sessions (list): Trading dates with OHLC data, oldest first.
+        sectors (dict): Sector name -> frozenset of stock ids.
+        universe (frozenset): Every stock id, used to evaluate "not".
+    """
+
+    def __init__(self, generation, occurrences, sessions, sectors, universe):
+        self.generation = generation
+        self.occurrences = occurrences
+        self.sessions = sessions
+        self.session_positions = {day: i for i, day in enumerate(sessions)}
+        self.sectors = sectors
+        self.universe = universe
+
+    @classmethod
+    def build(cls, generation):
+        """
+        Builds the index from the pattern tables with one query per pattern.
+
+        Args:
+            generation (int): Data generation being indexed.
+
+        Returns:
+            PatternSetIndex: The built index.
+        """
+        occurrences = {}
+        for slug, pattern in PATTERNS.items():
+            by_date = defaultdict(set)
+            for data_date, stock_id in pattern["model"].objects.values_list(
+                "data_date", "stock_id"
+            ):
+                by_date[data_date].add(stock_id)
+            for data_date, stock_ids in by_date.items():
+                occurrences[(slug, data_date)] = frozenset(stock_ids)
+
+        sectors = defaultdict(set)
+        for stock_id, sector in Stock.objects.values_list("id", "sector"):
+            sectors[sector].add(stock_id)
+
+        sessions = list(
+            OHLCData.objects.order_by("data_date")
+            .values_list("data_date", flat=True)
+            .distinct()
+        )
+        return cls(
+            generation=generation,
+            occurrences=occurrences,
+            sessions=sessions,
+            sectors={name: frozenset(ids) for name, ids in sectors.items()},
+            universe=frozenset().union(*sectors.values()),
+        )
+
+    def pattern(self, slug, data_date):
+        """
+        Returns the stock ids that printed the pattern on the date.
+        """
+        return self.occurrences.get((slug, data_date), frozenset())
+
+    def sector(self, name):
+        """
+        Returns the stock ids of the sector.
+        """
+        return self.sectors.get(name, frozenset())
+
+    def session(self, anchor, offset):
+        """
+        Returns the trading date `offset` sessions before the anchor, or None.
+        """
+        position = self.session_positions.get(anchor)
+        if position is None or position - offset < 0:
+            return None
+        return self.sessions[position - offset]
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def get_pattern_index():
+    """
+    Returns the PatternSetIndex of the current data generation.
+
+    The index is rebuilt in this process the first time it is requested after a
+    refresh publishes a new generation and reused until the next one.
+
+    Returns:
+        PatternSetIndex: Index for the current generation.
+    """
+    global _index  # pylint: disable=W0603
+    generation = get_data_generation()[0]
+    with _index_lock:
+        if _index is None or _index.generation != generation:
+            _index = PatternSetIndex.build(generation)
+        return _index
+
+
+def evaluate(node, index, anchor):
+    """
+    Evaluates one node of a screener query.
+
+    Args:
+        node (dict): Query node (and, or, not, pattern, sector, volume_spike, close,
+            volume or an indicator).
+        index (PatternSetIndex): Index to answer pattern and sector conditions.
+        anchor (date): Trading date that session 0 refers to.
+
+    Returns:
+        frozenset: Stock ids matching the node.
+
+    Raises:
+        ScreenerQueryError: If the node is malformed.
+    """
+    if not isinstance(node, dict):
+        raise ScreenerQueryError("Every query node must be an object.")
+
+    if "and" in node or "or" in node:
+        operator = "and" if "and" in node else "or"
+        children = node[operator]
+        if not isinstance(children, list) or not children:
+            raise ScreenerQueryError(f"'{operator}' needs a non-empty list.")
+        results = [evaluate(child, index, anchor) for child in children]
+        if operator == "and":
+            # intersect smallest sets first
+            results.sort(key=len)
+            return frozenset.intersection(*results)
+        return frozenset.union(*results)
+
+    if "not" in node:
+        return index.universe - evaluate(node["not"], index, anchor)
+
+    if "sector" in node:
+        return index.sector(node["sector"])
+
+    offset = node.get("session", 0)
+    if not isinstance(offset, int) or offset < 0:
+        raise ScreenerQueryError("'session' must be a non-negative integer.")
+    data_date = index.session(anchor, offset)
+
+    if "pattern" in node:
+        if node["pattern"] not in PATTERNS:
+            raise ScreenerQueryError(f"Unknown pattern '{node['pattern']}'.")
+        if "min_count" in node or "streak" in node:
+            return evaluate_history(node, data_date)
+        if data_date is None:
+            return frozenset()
+        matches = index.pattern(node["pattern"], data_date)
+        if node.get("volume_confirmed"):
+            matches &= relative_volume_at_least(data_date, VOLUME_CONFIRMATION)
+        return matches
+
+    if "volume_spike" in node:
+        ratio = node["volume_spike"]
+        if ratio is True:
+            ratio = VOLUME_SPIKE
+        if isinstance(ratio, bool) or not isinstance(ratio, (int, float)) or ratio <= 0:
+            raise ScreenerQueryError("'volume_spike' must be true or a positive ratio.")
+        if data_date is None:
+            return frozenset()
+        return relative_volume_at_least(data_date, ratio)
+
+    field = next((name for name in FIELDS if name in node), None)
+    if field:
+        condition = node[field]
+        if not isinstance(condition, dict) or not condition:
+            raise ScreenerQueryError(f"'{field}' needs an object like {{\"gt\": 500}}.")
+        lookups = {}
+        for operator, value in condition.items():
+            if operator not in COMPARISONS:
+                raise ScreenerQueryError(f"Invalid {field} condition '{operator}'.")
+            if isinstance(value, str) and value in FIELDS:
+                value = F(FIELDS[value])
+            elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ScreenerQueryError(
+                    f"'{field}' can be compared with a number or one of "
+                    f"{', '.join(FIELDS)}."
+                )
+            lookups[f"{FIELDS[field]}__{operator}"] = value
+        if data_date is None:
+            return frozenset()
+        return frozenset(
+            OHLCData.objects.filter(data_date=data_date, **lookups).values_list(
+                "stock_id", flat=True
+            )
+        )
+
+    raise ScreenerQueryError(f"Unknown query node {sorted(node)}.")
+
+
+def relative_volume_at_least(data_date, ratio):
+    """
+    Returns the stock ids whose volume on the date was at least `ratio` times their
+    20-session median volume.
+    """
+    return frozenset(
+        OHLCData.objects.filter(
+            data_date=data_date, indicators__relative_volume__gte=ratio
+        ).values_list("stock_id", flat=True)
+    )
+
+
+def evaluate_history(node, data_date):
+    """
+    Evaluates a frequency or streak condition on the pattern bitset index.
+
+    {"pattern": "doji", "min_count": 3, "last": 10} keeps stocks with a Doji on at
+    least 3 of the 10 sessions ending at the node's session; {"pattern": "doji",
+    "streak": 3} keeps stocks with a Doji on each of the 3 sessions ending there.
+
+    Args:
+        node (dict): Pattern node with min_count/last or streak.
+        data_date (date): Last session of the window, or None.
+
+    Returns:
+        frozenset: Stock ids matching the node.
+
+    Raises:
+        ScreenerQueryError: If the counts are not positive integers.
+    """
+    counts = [
+        node.get(name) for name in ("min_count", "last", "streak") if name in node
+    ]
+    if not all(isinstance(value, int) and value > 0 for value in counts):
+        raise ScreenerQueryError(
+            "'min_count', 'last' and 'streak' must be positive integers."
+        )
+    if data_date is None:
+        return frozenset()
+
+    history = get_bitset_index()
+    if "streak" in node:
+        return history.streak_screen(node["pattern"], data_date, node["streak"])
+    if "last" not in node:
+        raise ScreenerQueryError(
+            "'min_count' needs 'last', the window length in sessions."
+        )
+    return history.frequency_screen(
+        node["pattern"], data_date, node["last"], node["min_count"]
+    )
+
+
+def run_screener(query, anchor=None):
+    """
+    Runs a screener query.
+
+    Args:
+        query (dict): Root query node.
+        anchor (str, optional): 'YYYY-MM-DD' date of session 0, default the latest
+            session. A date the exchange is closed on refers to the session before it.
+
+    Returns:
+        dict: Anchor date and the matching stocks ordered by symbol.
+
+    Raises:
+        ScreenerQueryError: If the query or the anchor date is invalid, or no candles
+            are stored for the anchor session.
+    """
+    index = get_pattern_index()
+    if anchor:
+        try:
+            anchor = date.fromisoformat(anchor)
+        except (TypeError, ValueError) as e:
+            raise ScreenerQueryError("'date' must be in YYYY-MM-DD format.") from e
+        # weekends and holidays screen the session before them
+        try:
+            anchor = get_trading_calendar().session_on_or_before(anchor)
+        except ValueError as e:
+            raise ScreenerQueryError(str(e)) from e
+        if anchor not in index.session_positions:
+            raise ScreenerQueryError(
+                f"No candles are stored for the session of {anchor}."
+            )
+    elif index.sessions:
+        anchor = index.sessions[-1]
+
+    stock_ids = sorted(evaluate(query, index, anchor))
+    stocks = []
+    for first in range(0, len(stock_ids), STOCK_BATCH):
+        stocks.extend(
+            Stock.objects.filter(id__in=stock_ids[first : first + STOCK_BATCH]).values(
+                "id", "symbol", "company_name", "sector"
+            )
+        )
+    stocks.sort(key=lambda stock: stock["symbol"])
+    return {
+        "date": anchor.isoformat() if anchor else None,
+        "count": len(stocks),
+        "stocks": stocks,
+    }
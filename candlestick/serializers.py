@@ -0,0 +1,129 @@
+"""
+Serializers for the read-only JSON API.
+
+The API views hand these serializers plain dictionaries from `.values()` querysets,
+so the serializers only rename and format columns; no model instances are built.
+Every output serializer supports field selection through the `fields` query
+parameter. SimilarityQuerySerializer validates the input of the similarity search.
+"""
+
+from rest_framework import serializers
+
+from .similarity import DEFAULT_NEIGHBOURS, MAX_NEIGHBOURS
+
+
+class DynamicFieldsSerializer(serializers.Serializer):  # pylint: disable=W0223
+    """
+    Serializer that only outputs the fields listed in the request's `fields` parameter.
+
+    `?fields=symbol,date` keeps those two fields; unknown names are ignored and a
+    missing or empty parameter keeps every field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+
+        selected = request.query_params.get("fields", "")
+        selected = {name.strip() for name in selected.split(",") if name.strip()}
+        if selected:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+
+class PatternOccurrenceSerializer(DynamicFieldsSerializer):  # pylint: disable=W0223
+    """
+    Compact representation of one detected pattern occurrence.
+    """
+
+    id = serializers.IntegerField()
+    date = serializers.DateField(source="data_date")
+    strength = serializers.FloatField()
+    stock_id = serializers.IntegerField()
+    symbol = serializers.CharField(source="stock__symbol")
+    sector = serializers.CharField(source="stock__sector")
+
+
+class StockSerializer(DynamicFieldsSerializer):  # pylint: disable=W0223
+    """
+    Compact representation of a stock.
+    """
+
+    id = serializers.IntegerField()
+    symbol = serializers.CharField()
+    company_name = serializers.CharField()
+    sector = serializers.CharField()
+    isin_code = serializers.CharField()
+
+
+class OHLCSerializer(DynamicFieldsSerializer):  # pylint: disable=W0223
+    """
+    Compact representation of one daily candle. Prices are emitted as floats.
+    """
+
+    date = serializers.DateField(source="data_date")
+    open = serializers.FloatField(source="open_price")
+    high = serializers.FloatField(source="high_price")
+    low = serializers.FloatField(source="low_price")
+    close = serializers.FloatField(source="close_price")
+    volume = serializers.IntegerField()
+    open_interest = serializers.IntegerField()
+
+
+class SectorBreadthSerializer(DynamicFieldsSerializer):  # pylint: disable=W0223
+    """
+    One sector's breadth on one day, with counts and their percentage of `stocks`.
+    """
+
+    date = serializers.DateField(source="data_date")
+    sector = serializers.CharField()
+    stocks = serializers.IntegerField()
+    advances = serializers.IntegerField()
+    declines = serializers.IntegerField()
+    bullish = serializers.IntegerField()
+    bearish = serializers.IntegerField()
+    above_sma20 = serializers.IntegerField()
+    bullish_pct = serializers.SerializerMethodField()
+    bearish_pct = serializers.SerializerMethodField()
+    above_sma20_pct = serializers.SerializerMethodField()
+
+    @staticmethod
+    def percentage(row, name):
+        """
+        Returns row[name] as a percentage of the sector's stocks that day.
+        """
+        return round(100 * row[name] / row["stocks"], 2) if row["stocks"] else 0.0
+
+    def get_bullish_pct(self, row):
+        """
+        Percentage of the sector's stocks counted in bullish.
+        """
+        return self.percentage(row, "bullish")
+
+    def get_bearish_pct(self, row):
+        """
+        Percentage of the sector's stocks counted in bearish.
+        """
+        return self.percentage(row, "bearish")
+
+    def get_above_sma20_pct(self, row):
+        """
+        Percentage of the sector's stocks counted in above_sma20.
+        """
+        return self.percentage(row, "above_sma20")
+
+
+class SimilarityQuerySerializer(serializers.Serializer):  # pylint: disable=W0223
+    """
+    Query of the similarity search: a symbol or a sketched shape, and k.
+
+    Numeric strings are accepted for k and the shape's closes, as in query strings.
+    """
+
+    symbol = serializers.CharField(required=False, allow_blank=True)
+    shape = serializers.ListField(child=serializers.FloatField(), required=False)
+    k = serializers.IntegerField(
+        min_value=1, max_value=MAX_NEIGHBOURS, default=DEFAULT_NEIGHBOURS
+    )
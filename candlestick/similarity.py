@@ -0,0 +1,302 @@
+"""
+Shape-similarity search over the most recent candles of every stock.
+
+Each stock's last WINDOW_SESSIONS candles are min-max normalised over the window
+(so only the shape counts, not the price level) and flattened into one row of a
+feature matrix: open, high, low and close of every candle. A k-nearest-neighbour
+query is then one vectorized Euclidean distance over the whole matrix.
+
+Queries either name a stock ("which stocks' last 10 candles look like RELIANCE's")
+or pass a sketched shape as a list of closes, which is compared with the close
+columns of the matrix.
+
+The matrix only depends on the trailing window, so each refresh re-reads the last
+WINDOW_SESSIONS sessions rather than the history. Like the pattern bitset index it
+is saved to disk per data generation so worker processes can load it.
+"""
+
+import logging
+import os
+import threading
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+
+from .caching import get_data_generation
+from .models import OHLCData, Stock
+
+WINDOW_SESSIONS = 10
+DEFAULT_NEIGHBOURS = 10
+MAX_NEIGHBOURS = 100
+
+
+class SimilarityQueryError(ValueError):
+    """
+    Raised when a similarity query is malformed.
+    """
+
+
+def normalize_rows(matrix):
+    """
+    Min-max normalises every row of a matrix to [0, 1]; flat rows become 0.5.
+    """
+    low = matrix.min(axis=1, keepdims=True)
+    span = matrix.max(axis=1, keepdims=True) - low
+    return np.divide(
+        matrix - low,
+        span,
+        out=np.full_like(matrix, 0.5),
+        where=span != 0,
+    )
+
+
+class ShapeIndex:
+    """
+    Normalised trailing candle windows of every stock.
+
+    Attributes:
+        generation (int): Data generation the matrix was built from.
+        sessions (list): Dates of the window, oldest first.
+        stock_ids (ndarray): Stock id of each matrix row.
+        features (ndarray): One row per stock, [open, high, low, close] of each
+            session of the window after normalisation (4 * WINDOW_SESSIONS columns).
+    """
+
+    def __init__(self, generation, sessions, stock_ids, features):
+        self.generation = generation
+        self.sessions = sessions
+        self.stock_ids = stock_ids
+        self.features = features
+        self.rows = {int(stock_id): i for i, stock_id in enumerate(stock_ids)}
+
+    @classmethod
+    def build(cls, generation):
+        """
+        Builds the matrix from the candles of the last WINDOW_SESSIONS sessions.
+
+        Stocks missing a candle in the window are left out.
+
+        Args:
+            generation (int): Data generation being indexed.
+
+        Returns:
+            ShapeIndex: The built index.
+        """
+        sessions = sorted(
+            OHLCData.objects.order_by("-data_date")
+            .values_list("data_date", flat=True)
+            .distinct()[:WINDOW_SESSIONS]
+        )
+        empty = np.zeros((0, 4 * WINDOW_SESSIONS))
+        if len(sessions) < WINDOW_SESSIONS:
+            return cls(generation, sessions, np.zeros(0, dtype=np.int64), empty)
+
+        rows = list(
+            OHLCData.objects.filter(data_date__gte=sessions[0])
+            .order_by("stock_id", "data_date")
+            .values_list(
+                "stock_id", "open_price", "high_price", "low_price", "close_price"
+            )
+        )
+        if not rows:
+            return cls(generation, sessions, np.zeros(0, dtype=np.int64), empty)
+        stock_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        prices = np.array([row[1:] for row in rows], dtype=np.float64)
+
+        # keep the stocks with a candle on every session of the window
+        ids, starts, counts = np.unique(
+            stock_ids, return_index=True, return_counts=True
+        )
+        complete = counts == WINDOW_SESSIONS
+        take = (starts[complete, None] + np.arange(WINDOW_SESSIONS)).ravel()
+        features = prices[take].reshape(-1, 4 * WINDOW_SESSIONS)
+        return cls(generation, sessions, ids[complete], normalize_rows(features))
+
+    def nearest(self, query, neighbours, columns=None, exclude=None):
+        """
+        Finds the rows closest to a normalised query vector.
+
+        Args:
+            query (ndarray): Normalised query vector.
+            neighbours (int): Number of stocks to return.
+            columns (slice, optional): Feature columns to compare, renormalised per
+                row, e.g. only the closes for a sketched shape.
+            exclude (int, optional): Stock id to leave out, the queried stock itself.
+
+        Returns:
+            list: (stock id, distance) pairs, nearest first.
+        """
+        features = self.features
+        if columns is not None:
+            features = normalize_rows(features[:, columns])
+        distances = np.sqrt(((features - query) ** 2).sum(axis=1))
+        if exclude is not None and exclude in self.rows:
+            distances[self.rows[exclude]] = np.inf
+
+        neighbours = min(neighbours, len(distances))
+        if neighbours == 0:
+            return []
+        # partial selection, then sort only the k nearest
+        nearest = np.argpartition(distances, neighbours - 1)[:neighbours]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [
+            (int(self.stock_ids[i]), float(distances[i]))
+            for i in nearest
+            if np.isfinite(distances[i])
+        ]
+
+    def save(self, path):
+        """
+        Writes the index to disk as .npz, atomically replacing the old file and
+        creating its directory when missing.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp.npz"
+        np.savez(
+            temp_path,
+            generation=self.generation,
+            sessions=np.array([day.isoformat() for day in self.sessions]),
+            stock_ids=self.stock_ids,
+            features=self.features,
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save(), or returns None if there is no readable file.
+        """
+        try:
+            with np.load(path) as data:
+                return cls(
+                    generation=int(data["generation"]),
+                    sessions=[date.fromisoformat(str(day)) for day in data["sessions"]],
+                    stock_ids=data["stock_ids"],
+                    features=data["features"],
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def get_shape_index():
+    """
+    Returns the ShapeIndex of the current data generation, loading or building it.
+
+    Returns:
+        ShapeIndex: Index for the current generation.
+    """
+    global _index  # pylint: disable=W0603
+    generation = get_data_generation()[0]
+    with _index_lock:
+        if _index is not None and _index.generation == generation:
+            return _index
+        index = ShapeIndex.load(settings.SHAPE_INDEX_PATH)
+        if index is None or index.generation != generation:
+            index = ShapeIndex.build(generation)
+            index.save(settings.SHAPE_INDEX_PATH)
+        _index = index
+        return _index
+
+
+def update_shape_index(start_date, end_date):
+    """
+    Brings the saved shape index up to date after a refresh of start_date..end_date.
+
+    A backfill ending before the current window leaves the matrix unchanged, so
+    only its generation moves; otherwise the trailing window is re-read.
+
+    Args:
+        start_date (str): First refreshed date ('YYYY-MM-DD').
+        end_date (str): Last refreshed date ('YYYY-MM-DD').
+    """
+    global _index  # pylint: disable=W0603
+    logger = logging.getLogger("stock_screener_logger")
+    generation = get_data_generation()[0]
+    with _index_lock:
+        index = ShapeIndex.load(settings.SHAPE_INDEX_PATH)
+        if (
+            index is not None
+            and index.generation == generation - 1
+            and len(index.sessions) == WINDOW_SESSIONS
+            and str(end_date) < index.sessions[0].isoformat()
+        ):
+            index.generation = generation
+        else:
+            index = ShapeIndex.build(generation)
+        index.save(settings.SHAPE_INDEX_PATH)
+        _index = index
+    logger.info(  # pylint: disable=W1203
+        f"Shape index updated to generation {generation}, {len(index.stock_ids)} stocks"
+    )
+
+
+def find_similar(symbol=None, shape=None, neighbours=DEFAULT_NEIGHBOURS):
+    """
+    Finds the stocks whose last WINDOW_SESSIONS candles look most like a stock's
+    or like a sketched shape.
+
+    Args:
+        symbol (str, optional): Symbol of the stock to compare with.
+        shape (list, optional): WINDOW_SESSIONS closes sketching the shape.
+        neighbours (int): Number of stocks to return.
+
+    Returns:
+        dict: Window dates, the query and the nearest stocks with their distance.
+
+    Raises:
+        SimilarityQueryError: If the query is missing or malformed.
+    """
+    if not isinstance(neighbours, int) or not 0 < neighbours <= MAX_NEIGHBOURS:
+        raise SimilarityQueryError(f"'k' must be between 1 and {MAX_NEIGHBOURS}.")
+    index = get_shape_index()
+
+    if symbol:
+        stock_id = (
+            Stock.objects.filter(symbol=symbol).values_list("id", flat=True).first()
+        )
+        if stock_id is None:
+            raise SimilarityQueryError(f"Unknown symbol '{symbol}'.")
+        if stock_id not in index.rows:
+            raise SimilarityQueryError(
+                f"'{symbol}' does not have a candle on each of the last "
+                f"{WINDOW_SESSIONS} sessions."
+            )
+        matches = index.nearest(
+            index.features[index.rows[stock_id]], neighbours, exclude=stock_id
+        )
+    elif shape is not None:
+        if (
+            not isinstance(shape, list)
+            or len(shape) != WINDOW_SESSIONS
+            or not all(isinstance(value, (int, float)) for value in shape)
+        ):
+            raise SimilarityQueryError(
+                f"'shape' must be a list of {WINDOW_SESSIONS} closes."
+            )
+        query = normalize_rows(np.array([shape], dtype=np.float64))[0]
+        # close is the 4th of the 4 prices recorded per candle
+        matches = index.nearest(query, neighbours, columns=slice(3, None, 4))
+    else:
+        raise SimilarityQueryError("Provide either 'symbol' or 'shape'.")
+
+    stocks = Stock.objects.in_bulk([stock_id for stock_id, _ in matches])
+    return {
+        "sessions": [day.isoformat() for day in index.sessions],
+        "query": symbol or shape,
+        "results": [
+            {
+                "id": stock_id,
+                "symbol": stocks[stock_id].symbol,
+                "company_name": stocks[stock_id].company_name,
+                "sector": stocks[stock_id].sector,
+                "distance": round(distance, 4),
+            }
+            for stock_id, distance in matches
+            if stock_id in stocks
+        ],
+    }
@@ -0,0 +1,134 @@
+"""
+Daily pattern match counts per sector for the overview pages.
+
+The refresh pipeline recomputes the PatternSummary rows of the dates it refreshed
+when it publishes results. The patterns index then reads the latest few dates of
+the summary in one query on its date index instead of counting the pattern tables,
+and caches the result until the next refresh publishes a new data generation.
+"""
+
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import PatternSummary
+from .patterns import PATTERNS
+
+TREND_SESSIONS = 5
+
+
+def update_pattern_summary(start_date=None, end_date=None):
+    """
+    Recomputes the summary rows of the dates between start_date and end_date.
+
+    Without dates every row is rebuilt, which is how the summary is backfilled and
+    how it follows stocks changing sector.
+
+    Args:
+        start_date (str, optional): First date to recompute ('YYYY-MM-DD').
+        end_date (str, optional): Last date to recompute ('YYYY-MM-DD').
+
+    Returns:
+        int: Number of summary rows written.
+    """
+    date_filter = {}
+    if start_date:
+        date_filter["data_date__gte"] = start_date
+    if end_date:
+        date_filter["data_date__lte"] = end_date
+
+    summaries = []
+    for slug, pattern in PATTERNS.items():
+        counts = (
+            pattern["model"]
+            .objects.filter(**date_filter)
+            .values("data_date", "stock__sector")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        summaries.extend(
+            PatternSummary(
+                data_date=row["data_date"],
+                pattern=slug,
+                sector=row["stock__sector"],
+                count=row["count"],
+            )
+            for row in counts
+        )
+
+    with transaction.atomic():
+        PatternSummary.objects.filter(**date_filter).delete()
+        PatternSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
+
+
+async def apattern_overview(sessions=TREND_SESSIONS):
+    """
+    Summarises the latest dates of the pattern summary for the overview pages.
+
+    Streams the summary newest first and stops after `sessions` dates, so only a
+    few hundred rows are read from the date index.
+
+    Args:
+        sessions (int): Number of dates averaged for the trend.
+
+    Returns:
+        dict: "date" (latest date or None), "total" (matches on that date) and
+        "patterns", PATTERNS entries extended with "count", "average" and
+        "sectors" ((sector, count) pairs, largest first).
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    sectors = defaultdict(dict)
+    dates = []
+    async for row in PatternSummary.objects.order_by("-data_date").values_list(
+        "data_date", "pattern", "sector", "count"
+    ):
+        data_date, slug, sector, count = row
+        if not dates or dates[-1] != data_date:
+            if len(dates) == sessions:
+                break
+            dates.append(data_date)
+        counts[slug][data_date] += count
+        if data_date == dates[0]:
+            sectors[slug][sector] = count
+
+    patterns = []
+    for slug, pattern in PATTERNS.items():
+        patterns.append(
+            {
+                **pattern,
+                "count": counts[slug][dates[0]] if dates else 0,
+                "average": (
+                    round(sum(counts[slug].values()) / len(dates), 1) if dates else 0
+                ),
+                "sectors": sorted(
+                    sectors[slug].items(), key=lambda item: (-item[1], item[0])
+                ),
+            }
+        )
+    return {
+        "date": dates[0] if dates else None,
+        "total": sum(pattern["count"] for pattern in patterns),
+        "patterns": patterns,
+    }
+
+
+async def acached_pattern_overview(generation, sessions=TREND_SESSIONS):
+    """
+    Returns apattern_overview(), computed once per data generation.
+
+    Args:
+        generation (int): Current data generation.
+        sessions (int): Number of dates averaged for the trend.
+
+    Returns:
+        dict: The overview, see apattern_overview().
+    """
+    key = f"pattern-overview:{generation}:{sessions}"
+    overview = await cache.aget(key)
+    if overview is None:
+        overview = await apattern_overview(sessions=sessions)
+        await cache.aset(key, overview)
+    return overview
@@ -0,0 +1,194 @@
+"""
+Parameter sweeps of the single-candle pattern thresholds.
+
+The hammer, inverted hammer and spinning top/bottom detectors compare shadows
+with fixed multiples of the body (2x and 0.5x, 1.5x). A sweep evaluates a whole grid of
+multiples against the stored history in one pass instead of one detection run per
+parameter set:
+
+- every threshold is a cut on a ratio (shadow / body), so each candle's ratios are
+  computed once and located among the sorted grid values with searchsorted;
+- the per-candle statistics (has exit, return, hit for each horizon) are summed per
+  grid cell with bincount;
+- a cumulative sum along each parameter axis turns the cell sums into the totals of
+  every parameter set, since a candle matching a threshold also matches every
+  looser one.
+
+The cost is O(candles + parameter sets), so a 1,000-point grid over the whole
+history costs about as much as a single backtest.
+"""
+
+import itertools
+
+import numpy as np
+
+from .backtest import HORIZONS, forward_returns, load_candles
+from .detection import candle_measurements, to_paise
+from .patterns import PATTERNS
+
+MAX_PARAMETER_SETS = 100_000
+
+# pattern slug -> (parameter, measured shadow, comparison, current multiple); a
+# candle matches when shadow >= multiple * body for "min", <= for "max"
+SWEEPS = {
+    "hammer": (
+        ("long_shadow", "lower", "min", 2.0),
+        ("short_shadow", "upper", "max", 0.5),
+    ),
+    "inverted-hammer": (
+        ("long_shadow", "upper", "min", 2.0),
+        ("short_shadow", "lower", "max", 0.5),
+    ),
+    "spinning-top-bottom": (("shadows", "shorter", "min", 1.5),),
+}
+
+
+def parameter_grid(slug, grid):
+    """
+    Sorts and validates the values of every parameter of a sweep.
+
+    Args:
+        slug (str): Pattern slug, a key of SWEEPS.
+        grid (dict): Parameter name -> list of multiples; missing parameters keep
+            their current value.
+
+    Returns:
+        list: Sorted unique float64 array of values per parameter, in SWEEPS order.
+
+    Raises:
+        ValueError: If a parameter is unknown, a value is negative or the grid is
+            too large.
+    """
+    names = [name for name, *_ in SWEEPS[slug]]
+    unknown = set(grid) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(sorted(unknown))}")
+    values = [
+        np.unique(np.asarray(grid.get(name) or [default], dtype=np.float64))
+        for name, _, _, default in SWEEPS[slug]
+    ]
+    if any((axis < 0).any() for axis in values):
+        raise ValueError("Multiples must not be negative.")
+    size = int(np.prod([len(axis) for axis in values]))
+    if size > MAX_PARAMETER_SETS:
+        raise ValueError(f"{size} parameter sets, at most {MAX_PARAMETER_SETS} allowed")
+    return values
+
+
+def shadow_ratios(shadow, body, comparison):
+    """
+    Computes shadow / body per candle, mapping a zero body to the ratio that gives
+    the same answer as the comparison shadow >= (or <=) multiple * 0.
+
+    Args:
+        shadow (ndarray): Measured shadow in paise.
+        body (ndarray): Body in paise.
+        comparison (str): "min" or "max".
+
+    Returns:
+        ndarray: float64 ratios.
+    """
+    # a correctly rounded integer division equals the float of a decimal multiple
+    # exactly when the true ratio does, so the cuts match the detection rules
+    zero_body = np.inf if comparison == "min" else 0.0
+    return np.divide(
+        shadow,
+        body,
+        out=np.where(shadow > 0, np.inf, zero_body),
+        where=body > 0,
+    )
+
+
+def run_sweep(slug, grid):
+    """
+    Evaluates every parameter set of the grid against the stored history.
+
+    Trades follow the backtest: entered at the close of the match day, a hit when
+    the return moved in the pattern's direction.
+
+    Args:
+        slug (str): Pattern slug, a key of SWEEPS.
+        grid (dict): Parameter name -> list of multiples.
+
+    Returns:
+        list: One dict per parameter set with its parameters, match count and the
+        trades, mean return (percent) and hit rate (percent) of every horizon.
+    """
+    values = parameter_grid(slug, grid)
+    _, stock_ids, prices = load_candles(
+        "open_price", "high_price", "low_price", "close_price"
+    )
+    open_, high, low, close = (to_paise(column) for column in prices)
+    body, upper_shadow, lower_shadow, candle_range = candle_measurements(
+        open_, high, low, close
+    )
+    shadows = {
+        "upper": upper_shadow,
+        "lower": lower_shadow,
+        "shorter": np.minimum(upper_shadow, lower_shadow),
+    }
+
+    # per-candle statistics: [1, has exit, return, hit] for every horizon
+    positions = np.arange(len(close))
+    direction = -1 if PATTERNS[slug]["bias"] == "bearish" else 1
+    columns = [np.ones(len(close))]
+    for horizon in HORIZONS:
+        returns = forward_returns(stock_ids, prices[3], positions, horizon)
+        columns += [
+            ~np.isnan(returns),
+            np.nan_to_num(returns),
+            direction * np.nan_to_num(returns) > 0,
+        ]
+
+    # grid cell of every candle: position of each ratio among the sorted values
+    valid = candle_range != 0
+    shape = [len(axis) + 1 for axis in values]
+    cells = np.zeros(int(valid.sum()), dtype=np.int64)
+    for axis, (_, shadow, comparison, _) in zip(values, SWEEPS[slug]):
+        ratios = shadow_ratios(shadows[shadow][valid], body[valid], comparison)
+        side = "right" if comparison == "min" else "left"
+        cells = cells * (len(axis) + 1) + np.searchsorted(axis, ratios, side=side)
+    totals = np.stack(
+        [
+            np.bincount(
+                cells,
+                weights=column[valid].astype(np.float64),
+                minlength=int(np.prod(shape)),
+            ).reshape(shape)
+            for column in columns
+        ],
+        axis=-1,
+    )
+
+    # "min": value j matches cells above j; "max": value j matches cells up to j
+    for dimension, (_, _, comparison, _) in enumerate(SWEEPS[slug]):
+        if comparison == "min":
+            totals = np.flip(np.flip(totals, dimension).cumsum(dimension), dimension)
+            totals = np.delete(totals, 0, axis=dimension)
+        else:
+            totals = np.delete(totals.cumsum(dimension), -1, axis=dimension)
+
+    names = [name for name, *_ in SWEEPS[slug]]
+    results = []
+    for cell in itertools.product(*(range(len(axis)) for axis in values)):
+        row = totals[cell]
+        horizons = {}
+        for i, horizon in enumerate(HORIZONS):
+            trades, return_total, hits = row[1 + 3 * i : 4 + 3 * i]
+            horizons[horizon] = {
+                "trades": int(trades),
+                "mean_return": (
+                    round(float(100 * return_total / trades), 3) if trades else None
+                ),
+                "hit_rate": round(float(100 * hits / trades), 1) if trades else None,
+            }
+        results.append(
+            {
+                "parameters": {
+                    name: float(axis[j]) for name, axis, j in zip(names, values, cell)
+                },
+                "matches": int(row[0]),
+                "horizons": horizons,
+            }
+        )
+    return results
@@ -1,5 +0,0 @@
-"""
-Test Module
-"""
-
-# Create your tests here.
@@ -0,0 +1,147 @@
+"""
+Fixtures shared by the candlestick tests.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from candlestick import bitset_index, ingestion, screener, similarity, tokens
+from candlestick.models import OHLCData, Stock
+
+SECTORS = ("IT", "Banks", "Pharma")
+
+
+def weekdays(start, count):
+    """
+    Returns `count` consecutive weekdays from `start`.
+    """
+    days = []
+    day = start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def create_stocks(count, sectors=SECTORS):
+    """
+    Creates `count` stocks spread over the sectors.
+    """
+    return Stock.objects.bulk_create(
+        [
+            Stock(
+                company_name=f"Company {i}",
+                symbol=f"SYM{i}",
+                sector=sectors[i % len(sectors)],
+                isin_code=f"NSE_EQ|INE{i:07d}",
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def create_candles(stock, candles):
+    """
+    Creates a stock's candles from (date, open, high, low, close[, volume]) tuples.
+    """
+    return OHLCData.objects.bulk_create(
+        [
+            OHLCData(
+                stock=stock,
+                data_date=candle[0],
+                open_price=candle[1],
+                high_price=candle[2],
+                low_price=candle[3],
+                close_price=candle[4],
+                volume=candle[5] if len(candle) > 5 else 1000,
+            )
+            for candle in candles
+        ]
+    )
+
+
+def random_walk(days, seed=0, start_price=100.0):
+    """
+    Returns random-walk candles, one per day, as create_candles() tuples.
+    """
+    rng = random.Random(seed)
+    price = start_price
+    candles = []
+    for day in days:
+        open_price = price
+        close_price = round(open_price * (1 + rng.uniform(-0.03, 0.03)), 2)
+        high_price = round(max(open_price, close_price) * (1 + rng.uniform(0, 0.02)), 2)
+        low_price = round(min(open_price, close_price) * (1 - rng.uniform(0, 0.02)), 2)
+        volume = rng.randint(1000, 5000)
+        candles.append(
+            (day, round(open_price, 2), high_price, low_price, close_price, volume)
+        )
+        price = close_price
+    return candles
+
+
+def random_candles(count, seed=0):
+    """
+    Returns (open, high, low, close) Decimal candles on a coarse paise grid, so the
+    pattern rule thresholds are hit exactly.
+    """
+    rng = random.Random(seed)
+    candles = []
+    for _ in range(count):
+        open_paise = 10000 + rng.randint(0, 8)
+        close_paise = 10000 + rng.randint(0, 8)
+        high_paise = max(open_paise, close_paise) + rng.randint(0, 8)
+        low_paise = min(open_paise, close_paise) - rng.randint(0, 16)
+        candles.append(
+            tuple(
+                Decimal(paise) / 100
+                for paise in (open_paise, high_paise, low_paise, close_paise)
+            )
+        )
+    return candles
+
+
+class IsolationMixin:
+    """
+    Isolates the in-process indexes, the cache and the data files of each test.
+    """
+
+    start = date(2025, 6, 2)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        bitset_index._index = None  # pylint: disable=W0212
+        screener._index = None  # pylint: disable=W0212
+        similarity._index = None  # pylint: disable=W0212
+        ingestion._limiter = None  # pylint: disable=W0212
+        tokens.clear_token_cache()
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        data_settings = override_settings(
+            DATA_DIR=data_dir,
+            PATTERN_BITSET_INDEX_PATH=f"{data_dir}/pattern_bitsets.json.gz",
+            SHAPE_INDEX_PATH=f"{data_dir}/shape_index.npz",
+        )
+        data_settings.enable()
+        self.addCleanup(data_settings.disable)
+
+
+class ScreenerTestCase(IsolationMixin, TestCase):
+    """
+    TestCase isolating the in-process indexes, the cache and the data files.
+    """
+
+
+class ScreenerTransactionTestCase(IsolationMixin, TransactionTestCase):
+    """
+    ScreenerTestCase whose writes are committed, for tests whose background threads
+    use the database.
+    """
@@ -0,0 +1,105 @@
+"""
+Tests of the read-only JSON API.
+"""
+
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation
+from candlestick.models import Hammer
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class PatternOccurrenceAPITests(ScreenerTestCase):
+    """
+    Pattern occurrences are paged with cursors, filtered and trimmed to fields.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(6)
+        self.days = weekdays(self.start, 5)
+        Hammer.objects.bulk_create(
+            [
+                Hammer(stock=stock, data_date=day, strength=i * len(self.days) + j)
+                for i, stock in enumerate(self.stocks)
+                for j, day in enumerate(self.days)
+            ]
+        )
+        bump_data_generation()
+
+    def url(self, pattern="hammer"):
+        return reverse("API-Pattern-Occurrences", args=[pattern])
+
+    def test_cursor_pages_cover_every_occurrence(self):
+        seen = []
+        response = self.client.get(self.url(), {"page_size": 7})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen += [(row["date"], row["id"]) for row in body["results"]]
+            if not body["next"]:
+                break
+            response = self.client.get(body["next"])
+
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+        self.assertEqual(
+            seen, sorted(seen, key=lambda item: (item[0], -item[1]), reverse=True)
+        )
+
+    def test_filters_and_field_selection(self):
+        response = self.client.get(
+            self.url(),
+            {"sector": "IT", "date": self.days[0].isoformat(), "fields": "symbol,date"},
+        )
+        results = response.json()["results"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual(set(results[0]), {"symbol", "date"})
+
+    def test_top_returns_the_strongest_matches(self):
+        response = self.client.get(self.url(), {"top": 3})
+        strengths = [row["strength"] for row in response.json()["results"]]
+        self.assertEqual(strengths, [29.0, 28.0, 27.0])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url("nope")).status_code, 404)
+        self.assertEqual(self.client.get(self.url(), {"date": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url(), {"top": "0"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(self.url(), {"timeframe": "year"}).status_code, 400
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get(self.url())
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+class StockAPITests(ScreenerTestCase):
+    """
+    Stocks and their candles are listed with sector and date range filters.
+    """
+
+    def test_stocks_by_sector_and_ohlc_range(self):
+        stocks = create_stocks(6)
+        days = weekdays(self.start, 10)
+        create_candles(stocks[0], random_walk(days))
+
+        response = self.client.get(reverse("API-Stocks"), {"sector": "Banks"})
+        self.assertEqual(
+            [row["symbol"] for row in response.json()["results"]], ["SYM1", "SYM4"]
+        )
+
+        response = self.client.get(
+            reverse("API-OHLC", args=[stocks[0].id]),
+            {"from": days[2].isoformat(), "to": days[5].isoformat()},
+        )
+        dates = [row["date"] for row in response.json()["results"]]
+        self.assertEqual(dates, [day.isoformat() for day in days[2:6]])
@@ -0,0 +1,72 @@
+"""
+Tests of the read path served as async views under ASGI.
+"""
+
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation
+from candlestick.models import Doji
+from candlestick.summary import update_pattern_summary
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class AsyncViewTests(ScreenerTestCase):
+    """
+    The async views answer like their WSGI counterparts.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(25)
+        self.days = weekdays(self.start, 2)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(self.days, seed=i))
+        Doji.objects.bulk_create(
+            [
+                Doji(stock=stock, data_date=day)
+                for day in self.days
+                for stock in self.stocks
+            ]
+        )
+        update_pattern_summary()
+        bump_data_generation()
+
+    async def test_pattern_pages_follow_the_cursor_and_etag(self):
+        url = reverse("Doji-Page")
+        seen = []
+        cursor = None
+        while True:
+            params = {"after": cursor} if cursor else {}
+            response = await self.async_client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["ETag"], '"gen-1"')
+            seen += [row.id for row in response.context["rows"]]
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 50)
+        self.assertEqual(len(set(seen)), 50)
+
+        cached = await self.async_client.get(url, headers={"If-None-Match": '"gen-1"'})
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_home_and_stock_detail(self):
+        response = await self.async_client.get(reverse("Home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["date"], self.days[-1])
+
+        stock = self.stocks[0]
+        response = await self.async_client.get(reverse("Stock-Detail", args=[stock.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["stock"].symbol, stock.symbol)
+        response = await self.async_client.get(
+            reverse("Stock-Detail", args=[self.stocks[-1].id + 1])
+        )
+        self.assertEqual(response.status_code, 404)
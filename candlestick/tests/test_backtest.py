@@ -0,0 +1,109 @@
+"""
+Tests of the vectorized forward-return backtest.
+"""
+
+from django.urls import reverse
+
+from candlestick.backtest import HORIZONS, get_backtest, run_backtest
+from candlestick.caching import bump_data_generation
+from candlestick.models import BearishEngulfing, Hammer, OHLCData
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class BacktestTests(ScreenerTestCase):
+    """
+    The array backtest equals a trade-by-trade loop over the occurrences.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(4)
+        self.days = weekdays(self.start, 60)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(self.days, seed=i))
+        Hammer.objects.bulk_create(
+            [
+                Hammer(stock=stock, data_date=day)
+                for i, stock in enumerate(self.stocks)
+                for day in self.days[i::7]
+            ]
+        )
+        BearishEngulfing.objects.bulk_create(
+            [
+                BearishEngulfing(stock=self.stocks[1], data_date=day)
+                for day in self.days[::5]
+            ]
+        )
+
+    def expected(self, model, bearish=False, sector=None):
+        closes = {}
+        for stock_id, close in OHLCData.objects.order_by("data_date").values_list(
+            "stock_id", "close_price"
+        ):
+            closes.setdefault(stock_id, []).append(float(close))
+        occurrences = model.objects.all()
+        if sector:
+            occurrences = occurrences.filter(stock__sector=sector)
+        summaries = {}
+        for horizon in HORIZONS:
+            returns = []
+            for stock_id, data_date in occurrences.values_list("stock_id", "data_date"):
+                position = self.days.index(data_date)
+                if position + horizon < len(self.days):
+                    series = closes[stock_id]
+                    returns.append(series[position + horizon] / series[position] - 1)
+            hits = sum((-r if bearish else r) > 0 for r in returns)
+            summaries[horizon] = {
+                "trades": len(returns),
+                "mean_return": round(100 * sum(returns) / len(returns), 3),
+                "hit_rate": round(100 * hits / len(returns), 1),
+            }
+        return summaries
+
+    def assertSummariesEqual(self, actual, expected):  # pylint: disable=C0103
+        for horizon in HORIZONS:
+            self.assertEqual(actual[horizon]["trades"], expected[horizon]["trades"])
+            self.assertAlmostEqual(
+                actual[horizon]["mean_return"], expected[horizon]["mean_return"], 2
+            )
+            self.assertAlmostEqual(
+                actual[horizon]["hit_rate"], expected[horizon]["hit_rate"], 0
+            )
+
+    def test_matches_a_trade_by_trade_loop(self):
+        result = run_backtest()
+        hammer = result["patterns"]["hammer"]
+        self.assertEqual(hammer["occurrences"], Hammer.objects.count())
+        self.assertSummariesEqual(hammer["horizons"], self.expected(Hammer))
+        self.assertSummariesEqual(
+            hammer["sectors"]["Banks"], self.expected(Hammer, sector="Banks")
+        )
+        self.assertSummariesEqual(
+            result["patterns"]["bearish-engulfing"]["horizons"],
+            self.expected(BearishEngulfing, bearish=True),
+        )
+        self.assertEqual(result["patterns"]["doji"]["occurrences"], 0)
+        self.assertEqual(result["patterns"]["doji"]["horizons"][1]["trades"], 0)
+
+    def test_cached_per_generation_and_filtered_by_the_api(self):
+        bump_data_generation()
+        self.assertEqual(get_backtest()["generation"], 1)
+        with self.assertNumQueries(1):
+            get_backtest()
+
+        response = self.client.get(
+            reverse("API-Backtest"), {"pattern": "hammer", "sector": "IT"}
+        )
+        body = response.json()
+        self.assertEqual(list(body["patterns"]), ["hammer"])
+        self.assertEqual(list(body["patterns"]["hammer"]["sectors"]), ["IT"])
+        self.assertEqual(
+            self.client.get(reverse("API-Backtest"), {"pattern": "x"}).status_code, 404
+        )
@@ -0,0 +1,99 @@
+"""
+Tests of the pattern occurrence bitset index.
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+
+from candlestick.bitset_index import (
+    PatternBitsetIndex,
+    get_bitset_index,
+    update_bitset_index,
+)
+from candlestick.caching import bump_data_generation
+from candlestick.models import Doji
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class PatternBitsetIndexTests(ScreenerTestCase):
+    """
+    Frequency and streak screens match the stored occurrences.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 10)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(self.days, seed=i))
+        # SYM0 on the last 4 sessions, SYM1 on every other session, SYM2 never
+        Doji.objects.bulk_create(
+            [Doji(stock=self.stocks[0], data_date=day) for day in self.days[-4:]]
+            + [Doji(stock=self.stocks[1], data_date=day) for day in self.days[1::2]]
+        )
+
+    def test_counts_streaks_and_screens(self):
+        index = PatternBitsetIndex.build(generation=1)
+        sym0, sym1, sym2 = (stock.id for stock in self.stocks)
+        last = self.days[-1]
+
+        self.assertEqual(index.count("doji", sym0, last, 10), 4)
+        self.assertEqual(index.count("doji", sym1, last, 10), 5)
+        self.assertEqual(index.count("doji", sym1, last, 3), 2)
+        self.assertEqual(index.count("doji", sym0, self.days[5], 10), 0)
+        self.assertEqual(index.streak("doji", sym0, last), 4)
+        self.assertEqual(index.streak("doji", sym1, last), 1)
+        self.assertEqual(index.streak("doji", sym2, last), 0)
+
+        self.assertEqual(index.frequency_screen("doji", last, 6, 3), {sym0, sym1})
+        self.assertEqual(index.frequency_screen("doji", last, 4, 3), {sym0})
+        self.assertEqual(index.streak_screen("doji", last, 2), {sym0})
+        self.assertEqual(index.streak_screen("doji", last, 11), frozenset())
+        self.assertEqual(
+            index.frequency_screen("doji", self.start.replace(day=1), 5, 1), frozenset()
+        )
+
+    def test_incremental_update_matches_a_rebuild(self):
+        index = PatternBitsetIndex.build(generation=1)
+        new_days = weekdays(self.days[-1] + timedelta(days=1), 2)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(new_days, seed=10 + i))
+        Doji.objects.filter(stock=self.stocks[0], data_date=self.days[-1]).delete()
+        Doji.objects.create(stock=self.stocks[2], data_date=new_days[0])
+        Doji.objects.create(stock=self.stocks[2], data_date=self.days[-1])
+
+        updated = index.update(self.days[-1], new_days[-1], generation=2)
+        rebuilt = PatternBitsetIndex.build(generation=2)
+        self.assertEqual(updated.sessions, rebuilt.sessions)
+        self.assertEqual(updated.rows, rebuilt.rows)
+        self.assertEqual(updated.generation, 2)
+
+    def test_saved_index_round_trips_and_creates_its_directory(self):
+        path = os.path.join(settings.DATA_DIR, "nested", "bitsets.json.gz")
+        index = PatternBitsetIndex.build(generation=3)
+        index.save(path)
+        loaded = PatternBitsetIndex.load(path)
+        self.assertEqual(loaded.generation, 3)
+        self.assertEqual(loaded.sessions, index.sessions)
+        self.assertEqual(loaded.rows, index.rows)
+        self.assertIsNone(PatternBitsetIndex.load(path + ".missing"))
+
+    def test_generation_changes_are_picked_up(self):
+        bump_data_generation()
+        first = get_bitset_index()
+        self.assertIs(get_bitset_index(), first)
+        self.assertTrue(os.path.exists(settings.PATTERN_BITSET_INDEX_PATH))
+
+        bump_data_generation()
+        update_bitset_index(self.days[0].isoformat(), self.days[-1].isoformat())
+        self.assertEqual(get_bitset_index().generation, 2)
+        self.assertEqual(get_bitset_index().rows, first.rows)
@@ -0,0 +1,81 @@
+"""
+Tests of the incremental sector breadth analytics.
+"""
+
+from candlestick.breadth import update_sector_breadth
+from candlestick.models import BearishEngulfing, Hammer, OHLCData, SectorBreadth
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+def breadth_rows():
+    return list(
+        SectorBreadth.objects.order_by("data_date", "sector").values(
+            "data_date",
+            "sector",
+            "stocks",
+            "advances",
+            "declines",
+            "bullish",
+            "bearish",
+            "above_sma20",
+        )
+    )
+
+
+class SectorBreadthTests(ScreenerTestCase):
+    """
+    Breadth counts per sector and date, recomputed only for the refreshed dates.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(6)
+        self.days = weekdays(self.start, 30)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(self.days, seed=i))
+
+    def test_counts_of_one_session(self):
+        it_stocks = self.stocks[0::3]
+        last, previous = self.days[-1], self.days[-2]
+        Hammer.objects.create(stock=it_stocks[0], data_date=last)
+        BearishEngulfing.objects.create(stock=it_stocks[1], data_date=last)
+        update_sector_breadth()
+
+        closes = {
+            (stock_id, data_date): close
+            for stock_id, data_date, close in OHLCData.objects.values_list(
+                "stock_id", "data_date", "close_price"
+            )
+        }
+        changes = [
+            closes[(stock.id, last)] - closes[(stock.id, previous)]
+            for stock in it_stocks
+        ]
+        row = SectorBreadth.objects.get(data_date=last, sector="IT")
+        self.assertEqual(row.stocks, 2)
+        self.assertEqual(row.advances, sum(change > 0 for change in changes))
+        self.assertEqual(row.declines, sum(change < 0 for change in changes))
+        self.assertEqual((row.bullish, row.bearish), (1, 1))
+        self.assertEqual(SectorBreadth.objects.filter(data_date=last).count(), 3)
+        self.assertEqual(
+            SectorBreadth.objects.get(data_date=self.days[0], sector="IT").advances, 0
+        )
+
+    def test_incremental_update_matches_a_full_recompute(self):
+        Hammer.objects.create(stock=self.stocks[2], data_date=self.days[-3])
+        update_sector_breadth()
+        expected = breadth_rows()
+
+        SectorBreadth.objects.filter(data_date__gte=self.days[-5]).delete()
+        written = update_sector_breadth(
+            self.days[-5].isoformat(), self.days[-1].isoformat()
+        )
+        self.assertEqual(written, 15)
+        self.assertEqual(breadth_rows(), expected)
@@ -0,0 +1,86 @@
+"""
+Tests of the generation-versioned response caching and ETags.
+"""
+
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation, get_data_generation
+from candlestick.models import Hammer
+
+from .helpers import ScreenerTestCase, create_stocks
+
+
+class DataGenerationTests(ScreenerTestCase):
+    """
+    Publishing bumps the generation that versions every cache key and ETag.
+    """
+
+    def test_generation_starts_at_zero_and_bumps(self):
+        self.assertEqual(get_data_generation(), (0, None))
+        self.assertEqual(bump_data_generation(), 1)
+        self.assertEqual(bump_data_generation(), 2)
+        self.assertIsNotNone(get_data_generation()[1])
+
+
+class PatternListCachingTests(ScreenerTestCase):
+    """
+    Pattern pages are served from cache and revalidated until a new generation.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stock = create_stocks(1)[0]
+        Hammer.objects.create(stock=self.stock, data_date=self.start)
+        bump_data_generation()
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get(reverse("Hammer-Page"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"gen-1"')
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(
+            reverse("Hammer-Page"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_page_is_served_until_the_generation_changes(self):
+        first = self.client.get(reverse("Hammer-Page"))
+        self.assertEqual(len(first.context["rows"]), 1)
+
+        Hammer.objects.create(stock=self.stock, data_date=self.start.replace(day=3))
+        cached = self.client.get(reverse("Hammer-Page"))
+        self.assertEqual(cached.content, first.content)
+
+        bump_data_generation()
+        fresh = self.client.get(
+            reverse("Hammer-Page"), HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh["ETag"], '"gen-2"')
+        self.assertEqual(len(fresh.context["rows"]), 2)
+
+
+class PatternsIndexCachingTests(ScreenerTestCase):
+    """
+    The patterns index embeds a CSRF token, so its ETag follows the CSRF secret.
+    """
+
+    def setUp(self):
+        super().setUp()
+        bump_data_generation()
+
+    def test_etag_changes_with_the_csrf_secret(self):
+        url = reverse("CandleStick")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"].startswith('"gen-1-'))
+        self.assertNotIn("Last-Modified", response)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+        self.client.cookies.clear()
+        fresh = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh["ETag"], response["ETag"])
@@ -0,0 +1,97 @@
+"""
+Tests of the downsampled chart series of the stock detail page.
+"""
+
+from datetime import date
+
+from django.urls import reverse
+
+from candlestick.charts import bucket_ohlc, chart_series, lttb
+from candlestick.models import Doji, Hammer
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class DownsamplingTests(ScreenerTestCase):
+    """
+    OHLC buckets and LTTB keep the shape of the series in fewer points.
+    """
+
+    def test_bucket_ohlc_merges_consecutive_candles(self):
+        candles = [
+            (date(2025, 6, 2), 10, 12, 9, 11),
+            (date(2025, 6, 3), 11, 15, 10, 14),
+            (date(2025, 6, 4), 14, 14, 8, 9),
+            (date(2025, 6, 5), 9, 10, 7, 8),
+        ]
+        self.assertEqual(
+            bucket_ohlc(candles, 2),
+            [(date(2025, 6, 2), 10, 15, 9, 14), (date(2025, 6, 4), 14, 14, 7, 8)],
+        )
+        self.assertEqual(bucket_ohlc(candles, 10), candles)
+
+    def test_lttb_keeps_the_ends_and_the_peak(self):
+        points = [(i, 0.0) for i in range(100)]
+        points[37] = (37, 50.0)
+        sampled = lttb(points, 10)
+        self.assertEqual(len(sampled), 10)
+        self.assertEqual((sampled[0], sampled[-1]), (points[0], points[-1]))
+        self.assertIn(points[37], sampled)
+
+
+class ChartSeriesTests(ScreenerTestCase):
+    """
+    Markers are grouped per chart point, so their number is bounded by the width.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stock = create_stocks(1)[0]
+        self.days = weekdays(self.start, 500)
+        create_candles(self.stock, random_walk(self.days))
+        Doji.objects.bulk_create(
+            [Doji(stock=self.stock, data_date=day) for day in self.days]
+        )
+        Hammer.objects.create(stock=self.stock, data_date=self.days[7])
+
+    def test_markers_are_grouped_per_point(self):
+        series = chart_series(self.stock.id, width=100)
+        self.assertEqual(series["sessions"], 500)
+        self.assertEqual(len(series["points"]), 50)
+        self.assertEqual(len(series["markers"]), 50)
+        self.assertEqual(
+            sum(marker["patterns"]["doji"] for marker in series["markers"]), 500
+        )
+        first = series["markers"][0]
+        self.assertEqual(first["index"], 0)
+        self.assertEqual(first["date"], series["points"][0][0])
+        self.assertEqual(first["patterns"], {"doji": 10, "hammer": 1})
+        self.assertEqual(set(series["pattern_names"]), {"doji", "hammer"})
+
+    def test_line_mode_and_date_range(self):
+        series = chart_series(
+            self.stock.id,
+            width=60,
+            mode="line",
+            from_date=self.days[100],
+            to_date=self.days[199],
+        )
+        self.assertEqual(series["sessions"], 100)
+        self.assertEqual(len(series["points"]), 60)
+        self.assertEqual(series["points"][0][0], self.days[100].isoformat())
+        self.assertEqual(sum(m["patterns"]["doji"] for m in series["markers"]), 100)
+
+    def test_chart_api(self):
+        url = reverse("API-Stock-Chart", args=[self.stock.id])
+        response = self.client.get(url, {"width": 10})
+        body = response.json()
+        self.assertEqual(body["stock"]["symbol"], "SYM0")
+        # clamped to MIN_WIDTH, one candle per two pixels
+        self.assertEqual(len(body["points"]), 25)
+        self.assertEqual(self.client.get(url, {"mode": "bar"}).status_code, 400)
@@ -0,0 +1,126 @@
+"""
+Tests of the vectorized candlestick detectors against per-candle reference rules.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from candlestick import utils
+from candlestick.detection import double_candle_signals, single_candle_signals, to_paise
+from candlestick.models import BullishEngulfing, Hammer
+from candlestick.utils import (
+    identify_double_candle_pattern,
+    identify_single_candle_pattern,
+)
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_candles,
+    weekdays,
+)
+
+
+def is_hammer(open_price, high_price, low_price, close_price):
+    """
+    Reference hammer rule, one candle at a time on Decimal prices.
+    """
+    if open_price == close_price == high_price == low_price:
+        return False
+
+    body = abs(close_price - open_price)
+    if close_price > open_price:
+        upper_shadow = high_price - close_price
+        lower_shadow = open_price - low_price
+    else:
+        upper_shadow = high_price - open_price
+        lower_shadow = close_price - low_price
+    return lower_shadow >= body * 2 and upper_shadow <= body * Decimal("0.5")
+
+
+def is_bullish_engulfing(first_candle, second_candle):
+    """
+    Reference bullish engulfing rule on (open, high, low, close) tuples.
+    """
+    first_open, _, _, first_close = first_candle
+    second_open, _, _, second_close = second_candle
+    return (
+        first_close < first_open
+        and second_close > second_open
+        and second_open <= first_close
+        and second_close >= first_open
+    )
+
+
+def as_arrays(candles):
+    return tuple(to_paise([float(candle[i]) for candle in candles]) for i in range(4))
+
+
+class DetectionOracleTests(ScreenerTestCase):
+    """
+    The array detectors agree with the reference rules on every candle.
+    """
+
+    def test_single_candle_signals_match_the_reference(self):
+        candles = random_candles(5000)
+        mask, strength = single_candle_signals(*as_arrays(candles))["hammer"]
+        expected = [is_hammer(*candle) for candle in candles]
+        self.assertEqual(mask.tolist(), expected)
+        self.assertGreater(sum(expected), 100)
+        self.assertTrue(np.all(strength[mask] >= 2))
+
+    def test_double_candle_signals_match_the_reference(self):
+        candles = random_candles(5001, seed=1)
+        arrays = as_arrays(candles)
+        mask, _ = double_candle_signals(
+            tuple(array[:-1] for array in arrays), tuple(array[1:] for array in arrays)
+        )["bullish-engulfing"]
+        expected = [
+            is_bullish_engulfing(first, second)
+            for first, second in zip(candles, candles[1:])
+        ]
+        self.assertEqual(mask.tolist(), expected)
+        self.assertGreater(sum(expected), 100)
+
+    def test_identify_stores_the_reference_matches(self):
+        stock = create_stocks(1)[0]
+        days = weekdays(self.start, 300)
+        candles = random_candles(len(days), seed=2)
+        create_candles(stock, [(day, *candle) for day, candle in zip(days, candles)])
+        start, end = days[0].isoformat(), days[-1].isoformat()
+        identify_single_candle_pattern(start_date=start, end_date=end)
+        identify_double_candle_pattern(start_date=start, end_date=end)
+
+        self.assertEqual(
+            set(Hammer.objects.values_list("data_date", flat=True)),
+            {day for day, candle in zip(days, candles) if is_hammer(*candle)},
+        )
+        self.assertEqual(
+            set(BullishEngulfing.objects.values_list("data_date", flat=True)),
+            {
+                day
+                for day, first, second in zip(days[1:], candles, candles[1:])
+                if is_bullish_engulfing(first, second)
+            },
+        )
+
+    def test_utils_checks_wrap_the_detectors(self):
+        candles = random_candles(500, seed=3)
+        self.assertEqual(
+            [utils.is_hammer(*candle) for candle in candles],
+            [is_hammer(*candle) for candle in candles],
+        )
+        fields = ("open_price", "high_price", "low_price", "close_price")
+        rows = [dict(zip(fields, candle)) for candle in candles]
+        self.assertEqual(
+            [
+                utils.is_bullish_engulfing(first, second)
+                for first, second in zip(rows, rows[1:])
+            ],
+            [
+                is_bullish_engulfing(first, second)
+                for first, second in zip(candles, candles[1:])
+            ],
+        )
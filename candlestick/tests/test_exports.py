@@ -0,0 +1,125 @@
+"""
+Tests of the streaming CSV and JSON Lines exports.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.urls import reverse
+
+from candlestick import exports
+from candlestick.models import Hammer
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+class ExportTests(ScreenerTestCase):
+    """
+    Exports stream their rows as they are read, under WSGI and ASGI alike.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 1000)
+        for i, stock in enumerate(self.stocks):
+            create_candles(stock, random_walk(self.days, seed=i))
+        Hammer.objects.create(stock=self.stocks[1], data_date=self.days[0], strength=2)
+
+    def count_rows(self, rows_function):
+        """
+        Wraps a rows generator, counting the rows it produced in self.rows_read.
+        """
+        self.rows_read = 0
+
+        def counted(**filters):
+            for row in rows_function(**filters):
+                self.rows_read += 1
+                yield row
+
+        return counted
+
+    def acount_rows(self, rows_function):
+        """
+        Async version of count_rows.
+        """
+        self.rows_read = 0
+
+        async def counted(**filters):
+            async for row in rows_function(**filters):
+                self.rows_read += 1
+                yield row
+
+        return counted
+
+    def test_wsgi_streams_before_the_export_is_read(self):
+        with patch("candlestick.views.ohlc_rows", self.count_rows(exports.ohlc_rows)):
+            response = self.client.get(reverse("Export-OHLC"))
+            self.assertFalse(response.is_async)
+            content = iter(response.streaming_content)
+            header = next(content)
+            self.assertEqual(
+                header, b"date,symbol,open,high,low,close,volume,open_interest\r\n"
+            )
+            self.assertEqual(self.rows_read, 0)
+            next(content)
+            self.assertLess(self.rows_read, 3000)
+            rest = b"".join(content)
+        self.assertEqual(self.rows_read, 3000)
+        self.assertEqual(rest.count(b"\n"), 3000 - 500)
+
+    async def test_asgi_streams_from_the_async_orm(self):
+        with patch(
+            "candlestick.views.aohlc_rows", self.acount_rows(exports.aohlc_rows)
+        ):
+            response = await self.async_client.get(
+                reverse("Export-OHLC"), {"format": "jsonl", "symbol": "SYM0"}
+            )
+            self.assertTrue(response.is_async)
+            content = aiter(response.streaming_content)
+            first = await anext(content)
+            self.assertLess(self.rows_read, 1000)
+            rest = b"".join([chunk async for chunk in content])
+        lines = (first + rest).decode().splitlines()
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(json.loads(lines[0])["symbol"], "SYM0")
+        self.assertEqual(json.loads(lines[0])["date"], self.days[0].isoformat())
+
+    def test_pattern_export_and_bad_parameters(self):
+        response = self.client.get(
+            reverse("Export-Patterns"), {"pattern": "hammer", "format": "jsonl"}
+        )
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="patterns.jsonl"'
+        )
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "pattern": "hammer",
+                    "date": self.days[0].isoformat(),
+                    "symbol": "SYM1",
+                    "sector": "Banks",
+                    "strength": 2.0,
+                }
+            ],
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("Export-Patterns"), {"pattern": "nope"}
+            ).status_code,
+            404,
+        )
+        self.assertEqual(
+            self.client.get(reverse("Export-OHLC"), {"format": "xml"}).status_code, 400
+        )
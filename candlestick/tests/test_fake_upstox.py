@@ -0,0 +1,144 @@
+"""
+Tests of the offline Upstox stand-in and an ingestion run against it.
+"""
+
+import threading
+from datetime import date
+from unittest import mock
+
+import requests
+from django.test import override_settings
+
+from candlestick import ingestion
+from candlestick.fake_upstox import FakeUpstoxServer, TokenBucket, synthetic_candle
+from candlestick.ingestion import create_shards, ingest_run
+from candlestick.models import OHLCData
+from candlestick.progress import RefreshProgress
+from candlestick.trading_calendar import get_trading_calendar
+
+from .helpers import ScreenerTestCase, create_stocks
+
+
+class SyntheticDataTests(ScreenerTestCase):
+    """
+    Candles are deterministic and well formed; the token bucket limits the rate.
+    """
+
+    def test_synthetic_candles_are_deterministic(self):
+        day = date(2025, 6, 2)
+        candle = synthetic_candle("NSE_EQ|INE0000001", day)
+        self.assertEqual(candle, synthetic_candle("NSE_EQ|INE0000001", day))
+        self.assertNotEqual(candle, synthetic_candle("NSE_EQ|INE0000002", day))
+        self.assertEqual(candle[0], "2025-06-02T00:00:00+05:30")
+        _, open_price, high, low, close, volume, _ = candle
+        self.assertTrue(low <= min(open_price, close) <= max(open_price, close) <= high)
+        self.assertGreater(volume, 0)
+
+    def test_token_bucket_allows_the_burst_then_the_rate(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        with mock.patch("candlestick.fake_upstox.time.monotonic", return_value=100.0):
+            bucket.updated = 100.0
+            self.assertEqual([bucket.take() for _ in range(4)], [True] * 3 + [False])
+        with mock.patch("candlestick.fake_upstox.time.monotonic", return_value=100.25):
+            self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+
+
+class FakeUpstoxServerTests(ScreenerTestCase):
+    """
+    The server answers the endpoints the app calls, like Upstox does.
+    """
+
+    def start_server(self, **options):
+        server = FakeUpstoxServer(("127.0.0.1", 0), latency=0, **options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_endpoints(self):
+        _, url = self.start_server()
+        headers = {"Authorization": "token"}
+        response = requests.get(
+            f"{url}/v3/historical-candle/ISIN1/days/1/2025-06-08/2025-06-02",
+            headers=headers,
+            timeout=10,
+        )
+        candles = response.json()["data"]["candles"]
+        self.assertEqual(
+            [candle[0][:10] for candle in candles],
+            [
+                day.isoformat()
+                for day in reversed(
+                    get_trading_calendar().sessions_between("2025-06-02", "2025-06-08")
+                )
+            ],
+        )
+        self.assertEqual(candles[-1], synthetic_candle("ISIN1", date(2025, 6, 2)))
+
+        for path, status in (
+            ("/v3/historical-candle/ISIN1/days/1/2025-06-08/2025-06-02", 401),
+            ("/v2/user/profile", 401),
+            ("/v2/unknown", 404),
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    requests.get(f"{url}{path}", timeout=10).status_code, status
+                )
+        self.assertEqual(
+            requests.get(f"{url}/v2/user/profile", headers=headers, timeout=10).json()[
+                "status"
+            ],
+            "success",
+        )
+        response = requests.get(
+            f"{url}/v2/login/authorization/dialog",
+            params={"redirect_uri": "http://app/callback"},
+            allow_redirects=False,
+            timeout=10,
+        )
+        self.assertEqual(
+            response.headers["Location"], "http://app/callback?code=fake-code"
+        )
+        response = requests.post(
+            f"{url}/v2/login/authorization/token", data={"code": "x"}, timeout=10
+        )
+        self.assertEqual(response.json()["access_token"], "fake-token-1")
+
+    def test_rate_limit_and_rejected_tokens(self):
+        server, url = self.start_server(rate_limit=0.001, burst=2)
+        candle_url = f"{url}/v3/historical-candle/ISIN1/days/1/2025-06-03/2025-06-02"
+        statuses = [
+            requests.get(
+                candle_url, headers={"Authorization": "token"}, timeout=10
+            ).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(server.counts["rate_limited"], 1)
+
+        _, url = self.start_server(reject_auth=True)
+        response = requests.get(
+            f"{url}/v2/user/profile", headers={"Authorization": "token"}, timeout=10
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_ingestion_run_against_the_server(self):
+        server, url = self.start_server(error_rate=0.3, seed=1)
+        create_stocks(12)
+        progress = RefreshProgress(start_date="2025-06-02", end_date="2025-06-06")
+        progress.set_stocks_total(create_shards(progress.run, shard_size=5))
+        with override_settings(UPSTOX_API_URL=url), mock.patch.object(
+            ingestion, "RETRY_DELAY", 0
+        ):
+            ingest_run(progress.run, "worker:1", "token", progress)
+
+        self.assertEqual(progress.stocks_fetched + progress.stocks_failed, 12)
+        self.assertGreater(server.counts["errors"], 0)
+        self.assertEqual(OHLCData.objects.count(), 5 * progress.stocks_fetched)
+        stored = OHLCData.objects.select_related("stock").order_by("id").first()
+        expected = synthetic_candle(
+            requests.utils.quote(stored.stock.isin_code, safe=""), stored.data_date
+        )
+        self.assertAlmostEqual(float(stored.close_price), expected[4], places=2)
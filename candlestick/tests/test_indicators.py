@@ -0,0 +1,107 @@
+"""
+Tests of the rolling technical indicators.
+"""
+
+import statistics
+
+from candlestick.indicators import INDICATOR_FIELDS, update_indicators
+from candlestick.models import OHLCData, TechnicalIndicator
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+def indicator_rows():
+    return {
+        (row.pop("candle__stock_id"), row.pop("candle__data_date")): row
+        for row in TechnicalIndicator.objects.values(
+            "candle__stock_id", "candle__data_date", *INDICATOR_FIELDS, "candles"
+        )
+    }
+
+
+class IndicatorTests(ScreenerTestCase):
+    """
+    A refresh restored from the stored state equals a rebuild of the whole history.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 260)
+        for i, stock in enumerate(self.stocks[:2]):
+            create_candles(stock, random_walk(self.days, seed=i))
+        # the third stock misses every fifth session
+        gappy = random_walk(self.days, seed=2)
+        create_candles(self.stocks[2], [c for i, c in enumerate(gappy) if i % 5])
+
+    def assertRowsEqual(self, actual, expected):  # pylint: disable=C0103
+        """
+        Compares indicator rows up to the float noise of the running sums.
+        """
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, row in expected.items():
+            self.assertEqual(actual[key]["candles"], row["candles"])
+            for field in INDICATOR_FIELDS:
+                if row[field] is None:
+                    self.assertIsNone(actual[key][field], (key, field))
+                else:
+                    self.assertAlmostEqual(
+                        actual[key][field], row[field], places=3, msg=(key, field)
+                    )
+
+    def test_values_match_a_direct_computation(self):
+        self.assertEqual(update_indicators(), OHLCData.objects.count())
+        closes = [
+            float(close)
+            for close in OHLCData.objects.filter(stock=self.stocks[0])
+            .order_by("data_date")
+            .values_list("close_price", flat=True)
+        ]
+        rows = indicator_rows()
+        first = rows[(self.stocks[0].id, self.days[0])]
+        self.assertEqual(first["candles"], 1)
+        self.assertIsNone(first["sma20"])
+        self.assertIsNone(first["rsi14"])
+
+        for position in (19, 100, 259):
+            row = rows[(self.stocks[0].id, self.days[position])]
+            window = closes[position - 19 : position + 1]
+            self.assertAlmostEqual(row["sma20"], sum(window) / 20, places=4)
+            self.assertAlmostEqual(
+                row["bb_upper"],
+                statistics.fmean(window) + 2 * statistics.pstdev(window),
+                places=3,
+            )
+        self.assertIsNone(rows[(self.stocks[0].id, self.days[198])]["sma200"])
+        self.assertAlmostEqual(
+            rows[(self.stocks[0].id, self.days[199])]["sma200"],
+            sum(closes[:200]) / 200,
+            places=4,
+        )
+        rsi = rows[(self.stocks[0].id, self.days[-1])]["rsi14"]
+        self.assertTrue(0 < rsi < 100)
+
+    def test_incremental_refresh_equals_a_full_rebuild(self):
+        update_indicators()
+        expected = indicator_rows()
+
+        for start in (self.days[-1], self.days[-7], self.days[150]):
+            with self.subTest(start=start):
+                TechnicalIndicator.objects.filter(candle__data_date__gte=start).delete()
+                update_indicators(start.isoformat())
+                self.assertRowsEqual(indicator_rows(), expected)
+
+    def test_stocks_without_stored_state_are_rebuilt(self):
+        update_indicators()
+        expected = indicator_rows()
+
+        TechnicalIndicator.objects.filter(candle__stock=self.stocks[1]).delete()
+        written = update_indicators(self.days[-3].isoformat())
+        self.assertEqual(written, 2 * 3 + len(self.days))
+        self.assertRowsEqual(indicator_rows(), expected)
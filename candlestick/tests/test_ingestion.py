@@ -0,0 +1,252 @@
+"""
+Tests of the sharded Upstox ingestion.
+"""
+
+import json
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+import requests
+from django.utils import timezone
+
+from candlestick import ingestion
+from candlestick.ingestion import (
+    LEASE_TTL,
+    MAX_RETRY_DELAY,
+    PERMANENT,
+    RATE_LIMITED,
+    SUCCESS,
+    TRANSIENT,
+    AdaptiveLimiter,
+    claim_shard,
+    classify_response,
+    create_shards,
+    ingest_run,
+    process_shard,
+    renew_lease,
+    request_candles,
+    retry_delay,
+)
+from candlestick.models import OHLCData, RefreshRun, RefreshShard
+from candlestick.progress import RefreshProgress
+
+from .helpers import ScreenerTestCase, create_stocks
+
+DAY = date(2025, 6, 2)
+
+
+def fake_request_candles(session, limiter, stock, start_date, end_date, token):
+    """
+    Returns one candle per stock, failing the stocks whose symbol ends in 9.
+    """
+    if stock.symbol.endswith("9"):
+        return PERMANENT, None
+    return SUCCESS, [[f"{DAY.isoformat()}T00:00:00+05:30", 10, 11, 9, 10, 500, 0]]
+
+
+def make_response(status_code, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body  # pylint: disable=W0212
+    response.headers.update(headers or {})
+    return response
+
+
+def candles_response(candles):
+    return make_response(
+        200, json.dumps({"status": "success", "data": {"candles": candles}}).encode()
+    )
+
+
+class ShardLeaseTests(ScreenerTestCase):
+    """
+    Shards are leased to one worker at a time and reclaimed once a lease expires.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(10)
+        self.progress = RefreshProgress(start_date=DAY, end_date=DAY)
+        self.run = self.progress.run
+        patcher = mock.patch.object(
+            ingestion, "request_candles", side_effect=fake_request_candles
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expire(self, shard):
+        RefreshShard.objects.filter(pk=shard.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_shards_cover_every_stock_once(self):
+        self.assertEqual(create_shards(self.run, shard_size=4), 10)
+        shards = list(RefreshShard.objects.order_by("id"))
+        self.assertEqual([shard.stocks for shard in shards], [4, 4, 2])
+        self.assertEqual(
+            [(s.first_stock_id, s.last_stock_id) for s in shards],
+            [
+                (self.stocks[0].id, self.stocks[3].id),
+                (self.stocks[4].id, self.stocks[7].id),
+                (self.stocks[8].id, self.stocks[9].id),
+            ],
+        )
+
+    def test_a_shard_is_leased_once_until_it_expires(self):
+        create_shards(self.run, shard_size=4)
+        first = claim_shard("a", self.run)
+        second = claim_shard("b")
+        third = claim_shard("a", self.run)
+        self.assertEqual(len({first.pk, second.pk, third.pk}), 3)
+        self.assertIsNone(claim_shard("c", self.run))
+
+        self.expire(first)
+        reclaimed = claim_shard("c", self.run)
+        self.assertEqual((reclaimed.pk, reclaimed.owner), (first.pk, "c"))
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertFalse(renew_lease(first, "a", 1, 0))
+        self.assertTrue(renew_lease(reclaimed, "c", 1, 0))
+
+        RefreshRun.objects.filter(pk=self.run.pk).update(status="Success")
+        self.expire(second)
+        self.assertIsNone(claim_shard("d"))
+
+    def test_the_previous_holder_stops_after_losing_its_lease(self):
+        create_shards(self.run, shard_size=4)
+        stale = claim_shard("a", self.run)
+        self.expire(stale)
+        current = claim_shard("b", self.run)
+
+        self.assertFalse(process_shard(stale, "a", "token"))
+        self.assertEqual(RefreshShard.objects.get(pk=stale.pk).status, "leased")
+        self.assertTrue(process_shard(current, "b", "token"))
+        shard = RefreshShard.objects.get(pk=current.pk)
+        self.assertEqual((shard.status, shard.stocks_fetched), ("done", 4))
+
+    def test_a_failed_store_counts_the_stock_as_failed(self):
+        create_shards(self.run, shard_size=4)
+        shard = claim_shard("a", self.run)
+        store = ingestion.store_stock_candles
+
+        def failing_store(stock, *args):
+            if stock == self.stocks[1]:
+                raise ValueError("database is locked")
+            store(stock, *args)
+
+        with mock.patch.object(
+            ingestion, "store_stock_candles", side_effect=failing_store
+        ):
+            self.assertTrue(process_shard(shard, "a", "token"))
+        shard = RefreshShard.objects.get(pk=shard.pk)
+        self.assertEqual(
+            (shard.status, shard.stocks_fetched, shard.stocks_failed), ("done", 3, 1)
+        )
+        self.assertFalse(OHLCData.objects.filter(stock=self.stocks[1]).exists())
+
+    def test_the_lease_is_renewed_while_a_stock_is_pending(self):
+        create_shards(self.run, shard_size=4)
+        shard = claim_shard("a", self.run)
+        slow = self.stocks[0]
+
+        def slow_request_candles(session, limiter, stock, *args):
+            if stock == slow:
+                time.sleep(0.2)
+            return fake_request_candles(session, limiter, stock, *args)
+
+        with mock.patch.object(
+            ingestion, "request_candles", side_effect=slow_request_candles
+        ), mock.patch.object(ingestion, "RENEW_INTERVAL", 0.01), mock.patch.object(
+            ingestion, "renew_lease", wraps=renew_lease
+        ) as renew:
+            self.assertTrue(process_shard(shard, "a", "token"))
+        # every stock completing at once would renew the lease at most 4 times
+        self.assertGreater(renew.call_count, 4)
+
+    def test_ingest_run_reclaims_the_shards_of_a_dead_worker(self):
+        self.progress.set_stocks_total(create_shards(self.run, shard_size=4))
+        self.expire(claim_shard("dead:1", self.run))
+
+        with mock.patch.object(ingestion, "WAIT_INTERVAL", 0):
+            ingest_run(self.run, "live:1", "token", self.progress)
+        self.assertEqual(
+            set(RefreshShard.objects.values_list("status", "owner")),
+            {("done", "live:1")},
+        )
+        self.assertEqual(OHLCData.objects.filter(data_date=DAY).count(), 9)
+        self.assertEqual(
+            (self.progress.stocks_fetched, self.progress.stocks_failed), (9, 1)
+        )
+
+
+class RequestTests(ScreenerTestCase):
+    """
+    Responses are classified, retried with capped backoff and drive the AIMD limit.
+    """
+
+    def test_classify_response(self):
+        self.assertEqual(classify_response(candles_response([])), (SUCCESS, []))
+        for response, outcome in (
+            (make_response(429), RATE_LIMITED),
+            (make_response(503), TRANSIENT),
+            (make_response(408), TRANSIENT),
+            (make_response(200, b'{"status": "succ'), TRANSIENT),
+            (make_response(401), PERMANENT),
+            (make_response(200, b'{"status": "error"}'), PERMANENT),
+        ):
+            with self.subTest(status=response.status_code):
+                self.assertEqual(classify_response(response), (outcome, None))
+
+    def test_retry_delay_is_capped_below_the_lease(self):
+        for attempt in range(10):
+            self.assertLessEqual(retry_delay(attempt), MAX_RETRY_DELAY)
+        self.assertGreaterEqual(
+            retry_delay(0, make_response(429, headers={"Retry-After": "7"})), 7
+        )
+        delay = retry_delay(0, make_response(429, headers={"Retry-After": "3600"}))
+        self.assertEqual(delay, MAX_RETRY_DELAY)
+        self.assertLess(delay, LEASE_TTL.total_seconds())
+
+    def test_limiter_increases_additively_and_halves_on_a_429(self):
+        limiter = AdaptiveLimiter(initial=2, maximum=4)
+        for _ in range(2):
+            limiter.record(SUCCESS, 0.1)
+        self.assertAlmostEqual(limiter.limit, 2 + 1 / 2 + 1 / 2.5)
+        limiter.record(RATE_LIMITED, 0.1)
+        self.assertAlmostEqual(limiter.limit, (2 + 1 / 2 + 1 / 2.5) / 2)
+        # the other requests of the same round trip do not halve it again
+        limiter.record(RATE_LIMITED, 0.1)
+        self.assertAlmostEqual(limiter.limit, (2 + 1 / 2 + 1 / 2.5) / 2)
+        for _ in range(50):
+            limiter.record(SUCCESS, 0.1)
+        self.assertEqual(limiter.limit, 4)
+
+        limiter.last_decrease = 0.0
+        limiter.record(SUCCESS, 1.0)
+        self.assertEqual(limiter.limit, 2)
+        limiter.record(TRANSIENT, 0.1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_request_retries_rate_limited_responses(self):
+        session = mock.Mock()
+        session.get.side_effect = [
+            make_response(429, headers={"Retry-After": "600"}),
+            make_response(502),
+            candles_response([["2025-06-02T00:00:00+05:30", 1, 1, 1, 1, 5, 0]]),
+        ]
+        stock = create_stocks(1)[0]
+        limiter = AdaptiveLimiter()
+        with mock.patch.object(ingestion.time, "sleep") as sleep:
+            outcome, candles = request_candles(
+                session, limiter, stock, DAY, DAY, "token"
+            )
+        self.assertEqual((outcome, len(candles)), (SUCCESS, 1))
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(sleep.call_args_list[0], mock.call(MAX_RETRY_DELAY))
+        self.assertEqual(limiter.in_flight, 0)
+
+        session.get.side_effect = [make_response(404)]
+        self.assertEqual(
+            request_candles(session, limiter, stock, DAY, DAY, "token"),
+            (PERMANENT, None),
+        )
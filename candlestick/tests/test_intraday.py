@@ -0,0 +1,126 @@
+"""
+Tests of the streaming intraday bar aggregator.
+"""
+
+import os
+import tempfile
+
+from candlestick.intraday import SESSION_OFFSET, IntradayAggregator, ReplaySource
+
+from .helpers import ScreenerTestCase
+
+# 09:15 IST on 2 June 2025, the start of a bar of every interval
+OPEN = 1748835900
+# bucket of the first 5-minute bar
+FIRST = (OPEN - SESSION_OFFSET) // 300
+
+
+def hammer_events(symbol, start):
+    """
+    1-minute candles of a 5-minute hammer: open 100, low 98, close at the high.
+    """
+    return [
+        (start, symbol, 100, 100, 98, 99, 10),
+        (start + 60, symbol, 99, 100.5, 99, 100.5, 10),
+    ]
+
+
+def flat_events(symbol, start):
+    return [(start, symbol, 100, 101, 99, 100.8, 10)]
+
+
+class IntradayAggregatorTests(ScreenerTestCase):
+    """
+    Bars close when the feed's clock moves on, also for stocks without new events.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.aggregator = IntradayAggregator(["AAA", "BBB"], 5)
+
+    def feed(self, events):
+        matches = []
+        for event in events:
+            matches += self.aggregator.add(*event)
+        return matches
+
+    def test_bars_fold_their_events(self):
+        self.feed(
+            [
+                (OPEN, "AAA", 100, 101, 99, 100, 5),
+                (OPEN + 60, "AAA", 100, 103, 100, 102, 7),
+                (OPEN + 120, "AAA", 102, 102, 97, 98, 3),
+                (OPEN + 60, "ZZZ", 1, 1, 1, 1, 1),
+            ]
+        )
+        current = self.aggregator.current
+        self.assertEqual(
+            [current[field][0] for field in ("open", "high", "low", "close")],
+            [100, 103, 97, 98],
+        )
+        self.assertEqual(self.aggregator.volume[0], 15)
+        self.assertEqual(self.aggregator.bucket[1], -1)
+
+    def test_clock_advance_closes_every_earlier_bar(self):
+        self.feed(hammer_events("BBB", OPEN) + flat_events("AAA", OPEN))
+        # only AAA trades in the next bar, BBB's hammer is still evaluated
+        matches = self.feed(flat_events("AAA", OPEN + 300))
+        hammers = [match for match in matches if match[2] == "hammer"]
+        self.assertEqual(len(hammers), 1)
+        symbol, bar_start, _, strength = hammers[0]
+        self.assertEqual(symbol, "BBB")
+        self.assertEqual(int(bar_start.timestamp()), OPEN)
+        self.assertEqual(strength, 4.0)
+        self.assertEqual(list(self.aggregator.last_bucket), [FIRST, FIRST])
+        self.assertEqual(list(self.aggregator.bucket), [FIRST + 1, -1])
+        self.assertEqual(self.aggregator.pending, [])
+
+    def test_late_events_of_a_closed_bar_are_dropped(self):
+        self.feed(flat_events("BBB", OPEN) + flat_events("AAA", OPEN + 300))
+        self.assertEqual(self.aggregator.bucket[1], -1)
+
+        # BBB's first bar has closed, so a late event must not reopen it
+        self.assertEqual(self.feed([(OPEN + 240, "BBB", 50, 200, 10, 60, 99)]), [])
+        self.assertEqual(self.aggregator.bucket[1], -1)
+        self.assertEqual(self.aggregator.last["high"][1], 101)
+        self.assertEqual(self.aggregator.flush(OPEN + 600), [])
+        self.assertEqual(list(self.aggregator.last_bucket), [FIRST + 1, FIRST])
+        self.assertEqual(self.aggregator.previous_bucket[1], -1)
+
+    def test_late_events_behind_the_clock_are_dropped(self):
+        self.feed(flat_events("AAA", OPEN + 300))
+        # BBB had no bar in the first bucket, which the clock has already left
+        self.assertEqual(self.feed(hammer_events("BBB", OPEN)), [])
+        self.assertEqual(self.aggregator.bucket[1], -1)
+        self.aggregator.flush(OPEN + 600)
+        self.assertEqual(list(self.aggregator.last_bucket), [FIRST + 1, -1])
+
+    def test_flush_closes_the_open_bars(self):
+        self.feed(hammer_events("AAA", OPEN + 300))
+        self.assertEqual(self.aggregator.flush(OPEN + 599), [])
+        matches = self.aggregator.flush(OPEN + 600)
+        self.assertIn("hammer", [match[2] for match in matches])
+        self.assertEqual(self.aggregator.flush(OPEN + 900), [])
+
+
+class ReplaySourceTests(ScreenerTestCase):
+    """
+    Recorded feeds mix ticks and 1-minute candles.
+    """
+
+    def test_reads_ticks_and_candles(self):
+        file, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(file, "w", encoding="utf-8") as feed:
+            feed.write(
+                "timestamp,symbol,price,volume\n"
+                f"{OPEN},AAA,101.5,20\n"
+                "2025-06-02T09:16:00+05:30,AAA,101,102,100,101.5,30\n"
+            )
+        self.assertEqual(
+            list(ReplaySource(path)),
+            [
+                (OPEN, "AAA", 101.5, 101.5, 101.5, 101.5, 20),
+                (OPEN + 60, "AAA", 101.0, 102.0, 100.0, 101.5, 30),
+            ],
+        )
@@ -0,0 +1,81 @@
+"""
+Tests of the keyset-paginated pattern listing pages.
+"""
+
+from datetime import date
+
+from django.urls import reverse
+
+from candlestick.models import Hammer
+from candlestick.patterns import PAGE_SIZE, get_pattern_queryset, parse_cursor
+
+from .helpers import ScreenerTestCase, create_stocks, weekdays
+
+
+class PatternListViewTests(ScreenerTestCase):
+    """
+    Pattern listing pages follow the seek cursor through every occurrence once.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(30)
+        days = weekdays(self.start, 4)
+        Hammer.objects.bulk_create(
+            [
+                Hammer(stock=stock, data_date=day)
+                for day in days
+                for stock in self.stocks
+            ]
+        )
+
+    def test_pages_cover_every_occurrence_in_order(self):
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"after": cursor} if cursor else {}
+            response = self.client.get(reverse("Hammer-Page"), params)
+            self.assertEqual(response.status_code, 200)
+            rows = response.context["rows"]
+            self.assertLessEqual(len(rows), PAGE_SIZE)
+            seen += [(row.data_date, row.id) for row in rows]
+            pages += 1
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(seen), Hammer.objects.count())
+        self.assertEqual(
+            seen, sorted(seen, key=lambda key: (-key[0].toordinal(), key[1]))
+        )
+
+    def test_sector_and_date_filters(self):
+        day = weekdays(self.start, 4)[1]
+        response = self.client.get(
+            reverse("Hammer-Page"), {"sector": "IT", "date": day.isoformat()}
+        )
+        rows = response.context["rows"]
+        self.assertEqual(len(rows), 10)
+        self.assertTrue(
+            all(row.stock.sector == "IT" and row.data_date == day for row in rows)
+        )
+
+    def test_malformed_cursor_shows_first_page(self):
+        response = self.client.get(reverse("Hammer-Page"), {"after": "not-a-cursor"})
+        first = self.client.get(reverse("Hammer-Page"))
+        self.assertEqual(
+            [row.id for row in response.context["rows"]],
+            [row.id for row in first.context["rows"]],
+        )
+
+    def test_parse_cursor(self):
+        self.assertEqual(parse_cursor("2025-06-02_7"), (date(2025, 6, 2), 7))
+        self.assertIsNone(parse_cursor("2025-13-02_7"))
+        self.assertIsNone(parse_cursor(""))
+
+    def test_queryset_loads_stock_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(get_pattern_queryset("hammer")[:10])
+            [row.stock.symbol for row in rows]  # pylint: disable=W0106
@@ -0,0 +1,137 @@
+"""
+Tests of starting a refresh from the patterns page and streaming its progress.
+"""
+
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils import timezone
+
+from candlestick import utils
+from candlestick.caching import get_data_generation
+from candlestick.models import RefreshRun, SchedulerLock
+
+from .helpers import ScreenerTestCase, ScreenerTransactionTestCase
+
+
+class RefreshViewTests(ScreenerTransactionTestCase):
+    """
+    The refresh runs in the background while the page returns at once.
+    """
+
+    def wait_for_refresh(self):
+        for _ in range(500):
+            if not SchedulerLock.objects.exists():
+                return
+            time.sleep(0.01)
+        self.fail("The refresh lock was not released")
+
+    def test_post_returns_while_the_refresh_runs(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_refresh(start_date, end_date):
+            calls.append((start_date, end_date))
+            release.wait(5)
+
+        url = reverse("CandleStick")
+        dates = {"start_date": "2025-06-07", "end_date": "2025-06-13"}
+        with patch("candlestick.scheduler.refresh_candlestick_data", slow_refresh):
+            response = self.client.post(url, dates)
+            self.assertRedirects(response, url, fetch_redirect_response=False)
+            page = self.client.get(url)
+            self.assertTrue(page.context["refreshing"])
+            self.assertEqual(page.context["message"], "Data refresh started.")
+
+            self.client.post(url, dates)
+            page = self.client.get(url)
+            self.assertEqual(
+                page.context["message"], "A data refresh is already running."
+            )
+            release.set()
+            self.wait_for_refresh()
+
+        self.assertEqual(calls, [("2025-06-09", "2025-06-13")])
+
+    def test_range_without_sessions_starts_nothing(self):
+        with patch("candlestick.views.start_refresh") as start_refresh:
+            self.client.post(
+                reverse("CandleStick"),
+                {"start_date": "2025-06-07", "end_date": "2025-06-08"},
+            )
+        start_refresh.assert_not_called()
+        page = self.client.get(reverse("CandleStick"))
+        self.assertFalse(page.context["refreshing"])
+        self.assertEqual(
+            page.context["message"], "No trading session in the selected dates."
+        )
+
+
+class RefreshPipelineTests(ScreenerTestCase):
+    """
+    A run succeeds once its data is published, whatever happens to the indexes.
+    """
+
+    def test_an_index_failure_after_publishing_keeps_the_run_successful(self):
+        generation = get_data_generation()[0]
+        with patch.multiple(
+            utils,
+            get_access_token=lambda: "token",
+            check_access_token=lambda token: None,
+            create_shards=lambda run: 0,
+            ingest_run=lambda *args: None,
+        ), patch.object(
+            utils, "update_bitset_index", side_effect=OSError("disk full")
+        ), patch.object(
+            utils, "update_shape_index"
+        ) as update_shape_index:
+            result = utils.refresh_candlestick_data("2025-06-09", "2025-06-13")
+
+        self.assertEqual(result, "Success")
+        self.assertEqual(RefreshRun.objects.get().status, "Success")
+        self.assertEqual(get_data_generation()[0], generation + 1)
+        update_shape_index.assert_not_called()
+
+
+class RefreshEventsTests(ScreenerTestCase):
+    """
+    The progress stream matches the server type so neither buffers it whole.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.run = RefreshRun.objects.create(
+            start_date=date(2025, 6, 9), end_date=date(2025, 6, 13), stage="fetch"
+        )
+
+    def finish_run(self):
+        RefreshRun.objects.filter(pk=self.run.pk).update(
+            status="Success", finished_at=timezone.now(), updated_at=timezone.now()
+        )
+
+    def test_wsgi_streams_a_sync_generator(self):
+        response = self.client.get(reverse("Refresh-Events"))
+        self.assertFalse(response.is_async)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = iter(response.streaming_content)
+        self.assertTrue(next(content).startswith(b"event: progress\n"))
+
+        self.finish_run()
+        rest = b"".join(content)
+        self.assertIn(b'"status": "Success"', rest)
+        self.assertTrue(rest.endswith(b'event: done\ndata: {"status": "Success"}\n\n'))
+
+    async def test_asgi_streams_an_async_generator(self):
+        response = await self.async_client.get(reverse("Refresh-Events"))
+        self.assertTrue(response.is_async)
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b"event: progress\n"))
+
+        await RefreshRun.objects.filter(pk=self.run.pk).aupdate(
+            status="Error", finished_at=timezone.now(), updated_at=timezone.now()
+        )
+        rest = b"".join([chunk async for chunk in content])
+        self.assertTrue(rest.endswith(b'event: done\ndata: {"status": "Error"}\n\n'))
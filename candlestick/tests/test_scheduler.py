@@ -0,0 +1,229 @@
+"""
+Tests of the end-of-day refresh scheduler.
+"""
+
+import threading
+import time as clock
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from candlestick import scheduler
+from candlestick.models import SchedulerLock
+from candlestick.scheduler import (
+    LOCK_LOST,
+    LOCK_NAME,
+    Scheduler,
+    acquire_lock,
+    due_session,
+    pending_sessions,
+    release_lock,
+    start_refresh,
+)
+
+from .helpers import (
+    ScreenerTestCase,
+    ScreenerTransactionTestCase,
+    create_candles,
+    create_stocks,
+)
+
+
+def local_datetime(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class SchedulerLockTests(ScreenerTestCase):
+    """
+    Only one instance holds the lock until it expires.
+    """
+
+    def test_standby_takes_over_an_expired_lock(self):
+        self.assertTrue(acquire_lock(LOCK_NAME, "a"))
+        self.assertFalse(acquire_lock(LOCK_NAME, "b"))
+        self.assertTrue(acquire_lock(LOCK_NAME, "a"))
+        release_lock(LOCK_NAME, "b")
+        self.assertEqual(SchedulerLock.objects.get(name=LOCK_NAME).owner, "a")
+
+        SchedulerLock.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lock(LOCK_NAME, "b"))
+        self.assertFalse(acquire_lock(LOCK_NAME, "a"))
+        release_lock(LOCK_NAME, "b")
+        self.assertTrue(acquire_lock(LOCK_NAME, "a"))
+
+
+class PendingSessionTests(ScreenerTestCase):
+    """
+    A scheduler back from downtime fetches every missing session at once.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(20)
+
+    def store(self, data_date, stocks):
+        for stock in stocks:
+            create_candles(stock, [(data_date, 100, 101, 99, 100)])
+
+    def test_due_session_waits_for_the_run_time(self):
+        self.assertEqual(
+            due_session(local_datetime(2025, 6, 5, 15, 59)), date(2025, 6, 4)
+        )
+        self.assertEqual(
+            due_session(local_datetime(2025, 6, 5, 16, 0)), date(2025, 6, 5)
+        )
+        self.assertEqual(
+            due_session(local_datetime(2025, 6, 8, 9, 0), time(17, 30)),
+            date(2025, 6, 6),
+        )
+
+    def test_catch_up_from_the_latest_complete_session(self):
+        self.assertEqual(
+            pending_sessions(date(2025, 6, 5)), ("2025-06-05", "2025-06-05")
+        )
+        self.store(date(2025, 6, 2), self.stocks)
+        self.assertEqual(
+            pending_sessions(date(2025, 6, 5)), ("2025-06-03", "2025-06-05")
+        )
+        self.assertIsNone(pending_sessions(date(2025, 6, 2)))
+
+    def test_incomplete_latest_session_is_fetched_again(self):
+        self.store(date(2025, 6, 2), self.stocks)
+        self.store(date(2025, 6, 3), self.stocks[:18])
+        self.assertEqual(
+            pending_sessions(date(2025, 6, 5)), ("2025-06-03", "2025-06-05")
+        )
+        self.assertEqual(
+            pending_sessions(date(2025, 6, 3)), ("2025-06-03", "2025-06-03")
+        )
+
+
+class SchedulerTickTests(ScreenerTestCase):
+    """
+    A tick refreshes the pending sessions, retrying while the data is incomplete.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(4)
+        for stock in self.stocks:
+            create_candles(stock, [(date(2025, 6, 2), 100, 101, 99, 100)])
+        self.now = local_datetime(2025, 6, 5, 17, 0)
+        self.scheduler = Scheduler(retries=2, retry_delay=0)
+
+    def patch_refresh(self, side_effect):
+        patcher = mock.patch.object(
+            scheduler, "refresh_candlestick_data", side_effect=side_effect
+        )
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_tick_refreshes_the_missing_sessions(self):
+        def refresh(start_date, end_date):
+            for stock in self.stocks:
+                create_candles(stock, [(date.fromisoformat(end_date), 1, 1, 1, 1)])
+            return "Success"
+
+        refresh_mock = self.patch_refresh(refresh)
+        self.assertTrue(self.scheduler.tick(self.now))
+        refresh_mock.assert_called_once_with(
+            start_date="2025-06-03", end_date="2025-06-05"
+        )
+        self.assertFalse(self.scheduler.tick(self.now))
+        self.assertFalse(SchedulerLock.objects.exists())
+
+    def test_incomplete_data_is_retried_then_abandoned(self):
+        refresh_mock = self.patch_refresh(lambda **kwargs: "Success")
+        self.assertTrue(self.scheduler.tick(self.now))
+        self.assertEqual(refresh_mock.call_count, 3)
+        self.assertEqual(self.scheduler.abandoned, date(2025, 6, 5))
+        self.assertFalse(self.scheduler.tick(self.now))
+
+    def test_tick_waits_while_another_instance_holds_the_lock(self):
+        refresh_mock = self.patch_refresh(lambda **kwargs: "Success")
+        acquire_lock(LOCK_NAME, "other:1")
+        self.assertFalse(self.scheduler.tick(self.now))
+        refresh_mock.assert_not_called()
+
+    def test_lost_lock_stops_the_run_without_abandoning(self):
+        def refresh(**kwargs):
+            # the heartbeat renews several times while the refresh runs
+            self.scheduler.lock_lost.wait(5)
+            return "Success"
+
+        refresh_mock = self.patch_refresh(refresh)
+        renewals = iter([True] + [False] * 10)
+        with mock.patch.object(scheduler, "POLL_INTERVAL", 0.01), mock.patch.object(
+            Scheduler, "hold_lock", side_effect=lambda: next(renewals)
+        ):
+            self.assertTrue(self.scheduler.tick(self.now))
+        self.assertTrue(self.scheduler.lock_lost.is_set())
+        self.assertEqual(refresh_mock.call_count, 1)
+        self.assertIsNone(self.scheduler.abandoned)
+
+        with mock.patch.object(Scheduler, "hold_lock", return_value=False):
+            self.assertEqual(
+                self.scheduler.refresh("2025-06-03", "2025-06-05"), LOCK_LOST
+            )
+
+
+class RefreshLockTests(ScreenerTransactionTestCase):
+    """
+    Refreshes started from the patterns page and scheduled ones take the same lock.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(4)
+        for stock in self.stocks:
+            create_candles(stock, [(date(2025, 6, 2), 100, 101, 99, 100)])
+        self.now = local_datetime(2025, 6, 5, 17, 0)
+        self.scheduler = Scheduler(retries=0, retry_delay=0)
+
+    def complete(self, end_date):
+        for stock in self.stocks:
+            create_candles(stock, [(date.fromisoformat(end_date), 1, 1, 1, 1)])
+
+    def wait_for_release(self):
+        for _ in range(500):
+            if not SchedulerLock.objects.exists():
+                return
+            clock.sleep(0.01)
+        self.fail("The refresh lock was not released")
+
+    def test_a_scheduled_refresh_waits_for_a_web_refresh(self):
+        started, release = threading.Event(), threading.Event()
+
+        def web_refresh(start_date, end_date):
+            started.set()
+            release.wait(5)
+            self.complete(end_date)
+            return "Success"
+
+        with mock.patch.object(
+            scheduler, "refresh_candlestick_data", side_effect=web_refresh
+        ) as refresh_mock:
+            self.assertTrue(start_refresh("2025-06-03", "2025-06-05"))
+            self.assertTrue(started.wait(5))
+            self.assertFalse(self.scheduler.tick(self.now))
+            self.assertFalse(start_refresh("2025-06-03", "2025-06-05"))
+            release.set()
+            self.wait_for_release()
+        self.assertEqual(refresh_mock.call_count, 1)
+        self.assertFalse(self.scheduler.tick(self.now))
+
+    def test_a_web_refresh_is_refused_while_a_scheduled_one_runs(self):
+        started = []
+
+        def scheduled_refresh(start_date, end_date):
+            started.append(start_refresh(start_date, end_date))
+            self.complete(end_date)
+            return "Success"
+
+        with mock.patch.object(
+            scheduler, "refresh_candlestick_data", side_effect=scheduled_refresh
+        ):
+            self.assertTrue(self.scheduler.tick(self.now))
+        self.assertEqual(started, [False])
+        self.assertFalse(SchedulerLock.objects.exists())
@@ -0,0 +1,115 @@
+"""
+Tests of the multi-criteria screener query language and its API.
+"""
+
+from datetime import date
+from unittest import mock
+
+from django.urls import reverse
+
+from candlestick import screener
+from candlestick.caching import bump_data_generation
+from candlestick.models import BullishEngulfing, Hammer
+from candlestick.screener import ScreenerQueryError, run_screener
+
+from .helpers import ScreenerTestCase, create_candles, create_stocks, weekdays
+
+
+class ScreenerTests(ScreenerTestCase):
+    """
+    Queries combine pattern, sector and close conditions across sessions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(6)
+        # Monday 2 June to Friday 6 June 2025
+        self.days = weekdays(self.start, 5)
+        for i, stock in enumerate(self.stocks):
+            price = 100 * (i + 1)
+            create_candles(
+                stock,
+                [(day, price, price + 5, price - 5, price) for day in self.days],
+            )
+        Hammer.objects.bulk_create(
+            [Hammer(stock=stock, data_date=self.days[-1]) for stock in self.stocks[:4]]
+        )
+        BullishEngulfing.objects.bulk_create(
+            [
+                BullishEngulfing(stock=stock, data_date=self.days[-2])
+                for stock in self.stocks[2:]
+            ]
+        )
+        bump_data_generation()
+
+    def symbols(self, query, anchor=None):
+        return [stock["symbol"] for stock in run_screener(query, anchor)["stocks"]]
+
+    def test_boolean_combinations_across_sessions(self):
+        query = {
+            "and": [
+                {"pattern": "hammer"},
+                {"pattern": "bullish-engulfing", "session": 1},
+            ]
+        }
+        self.assertEqual(self.symbols(query), ["SYM2", "SYM3"])
+        self.assertEqual(
+            self.symbols({"or": [{"pattern": "hammer"}, {"sector": "Pharma"}]}),
+            ["SYM0", "SYM1", "SYM2", "SYM3", "SYM5"],
+        )
+        self.assertEqual(
+            self.symbols({"and": [{"not": {"pattern": "hammer"}}, {"sector": "IT"}]}),
+            [],
+        )
+        self.assertEqual(
+            self.symbols({"and": [{"pattern": "hammer"}, {"close": {"gt": 250}}]}),
+            ["SYM2", "SYM3"],
+        )
+
+    def test_results_are_read_in_batches(self):
+        with mock.patch.object(screener, "STOCK_BATCH", 4):
+            self.assertEqual(
+                self.symbols({"close": {"gt": 0}}),
+                ["SYM0", "SYM1", "SYM2", "SYM3", "SYM4", "SYM5"],
+            )
+
+    def test_anchor_date(self):
+        self.assertEqual(run_screener({"pattern": "hammer"})["date"], "2025-06-06")
+        self.assertEqual(self.symbols({"pattern": "hammer"}, "2025-06-05"), [])
+        result = run_screener({"pattern": "hammer"}, "2025-06-08")
+        self.assertEqual(result["date"], "2025-06-06")
+        self.assertEqual(result["count"], 4)
+
+    def test_anchor_without_candles_is_rejected(self):
+        with self.assertRaises(ScreenerQueryError):
+            run_screener({"pattern": "hammer"}, "2025-06-10")
+
+    def test_malformed_queries(self):
+        for query in (
+            ["hammer"],
+            {"pattern": "nope"},
+            {"and": []},
+            {"pattern": "hammer", "session": -1},
+            {"close": {"between": 1}},
+            {"close": {"gt": "open"}},
+            {"close": {"gt": True}},
+            {"colour": "green"},
+        ):
+            with self.subTest(query=query), self.assertRaises(ScreenerQueryError):
+                run_screener(query)
+
+    def test_api_rejects_bad_bodies(self):
+        url = reverse("API-Screener")
+        for body in ([1, 2], '"hammer"', {}, {"query": {"pattern": "nope"}}):
+            with self.subTest(body=body):
+                response = self.client.post(url, body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["Status"], "Failure")
+
+        response = self.client.post(
+            url,
+            {"query": {"pattern": "hammer"}, "date": date(2025, 6, 7).isoformat()},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["date"], "2025-06-06")
@@ -0,0 +1,91 @@
+"""
+Tests of the shape-similarity search and its API.
+"""
+
+import os
+
+from django.conf import settings
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation
+from candlestick.similarity import WINDOW_SESSIONS, ShapeIndex, find_similar
+
+from .helpers import ScreenerTestCase, create_candles, create_stocks, weekdays
+
+
+def scaled_candles(days, closes, scale):
+    return [
+        (day, close * scale, close * scale * 1.01, close * scale * 0.99, close * scale)
+        for day, close in zip(days, closes)
+    ]
+
+
+class SimilarityTests(ScreenerTestCase):
+    """
+    Windows are compared after normalisation, so a scaled copy is the nearest.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(4)
+        self.days = weekdays(self.start, WINDOW_SESSIONS + 5)
+        rising = [100 + 2 * i for i in range(len(self.days))]
+        falling = [200 - 3 * i for i in range(len(self.days))]
+        wavy = [100 + (10 if i % 2 else -10) for i in range(len(self.days))]
+        create_candles(self.stocks[0], scaled_candles(self.days, rising, 1))
+        create_candles(self.stocks[1], scaled_candles(self.days, rising, 5))
+        create_candles(self.stocks[2], scaled_candles(self.days, falling, 1))
+        create_candles(self.stocks[3], scaled_candles(self.days, wavy, 1))
+        bump_data_generation()
+
+    def test_nearest_stock_is_the_scaled_copy(self):
+        result = find_similar(symbol="SYM0", neighbours=2)
+        self.assertEqual(len(result["sessions"]), WINDOW_SESSIONS)
+        self.assertEqual(result["sessions"][-1], self.days[-1].isoformat())
+        self.assertEqual(result["results"][0]["symbol"], "SYM1")
+        self.assertAlmostEqual(result["results"][0]["distance"], 0, places=3)
+        self.assertNotIn("SYM0", [row["symbol"] for row in result["results"]])
+
+        result = find_similar(shape=list(range(WINDOW_SESSIONS, 0, -1)), neighbours=1)
+        self.assertEqual(result["results"][0]["symbol"], "SYM2")
+
+    def test_index_is_saved_for_other_processes(self):
+        find_similar(symbol="SYM0")
+        index = ShapeIndex.load(settings.SHAPE_INDEX_PATH)
+        self.assertTrue(os.path.exists(settings.SHAPE_INDEX_PATH))
+        self.assertEqual(index.generation, 1)
+        self.assertEqual(len(index.rows), 4)
+
+    def test_api_validates_the_query(self):
+        url = reverse("API-Similar")
+        response = self.client.get(url, {"symbol": "SYM0", "k": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["symbol"] for row in response.json()["results"]], ["SYM1"]
+        )
+
+        response = self.client.post(
+            url,
+            {"shape": [str(value) for value in range(WINDOW_SESSIONS)], "k": "2"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        for params in (
+            {"symbol": "SYM0", "k": "0"},
+            {"symbol": "SYM0", "k": "x"},
+            {"k": "3"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+        for body in (
+            [1, 2],
+            {"shape": [1, 2]},
+            {"shape": "up"},
+            {"shape": [1] * 10, "k": 101},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(url, body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["Status"], "Failure")
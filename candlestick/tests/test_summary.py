@@ -0,0 +1,56 @@
+"""
+Tests of the precomputed pattern summary behind the overview pages.
+"""
+
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation
+from candlestick.models import Doji, Hammer
+from candlestick.summary import update_pattern_summary
+
+from .helpers import ScreenerTestCase, create_stocks, weekdays
+
+
+class PatternOverviewTests(ScreenerTestCase):
+    """
+    The overview counts the latest session and is read once per generation.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(6)
+        self.days = weekdays(self.start, 5)
+        Hammer.objects.bulk_create(
+            [
+                Hammer(stock=stock, data_date=day)
+                for i, day in enumerate(self.days)
+                for stock in self.stocks[: i + 1]
+            ]
+        )
+        Doji.objects.create(stock=self.stocks[0], data_date=self.days[-1])
+        update_pattern_summary()
+        bump_data_generation()
+
+    def test_patterns_index_counts_and_trend(self):
+        response = self.client.get(reverse("CandleStick"))
+        patterns = {row["uri"]: row for row in response.context["patterns"]}
+        self.assertEqual(response.context["date"], self.days[-1])
+        self.assertEqual(patterns["Hammer-Page"]["count"], 5)
+        self.assertEqual(patterns["Hammer-Page"]["average"], 3.0)
+        self.assertEqual(
+            patterns["Hammer-Page"]["sectors"], [("Banks", 2), ("IT", 2), ("Pharma", 1)]
+        )
+        self.assertEqual(patterns["Doji-Page"]["count"], 1)
+
+    def test_overview_is_cached_per_generation(self):
+        self.client.get(reverse("Home"))
+        # only the generation lookup once the overview is cached
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("Home"))
+        self.assertEqual(response.context["total"], 6)
+
+        Hammer.objects.create(stock=self.stocks[5], data_date=self.days[-1])
+        update_pattern_summary(self.days[-1], self.days[-1])
+        self.assertEqual(self.client.get(reverse("Home")).context["total"], 6)
+        bump_data_generation()
+        self.assertEqual(self.client.get(reverse("Home")).context["total"], 7)
@@ -0,0 +1,116 @@
+"""
+Tests of the threshold parameter sweeps.
+"""
+
+from fractions import Fraction
+
+from candlestick.backtest import HORIZONS
+from candlestick.models import OHLCData
+from candlestick.sweep import MAX_PARAMETER_SETS, parameter_grid, run_sweep
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_candles,
+    weekdays,
+)
+
+
+class SweepTests(ScreenerTestCase):
+    """
+    Every parameter set of a sweep equals one detection pass with its multiples.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 200)
+        for i, stock in enumerate(self.stocks):
+            candles = random_candles(len(self.days), seed=10 + i)
+            create_candles(
+                stock, [(day, *candle) for day, candle in zip(self.days, candles)]
+            )
+
+    def expected(self, long_shadow, short_shadow):
+        """
+        Counts hammers with the given multiples by looping over the candles.
+        """
+        series = {}
+        for row in OHLCData.objects.order_by("data_date").values_list(
+            "stock_id", "open_price", "high_price", "low_price", "close_price"
+        ):
+            series.setdefault(row[0], []).append(
+                [int(price * 100) for price in row[1:]]
+            )
+        matches, trades, hits = (
+            0,
+            dict.fromkeys(HORIZONS, 0),
+            dict.fromkeys(HORIZONS, 0),
+        )
+        for candles in series.values():
+            for position, (open_, high, low, close) in enumerate(candles):
+                body = abs(close - open_)
+                upper = high - max(open_, close)
+                lower = min(open_, close) - low
+                if high == low or not (
+                    lower >= Fraction(long_shadow) * body
+                    and upper <= Fraction(short_shadow) * body
+                ):
+                    continue
+                matches += 1
+                for horizon in HORIZONS:
+                    if position + horizon < len(candles):
+                        trades[horizon] += 1
+                        hits[horizon] += candles[position + horizon][3] > close
+        return matches, trades, hits
+
+    def test_every_parameter_set_matches_a_detection_loop(self):
+        grid = {"long_shadow": [1, 1.5, 2, 3], "short_shadow": [0, 0.5, 1]}
+        results = run_sweep("hammer", grid)
+        self.assertEqual(len(results), 12)
+        for result in results:
+            parameters = result["parameters"]
+            with self.subTest(parameters=parameters):
+                matches, trades, hits = self.expected(
+                    parameters["long_shadow"], parameters["short_shadow"]
+                )
+                self.assertEqual(result["matches"], matches)
+                for horizon in HORIZONS:
+                    summary = result["horizons"][horizon]
+                    self.assertEqual(summary["trades"], trades[horizon])
+                    if trades[horizon]:
+                        self.assertAlmostEqual(
+                            summary["hit_rate"],
+                            100 * hits[horizon] / trades[horizon],
+                            places=0,
+                        )
+        self.assertGreater(results[0]["matches"], 0)
+
+    def test_looser_thresholds_match_more_candles(self):
+        results = run_sweep("hammer", {"long_shadow": [1, 2, 3, 4]})
+        matches = [result["matches"] for result in results]
+        self.assertEqual(matches, sorted(matches, reverse=True))
+        self.assertEqual(
+            [result["parameters"] for result in results][1],
+            {"long_shadow": 2.0, "short_shadow": 0.5},
+        )
+
+        results = run_sweep("spinning-top-bottom", {"shadows": [0.5, 1.5, 3]})
+        matches = [result["matches"] for result in results]
+        self.assertEqual(matches, sorted(matches, reverse=True))
+
+    def test_parameter_grid_validation(self):
+        values = parameter_grid("hammer", {"long_shadow": [3, 1, 3]})
+        self.assertEqual([axis.tolist() for axis in values], [[1.0, 3.0], [0.5]])
+        for grid in (
+            {"body": [1]},
+            {"long_shadow": [-1]},
+            {
+                "long_shadow": list(range(MAX_PARAMETER_SETS)),
+                "short_shadow": [0, 1],
+            },
+        ):
+            with self.subTest(grid=list(grid)):
+                with self.assertRaises(ValueError):
+                    parameter_grid("hammer", grid)
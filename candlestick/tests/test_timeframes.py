@@ -0,0 +1,161 @@
+"""
+Tests of the weekly and monthly candles folded from the daily candles.
+"""
+
+from datetime import date
+
+from django.urls import reverse
+
+from candlestick.models import OHLCData, TimeframeCandle, TimeframePattern
+from candlestick.timeframes import (
+    next_period_start,
+    period_start,
+    previous_period_start,
+    update_timeframes,
+)
+
+from .helpers import (
+    ScreenerTestCase,
+    create_candles,
+    create_stocks,
+    random_walk,
+    weekdays,
+)
+
+
+def timeframe_rows():
+    return (
+        list(
+            TimeframeCandle.objects.order_by(
+                "timeframe", "stock_id", "period_start"
+            ).values_list(
+                "timeframe",
+                "stock_id",
+                "period_start",
+                "data_date",
+                "open_price",
+                "high_price",
+                "low_price",
+                "close_price",
+                "volume",
+            )
+        ),
+        set(
+            TimeframePattern.objects.values_list(
+                "timeframe", "stock_id", "pattern", "data_date", "strength"
+            )
+        ),
+    )
+
+
+class PeriodTests(ScreenerTestCase):
+    """
+    Weeks start on Monday and months on their first day.
+    """
+
+    def test_period_boundaries(self):
+        self.assertEqual(period_start("week", date(2025, 6, 5)), date(2025, 6, 2))
+        self.assertEqual(period_start("month", date(2025, 6, 5)), date(2025, 6, 1))
+        self.assertEqual(next_period_start("month", date(2025, 1, 1)), date(2025, 2, 1))
+        self.assertEqual(next_period_start("week", date(2025, 6, 30)), date(2025, 7, 7))
+        self.assertEqual(
+            previous_period_start("month", date(2025, 3, 1)), date(2025, 2, 1)
+        )
+        self.assertEqual(
+            previous_period_start("week", date(2025, 6, 2)), date(2025, 5, 26)
+        )
+
+
+class TimeframeTests(ScreenerTestCase):
+    """
+    Folding each refreshed day into its bars equals resampling the whole history.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 90)
+        self.candles = {
+            stock.id: random_walk(self.days, seed=i)
+            for i, stock in enumerate(self.stocks)
+        }
+
+    def test_bar_aggregates_its_daily_candles(self):
+        for stock in self.stocks:
+            create_candles(stock, self.candles[stock.id])
+        update_timeframes()
+
+        week = self.candles[self.stocks[0].id][5:10]
+        bar = TimeframeCandle.objects.get(
+            stock=self.stocks[0], timeframe="week", period_start=week[0][0]
+        )
+        self.assertEqual(bar.data_date, week[-1][0])
+        self.assertAlmostEqual(float(bar.open_price), week[0][1], places=2)
+        self.assertAlmostEqual(float(bar.high_price), max(c[2] for c in week), 2)
+        self.assertAlmostEqual(float(bar.low_price), min(c[3] for c in week), 2)
+        self.assertAlmostEqual(float(bar.close_price), week[-1][4], places=2)
+        self.assertEqual(bar.volume, sum(c[5] for c in week))
+
+        july = [c for c in self.candles[self.stocks[0].id] if c[0].month == 7]
+        bar = TimeframeCandle.objects.get(
+            stock=self.stocks[0], timeframe="month", period_start=date(2025, 7, 1)
+        )
+        self.assertEqual(
+            (bar.data_date, bar.volume), (july[-1][0], sum(c[5] for c in july))
+        )
+        self.assertEqual(
+            TimeframeCandle.objects.filter(timeframe="week").count(), 3 * 18
+        )
+
+    def test_daily_folding_equals_a_full_resample(self):
+        for stock in self.stocks:
+            create_candles(stock, self.candles[stock.id][:3])
+        update_timeframes()
+        for position, day in enumerate(self.days[3:], start=3):
+            for stock in self.stocks:
+                create_candles(stock, [self.candles[stock.id][position]])
+            update_timeframes(day.isoformat(), day.isoformat())
+        folded = timeframe_rows()
+
+        update_timeframes()
+        self.assertEqual(timeframe_rows(), folded)
+        self.assertTrue(folded[1])
+
+    def test_rewritten_days_rebuild_their_periods(self):
+        for stock in self.stocks:
+            create_candles(stock, self.candles[stock.id])
+        update_timeframes()
+
+        # a refresh rewrites a folded mid-month day and adds a bar for a new stock
+        rewritten = self.days[30]
+        OHLCData.objects.filter(stock=self.stocks[1], data_date=rewritten).update(
+            high_price=500, close_price=450
+        )
+        late = create_stocks(4)[3]
+        create_candles(late, random_walk(self.days[28:33], seed=9))
+        update_timeframes(self.days[28].isoformat(), self.days[32].isoformat())
+        refreshed = timeframe_rows()
+
+        update_timeframes()
+        self.assertEqual(timeframe_rows(), refreshed)
+        bar = TimeframeCandle.objects.get(
+            stock=self.stocks[1],
+            timeframe="month",
+            period_start=period_start("month", rewritten),
+        )
+        self.assertEqual(bar.high_price, 500)
+
+    def test_listing_api_serves_the_weekly_patterns(self):
+        for stock in self.stocks:
+            create_candles(stock, self.candles[stock.id])
+        update_timeframes()
+        weekly = TimeframePattern.objects.filter(timeframe="week")
+        pattern = weekly.values_list("pattern", flat=True).first()
+        response = self.client.get(
+            reverse("API-Pattern-Occurrences", args=[pattern]),
+            {"timeframe": "week", "page_size": 100},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.json()["results"]), weekly.filter(pattern=pattern).count()
+        )
@@ -0,0 +1,113 @@
+"""
+Tests of the Upstox access token management.
+"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import requests
+from django.utils import timezone
+
+from candlestick import tokens
+from candlestick.models import UpatoxAccessToken
+from candlestick.tokens import (
+    AccessTokenError,
+    check_access_token,
+    expire_token,
+    get_access_token,
+    save_token,
+    token_expiry,
+)
+
+from .helpers import ScreenerTestCase
+
+
+def local_datetime(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class TokenExpiryTests(ScreenerTestCase):
+    """
+    Tokens expire at 03:30 IST after the day they are issued.
+    """
+
+    def test_expiry_is_the_next_0330(self):
+        self.assertEqual(
+            token_expiry(local_datetime(2025, 6, 2, 9, 0)),
+            local_datetime(2025, 6, 3, 3, 30),
+        )
+        self.assertEqual(
+            token_expiry(local_datetime(2025, 6, 2, 23, 59)),
+            local_datetime(2025, 6, 3, 3, 30),
+        )
+        # issued after midnight, before 03:30, it lasts until 03:30 the same day
+        self.assertEqual(
+            token_expiry(local_datetime(2025, 6, 3, 2, 0)),
+            local_datetime(2025, 6, 3, 3, 30),
+        )
+        self.assertEqual(
+            token_expiry(local_datetime(2025, 6, 3, 3, 30)),
+            local_datetime(2025, 6, 4, 3, 30),
+        )
+
+
+class AccessTokenTests(ScreenerTestCase):
+    """
+    The newest unexpired token is served from a short-lived cache.
+    """
+
+    def test_newest_unexpired_token_is_served(self):
+        with self.assertRaises(AccessTokenError):
+            get_access_token()
+        save_token("old", timezone.now() - timedelta(days=2))
+        with self.assertRaises(AccessTokenError):
+            get_access_token()
+        save_token("current", timezone.now() - timedelta(minutes=1))
+        save_token("earlier", timezone.now() - timedelta(hours=1))
+        self.assertEqual(get_access_token(), "current")
+
+    def test_cache_is_reread_after_its_ttl(self):
+        save_token("first")
+        self.assertEqual(get_access_token(), "first")
+        UpatoxAccessToken.objects.create(token="second")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_access_token(), "first")
+        with mock.patch.object(tokens, "TOKEN_CACHE_TTL", -1):
+            self.assertEqual(get_access_token(), "second")
+
+    def test_expired_tokens_are_skipped(self):
+        save_token("previous", timezone.now() - timedelta(minutes=5))
+        save_token("rejected")
+        self.assertEqual(get_access_token(), "rejected")
+        expire_token("rejected")
+        self.assertEqual(get_access_token(), "previous")
+
+
+class CheckAccessTokenTests(ScreenerTestCase):
+    """
+    One profile request proves the token before a refresh fans out.
+    """
+
+    def setUp(self):
+        super().setUp()
+        save_token("token")
+
+    def check(self, **kwargs):
+        with mock.patch.object(tokens.requests, "get", **kwargs) as get:
+            check_access_token("token")
+        return get
+
+    def test_accepted_token(self):
+        get = self.check(return_value=mock.Mock(status_code=200))
+        self.assertEqual(get.call_args.kwargs["headers"]["Authorization"], "token")
+        self.assertEqual(get_access_token(), "token")
+
+    def test_rejected_token_is_expired(self):
+        with self.assertRaises(AccessTokenError):
+            self.check(return_value=mock.Mock(status_code=401))
+        with self.assertRaises(AccessTokenError):
+            get_access_token()
+
+    def test_unreachable_upstox_does_not_fail_the_check(self):
+        self.check(side_effect=requests.ConnectionError("down"))
+        self.assertEqual(get_access_token(), "token")
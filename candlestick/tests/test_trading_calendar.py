@@ -0,0 +1,122 @@
+"""
+Tests of the NSE trading calendar and the refresh date resolution.
+"""
+
+from datetime import date, datetime
+from unittest import mock
+
+from django.utils import timezone
+
+from candlestick.trading_calendar import (
+    FIRST_YEAR,
+    NSE_HOLIDAYS,
+    TradingCalendar,
+    get_trading_calendar,
+)
+from candlestick.utils import resolve_refresh_dates
+
+from .helpers import ScreenerTestCase, create_candles, create_stocks
+
+
+def local_datetime(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class TradingCalendarTests(ScreenerTestCase):
+    """
+    Sessions skip weekends and exchange holidays.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.calendar = get_trading_calendar()
+
+    def test_weekends_and_holidays(self):
+        self.assertTrue(self.calendar.is_session("2025-08-14"))
+        self.assertFalse(self.calendar.is_session(date(2025, 8, 15)))  # holiday
+        self.assertFalse(self.calendar.is_session(date(2025, 8, 16)))  # Saturday
+        self.assertEqual(
+            self.calendar.next_session(date(2025, 8, 14)), date(2025, 8, 18)
+        )
+        self.assertEqual(
+            self.calendar.previous_session(date(2025, 8, 18)), date(2025, 8, 14)
+        )
+        self.assertEqual(
+            self.calendar.session_on_or_before("2025-08-17"), date(2025, 8, 14)
+        )
+        self.assertEqual(
+            self.calendar.session_on_or_after("2025-08-15"), date(2025, 8, 18)
+        )
+        self.assertEqual(
+            self.calendar.session_on_or_after("2025-08-14"), date(2025, 8, 14)
+        )
+
+    def test_sessions_between_matches_a_day_by_day_scan(self):
+        start, end = date(2024, 12, 20), date(2026, 1, 10)
+        expected = [
+            day
+            for day in (
+                date.fromordinal(ordinal)
+                for ordinal in range(start.toordinal(), end.toordinal() + 1)
+            )
+            if day.weekday() < 5 and day not in NSE_HOLIDAYS
+        ]
+        self.assertEqual(self.calendar.sessions_between(start, end), expected)
+        self.assertEqual(self.calendar.sessions_between("2025-08-15", "2025-08-17"), [])
+
+    def test_edges_of_the_calendar(self):
+        calendar = TradingCalendar(date(2025, 6, 2), date(2025, 6, 8), frozenset())
+        self.assertIsNone(calendar.previous_session(date(2025, 6, 2)))
+        self.assertIsNone(calendar.next_session(date(2025, 6, 6)))
+        for outside in (date(2025, 6, 1), date(2025, 6, 9)):
+            with self.subTest(day=outside), self.assertRaises(ValueError):
+                calendar.is_session(outside)
+        with self.assertRaises(ValueError):
+            calendar.next_session(date(2025, 6, 9))
+
+    def test_dates_before_the_listed_holidays_are_rejected(self):
+        first = date(FIRST_YEAR, 1, 1)
+        self.assertEqual(min(NSE_HOLIDAYS).year, FIRST_YEAR)
+        self.assertEqual(self.calendar.first, first)
+        with self.assertRaises(ValueError):
+            self.calendar.session_on_or_before(first.replace(year=FIRST_YEAR - 1))
+        with self.assertRaises(ValueError):
+            resolve_refresh_dates("2023-12-01", "2024-01-10")
+
+
+class ResolveRefreshDatesTests(ScreenerTestCase):
+    """
+    Refresh ranges are narrowed to sessions whose candles are final.
+    """
+
+    def test_explicit_range_is_narrowed_to_its_sessions(self):
+        self.assertEqual(resolve_refresh_dates("2025-08-15", "2025-08-17"), None)
+        self.assertEqual(
+            resolve_refresh_dates("2025-08-15", "2025-08-24"),
+            ("2025-08-18", "2025-08-22"),
+        )
+
+    def test_default_end_waits_for_the_market_close(self):
+        with mock.patch.object(
+            timezone, "localtime", return_value=local_datetime(2025, 8, 18, 15, 0)
+        ):
+            self.assertEqual(
+                resolve_refresh_dates("2025-08-11"), ("2025-08-11", "2025-08-14")
+            )
+        with mock.patch.object(
+            timezone, "localtime", return_value=local_datetime(2025, 8, 18, 16, 0)
+        ):
+            self.assertEqual(
+                resolve_refresh_dates("2025-08-11"), ("2025-08-11", "2025-08-18")
+            )
+
+    def test_default_start_follows_the_latest_candle(self):
+        create_candles(create_stocks(1)[0], [(date(2025, 8, 13), 1, 1, 1, 1)])
+        with mock.patch.object(
+            timezone, "localtime", return_value=local_datetime(2025, 8, 19, 18, 0)
+        ):
+            self.assertEqual(resolve_refresh_dates(), ("2025-08-14", "2025-08-19"))
+        with mock.patch.object(
+            timezone, "localtime", return_value=local_datetime(2025, 8, 13, 18, 0)
+        ):
+            self.assertIsNone(resolve_refresh_dates())
@@ -0,0 +1,92 @@
+"""
+Tests of the stored volume and the relative-volume filters.
+"""
+
+import statistics
+
+from django.urls import reverse
+
+from candlestick.caching import bump_data_generation
+from candlestick.indicators import update_indicators
+from candlestick.ingestion import store_stock_candles
+from candlestick.models import Hammer, OHLCData, TechnicalIndicator
+from candlestick.screener import run_screener
+
+from .helpers import ScreenerTestCase, create_candles, create_stocks, weekdays
+
+
+class RelativeVolumeTests(ScreenerTestCase):
+    """
+    Relative volume is the volume over the median of the previous 20 sessions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.stocks = create_stocks(3)
+        self.days = weekdays(self.start, 30)
+        # SYM0 trades 3x its usual volume on the last session, SYM1 1.6x, SYM2 1x
+        for stock, last_volume in zip(self.stocks, (3000, 1600, 1000)):
+            volumes = [900 + 10 * (i % 20) for i in range(len(self.days) - 1)]
+            create_candles(
+                stock,
+                [
+                    (day, 100, 101, 99, 100, volume)
+                    for day, volume in zip(self.days, volumes + [last_volume])
+                ],
+            )
+            Hammer.objects.create(stock=stock, data_date=self.days[-1])
+        update_indicators()
+        bump_data_generation()
+
+    def test_matches_the_median_of_the_previous_sessions(self):
+        for stock in self.stocks:
+            candles = list(
+                OHLCData.objects.filter(stock=stock)
+                .order_by("data_date")
+                .values_list("volume", "indicators__relative_volume")
+            )
+            for position, (volume, relative_volume) in enumerate(candles):
+                if position < 20:
+                    self.assertIsNone(relative_volume)
+                    continue
+                median = statistics.median(
+                    previous for previous, _ in candles[position - 20 : position]
+                )
+                self.assertAlmostEqual(relative_volume, volume / median, places=4)
+
+    def test_volume_filters_of_the_listing_and_the_screener(self):
+        url = reverse("API-Pattern-Occurrences", args=["hammer"])
+        response = self.client.get(url, {"volume": "confirmed"})
+        self.assertEqual(
+            [row["symbol"] for row in response.json()["results"]], ["SYM0", "SYM1"]
+        )
+        self.assertEqual(len(self.client.get(url).json()["results"]), 3)
+
+        def symbols(query):
+            return [stock["symbol"] for stock in run_screener(query)["stocks"]]
+
+        self.assertEqual(symbols({"volume_spike": True}), ["SYM0"])
+        self.assertEqual(symbols({"volume_spike": 1.5}), ["SYM0", "SYM1"])
+        self.assertEqual(
+            symbols({"pattern": "hammer", "volume_confirmed": True}), ["SYM0", "SYM1"]
+        )
+        self.assertEqual(symbols({"relative_volume": {"lt": 1.2}}), ["SYM2"])
+
+    def test_refresh_stores_volume_and_open_interest(self):
+        day = weekdays(self.days[-1], 2)[1]
+        store_stock_candles(
+            self.stocks[0],
+            day,
+            day,
+            [[f"{day.isoformat()}T00:00:00+05:30", 100, 102, 98, 101, 4321, 17]],
+        )
+        candle = OHLCData.objects.get(stock=self.stocks[0], data_date=day)
+        self.assertEqual((candle.volume, candle.open_interest), (4321, 17))
+
+        update_indicators(day.isoformat())
+        self.assertEqual(
+            TechnicalIndicator.objects.get(candle=candle).candles, len(self.days) + 1
+        )
+        response = self.client.get(reverse("API-OHLC", args=[self.stocks[0].id]))
+        row = next(r for r in response.json()["results"] if r["date"] == str(day))
+        self.assertEqual((row["volume"], row["open_interest"]), (4321, 17))
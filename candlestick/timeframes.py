@@ -0,0 +1,298 @@
+"""
+Weekly and monthly candles resampled from the stored daily candles.
+
+No extra Upstox calls are made: the refresh pipeline folds each newly fetched daily
+candle into the bar of its week and month (high/low extended, close and volume
+carried forward), so only the current period's bars change and history is never
+resampled. A period is rebuilt from its daily candles only when a refresh rewrites
+a day already folded into its bar, or when the bar does not exist yet.
+
+Every registered pattern is then detected on the changed periods with the same
+vectorized detectors as the daily candles, the double-candle patterns pairing each
+bar with the stock's previous one. Matches go to TimeframePattern.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+
+from .detection import double_candle_signals, single_candle_signals, to_paise
+from .models import OHLCData, TimeframeCandle, TimeframePattern
+
+# timeframe -> label shown by the listing pages' selector
+TIMEFRAMES = {
+    "day": "Daily",
+    "week": "Weekly",
+    "month": "Monthly",
+}
+RESAMPLED_TIMEFRAMES = ("week", "month")
+BAR_FIELDS = (
+    "data_date",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+)
+
+
+def period_start(timeframe, day):
+    """
+    Returns the first day of the week (Monday) or month containing the date.
+    """
+    if timeframe == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period_start(timeframe, start):
+    """
+    Returns the first day of the period after the one starting on `start`.
+    """
+    if timeframe == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=31)).replace(day=1)
+
+
+def previous_period_start(timeframe, start):
+    """
+    Returns the first day of the period before the one starting on `start`.
+    """
+    if timeframe == "week":
+        return start - timedelta(days=7)
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+def fold(bar, candle):
+    """
+    Folds a later daily candle into a bar.
+
+    Args:
+        bar (TimeframeCandle): Bar of the candle's period.
+        candle (tuple): (date, open, high, low, close, volume) of the daily candle.
+    """
+    data_date, _, high, low, close, volume = candle
+    bar.data_date = data_date
+    bar.high_price = max(bar.high_price, high)
+    bar.low_price = min(bar.low_price, low)
+    bar.close_price = close
+    bar.volume += volume
+
+
+def build_bar(stock_id, timeframe, start, candles):
+    """
+    Builds the bar of a period from its daily candles, oldest first.
+    """
+    _, open_price, high, low, close, volume = candles[0]
+    bar = TimeframeCandle(
+        stock_id=stock_id,
+        timeframe=timeframe,
+        period_start=start,
+        data_date=candles[0][0],
+        open_price=open_price,
+        high_price=high,
+        low_price=low,
+        close_price=close,
+        volume=volume,
+    )
+    for candle in candles[1:]:
+        fold(bar, candle)
+    return bar
+
+
+def group_candles(timeframe, candles):
+    """
+    Groups daily candles by (stock id, period start).
+
+    Args:
+        timeframe (str): "week" or "month".
+        candles (QuerySet): Daily candles ordered by stock and date.
+
+    Returns:
+        dict: (stock id, period start) -> list of (date, open, high, low, close,
+        volume) tuples, oldest first.
+    """
+    groups = defaultdict(list)
+    for stock_id, *candle in candles.values_list("stock_id", *BAR_FIELDS).iterator(
+        chunk_size=5000
+    ):
+        groups[(stock_id, period_start(timeframe, candle[0]))].append(candle)
+    return groups
+
+
+def update_timeframe_candles(timeframe, start_date=None, end_date=None):
+    """
+    Brings the bars of one timeframe up to date with the daily candles of a range.
+
+    Without dates every bar is rebuilt from the daily history.
+
+    Args:
+        timeframe (str): "week" or "month".
+        start_date (str, optional): First refreshed date ('YYYY-MM-DD').
+        end_date (str, optional): Last refreshed date ('YYYY-MM-DD').
+
+    Returns:
+        set: Start dates of the periods whose bars changed.
+    """
+    candles = OHLCData.objects.order_by("stock_id", "data_date")
+    if start_date is None:
+        groups = group_candles(timeframe, candles)
+        with transaction.atomic():
+            TimeframeCandle.objects.filter(timeframe=timeframe).delete()
+            TimeframeCandle.objects.bulk_create(
+                [
+                    build_bar(stock_id, timeframe, start, period_candles)
+                    for (stock_id, start), period_candles in groups.items()
+                ],
+                batch_size=1000,
+            )
+        return {start for _, start in groups}
+
+    groups = group_candles(
+        timeframe,
+        candles.filter(data_date__gte=start_date, data_date__lte=end_date),
+    )
+    periods = {start for _, start in groups}
+    bars = {
+        (bar.stock_id, bar.period_start): bar
+        for bar in TimeframeCandle.objects.filter(
+            timeframe=timeframe, period_start__in=periods
+        )
+    }
+    folded = []
+    rebuilt = set()
+    for key, period_candles in groups.items():
+        bar = bars.get(key)
+        if bar is not None and period_candles[0][0] > bar.data_date:
+            for candle in period_candles:
+                fold(bar, candle)
+            folded.append(bar)
+        else:
+            rebuilt.add(key)
+
+    new_bars = []
+    if rebuilt:
+        # the whole period, including days outside the refreshed range
+        first = min(start for _, start in rebuilt)
+        last = max(start for _, start in rebuilt)
+        period_groups = group_candles(
+            timeframe,
+            candles.filter(
+                stock_id__in={stock_id for stock_id, _ in rebuilt},
+                data_date__gte=first,
+                data_date__lt=next_period_start(timeframe, last),
+            ),
+        )
+        new_bars = [
+            build_bar(stock_id, timeframe, start, period_groups[(stock_id, start)])
+            for stock_id, start in rebuilt
+        ]
+
+    with transaction.atomic():
+        TimeframeCandle.objects.bulk_update(
+            folded,
+            ["data_date", "high_price", "low_price", "close_price", "volume"],
+            batch_size=1000,
+        )
+        TimeframeCandle.objects.filter(
+            pk__in=[bars[key].pk for key in rebuilt if key in bars]
+        ).delete()
+        TimeframeCandle.objects.bulk_create(new_bars, batch_size=1000)
+    return periods
+
+
+def detect_timeframe_patterns(timeframe, periods):
+    """
+    Detects every pattern on the bars of the given periods, replacing earlier matches.
+
+    Args:
+        timeframe (str): "week" or "month".
+        periods (set): Start dates of the periods to detect on.
+
+    Returns:
+        int: Number of pattern matches stored.
+    """
+    if not periods:
+        return 0
+    first = previous_period_start(timeframe, min(periods))
+    rows = list(
+        TimeframeCandle.objects.filter(
+            timeframe=timeframe,
+            period_start__gte=first,
+            period_start__lte=max(periods),
+        )
+        .order_by("stock_id", "period_start")
+        .values_list(
+            "stock_id",
+            "period_start",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price",
+        )
+    )
+    matches = []
+    if rows:
+        stock_ids, starts, *prices = zip(*rows)
+        stock_ids = np.array(stock_ids)
+        prices = [to_paise(column) for column in prices]
+        selected = np.array([start in periods for start in starts])
+
+        single = single_candle_signals(*prices)
+        # bar i + 1 is paired with bar i when both belong to the same stock
+        paired = selected[1:] & (stock_ids[1:] == stock_ids[:-1])
+        double = double_candle_signals(
+            tuple(column[:-1] for column in prices),
+            tuple(column[1:] for column in prices),
+        )
+        for signals, mask_selected, offset in (
+            (single, selected, 0),
+            (double, paired, 1),
+        ):
+            for slug, (mask, strength) in signals.items():
+                matches += [
+                    TimeframePattern(
+                        stock_id=int(stock_ids[i + offset]),
+                        timeframe=timeframe,
+                        pattern=slug,
+                        data_date=starts[i + offset],
+                        strength=round(float(strength[i]), 4),
+                    )
+                    for i in np.flatnonzero(mask & mask_selected)
+                ]
+
+    with transaction.atomic():
+        # the periods are contiguous, so a range replaces an unbounded IN list
+        TimeframePattern.objects.filter(
+            timeframe=timeframe,
+            data_date__gte=min(periods),
+            data_date__lte=max(periods),
+        ).delete()
+        TimeframePattern.objects.bulk_create(matches, batch_size=1000)
+    return len(matches)
+
+
+def update_timeframes(start_date=None, end_date=None):
+    """
+    Updates the weekly and monthly bars and their patterns after a refresh.
+
+    Args:
+        start_date (str, optional): First refreshed date ('YYYY-MM-DD'); without
+            dates everything is rebuilt.
+        end_date (str, optional): Last refreshed date ('YYYY-MM-DD').
+
+    Returns:
+        int: Number of pattern matches stored.
+    """
+    logger = logging.getLogger("stock_screener_logger")
+    stored = 0
+    for timeframe in RESAMPLED_TIMEFRAMES:
+        periods = update_timeframe_candles(timeframe, start_date, end_date)
+        stored += detect_timeframe_patterns(timeframe, periods)
+        logger.info(  # pylint: disable=W1203
+            f"{TIMEFRAMES[timeframe]} candles updated for {len(periods)} periods"
+        )
+    return stored
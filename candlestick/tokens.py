@@ -0,0 +1,155 @@
+"""
+Upstox access token management.
+
+Tokens are stored with their issue and expiry time; Upstox access tokens stop
+working at 03:30 IST the day after they are issued. get_access_token() serves the
+newest token that has not expired from an in-process cache that is re-read from the
+database every TOKEN_CACHE_TTL seconds, so the ingestion workers of one process
+share a single lookup and pick up a newly saved token within the TTL.
+
+Before a refresh fans out to every stock, check_access_token() spends one cheap
+profile request to make sure Upstox accepts the token; a rejected token is marked
+expired and the refresh fails on that request instead of on every stock.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from datetime import time as clock_time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UpatoxAccessToken
+
+TOKEN_CACHE_TTL = 60
+# Upstox access tokens expire at this local time on the day after they are issued
+TOKEN_EXPIRY_TIME = clock_time(3, 30)
+
+
+class AccessTokenError(RuntimeError):
+    """
+    Raised when no valid Upstox access token is available.
+    """
+
+
+def token_expiry(issued_at):
+    """
+    Returns when a token issued at the given time expires.
+    """
+    issued_at = timezone.localtime(issued_at)
+    expires_at = timezone.make_aware(
+        datetime.combine(issued_at.date(), TOKEN_EXPIRY_TIME)
+    )
+    if expires_at <= issued_at:
+        expires_at = timezone.make_aware(
+            datetime.combine(issued_at.date() + timedelta(days=1), TOKEN_EXPIRY_TIME)
+        )
+    return expires_at
+
+
+_token_lock = threading.Lock()
+_cached_token = None
+_cached_at = 0.0
+
+
+def clear_token_cache():
+    """
+    Drops the cached token so the next lookup reads the database.
+    """
+    global _cached_token  # pylint: disable=W0603
+    with _token_lock:
+        _cached_token = None
+
+
+def save_token(token, issued_at=None):
+    """
+    Stores a newly issued access token.
+
+    Args:
+        token (str): The access token.
+        issued_at (datetime, optional): When it was issued, default now.
+
+    Returns:
+        UpatoxAccessToken: The stored token.
+    """
+    issued_at = issued_at or timezone.now()
+    stored = UpatoxAccessToken.objects.create(
+        token=token, issued_at=issued_at, expires_at=token_expiry(issued_at)
+    )
+    clear_token_cache()
+    return stored
+
+
+def get_access_token():
+    """
+    Returns the newest access token that has not expired.
+
+    Returns:
+        str: The access token.
+
+    Raises:
+        AccessTokenError: If every stored token has expired.
+    """
+    global _cached_token, _cached_at  # pylint: disable=W0603
+    now = timezone.now()
+    with _token_lock:
+        if (
+            _cached_token is None
+            or time.monotonic() - _cached_at > TOKEN_CACHE_TTL
+            or (_cached_token.expires_at and _cached_token.expires_at <= now)
+        ):
+            _cached_token = (
+                UpatoxAccessToken.objects.filter(
+                    Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+                )
+                .order_by("-issued_at", "-id")
+                .first()
+            )
+            _cached_at = time.monotonic()
+        if _cached_token is None:
+            raise AccessTokenError(
+                "No valid Upstox access token, log in to Upstox again."
+            )
+        return _cached_token.token
+
+
+def expire_token(token):
+    """
+    Marks a token Upstox rejected as expired.
+    """
+    UpatoxAccessToken.objects.filter(token=token).update(expires_at=timezone.now())
+    clear_token_cache()
+
+
+def check_access_token(access_token):
+    """
+    Checks with one profile request that Upstox accepts the token.
+
+    Only a rejection fails the check; when Upstox cannot be reached the refresh
+    goes ahead and its requests are retried as usual.
+
+    Args:
+        access_token (str): The access token.
+
+    Raises:
+        AccessTokenError: If Upstox rejects the token.
+    """
+    logger = logging.getLogger("stock_screener_logger")
+    headers = {"Accept": "application/json", "Authorization": access_token}
+    try:
+        response = requests.get(
+            f"{settings.UPSTOX_API_URL}/v2/user/profile", headers=headers, timeout=30
+        )
+    except requests.RequestException as e:
+        logger.warning(f"Access token check skipped: {e}")  # pylint: disable=W1203
+        return
+    if response.status_code in (401, 403):
+        expire_token(access_token)
+        raise AccessTokenError(
+            "Upstox rejected the access token, log in to Upstox again."
+        )
@@ -0,0 +1,192 @@
+"""
+NSE trading calendar.
+
+Sessions are the weekdays that are not exchange holidays. The calendar precomputes,
+for every day of its span, how many sessions fall before it, so checking a date and
+stepping to the previous or next session are a dict lookup and a list index rather
+than a scan or a database query.
+
+The holiday list is local, no calendar is fetched at run time: add the exchange's
+trading holidays to NSE_HOLIDAYS when they are announced each year. The calendar
+starts on 1 January of FIRST_YEAR, the first year whose holidays are listed, and
+dates before it raise ValueError instead of counting unlisted holidays as sessions;
+list the holidays of earlier years and lower FIRST_YEAR to cover older history.
+"""
+
+import functools
+from array import array
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+# first year of NSE_HOLIDAYS, and of the calendar
+FIRST_YEAR = 2024
+# NSE equity segment trading holidays falling on weekdays
+NSE_HOLIDAYS = frozenset(
+    date.fromisoformat(day)
+    for day in (
+        # 2024
+        "2024-01-22",
+        "2024-01-26",
+        "2024-03-08",
+        "2024-03-25",
+        "2024-03-29",
+        "2024-04-11",
+        "2024-04-17",
+        "2024-05-01",
+        "2024-05-20",
+        "2024-06-17",
+        "2024-07-17",
+        "2024-08-15",
+        "2024-10-02",
+        "2024-11-01",
+        "2024-11-15",
+        "2024-11-20",
+        "2024-12-25",
+        # 2025
+        "2025-02-26",
+        "2025-03-14",
+        "2025-03-31",
+        "2025-04-10",
+        "2025-04-14",
+        "2025-04-18",
+        "2025-05-01",
+        "2025-08-15",
+        "2025-08-27",
+        "2025-10-02",
+        "2025-10-21",
+        "2025-10-22",
+        "2025-11-05",
+        "2025-12-25",
+        # 2026
+        "2026-01-15",
+        "2026-01-26",
+        "2026-03-03",
+        "2026-03-26",
+        "2026-03-31",
+        "2026-04-03",
+        "2026-04-14",
+        "2026-05-01",
+        "2026-05-28",
+        "2026-06-26",
+        "2026-09-14",
+        "2026-10-02",
+        "2026-10-20",
+        "2026-11-10",
+        "2026-11-24",
+        "2026-12-25",
+    )
+)
+
+
+def to_date(value):
+    """
+    Returns a date from a date or a 'YYYY-MM-DD' string.
+    """
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class TradingCalendar:
+    """
+    Trading sessions between two dates with constant-time lookups.
+
+    Attributes:
+        first (date): First day covered.
+        sessions (list): Session dates, oldest first.
+        positions (dict): Session date -> position in sessions.
+        before (array): Number of sessions before each covered day, indexed by the
+            day's distance from `first`.
+    """
+
+    def __init__(self, first, last, holidays):
+        self.first = first
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        self.sessions = []
+        self.before = array("l")
+        for day in days:
+            self.before.append(len(self.sessions))
+            if day.weekday() < 5 and day not in holidays:
+                self.sessions.append(day)
+        self.positions = {day: i for i, day in enumerate(self.sessions)}
+
+    def _sessions_before(self, day):
+        """
+        Returns how many sessions fall before the day.
+
+        Raises:
+            ValueError: If the day is outside the calendar.
+        """
+        offset = (day - self.first).days
+        if not 0 <= offset < len(self.before):
+            last = self.first + timedelta(days=len(self.before) - 1)
+            raise ValueError(
+                f"{day} is outside the trading calendar ({self.first} to {last})."
+            )
+        return self.before[offset]
+
+    def is_session(self, day):
+        """
+        Returns whether the exchange trades on the date.
+
+        Raises:
+            ValueError: If the day is outside the calendar.
+        """
+        day = to_date(day)
+        self._sessions_before(day)
+        return day in self.positions
+
+    def previous_session(self, day):
+        """
+        Returns the last session strictly before the date, or None.
+        """
+        count = self._sessions_before(to_date(day))
+        return self.sessions[count - 1] if count else None
+
+    def next_session(self, day):
+        """
+        Returns the first session strictly after the date, or None.
+        """
+        day = to_date(day)
+        position = self._sessions_before(day) + (day in self.positions)
+        return self.sessions[position] if position < len(self.sessions) else None
+
+    def session_on_or_before(self, day):
+        """
+        Returns the date itself if it is a session, else the previous session.
+        """
+        day = to_date(day)
+        return day if day in self.positions else self.previous_session(day)
+
+    def session_on_or_after(self, day):
+        """
+        Returns the date itself if it is a session, else the next session.
+        """
+        day = to_date(day)
+        return day if day in self.positions else self.next_session(day)
+
+    def sessions_between(self, start_date, end_date):
+        """
+        Returns the sessions from start_date to end_date, both included.
+        """
+        start_date, end_date = to_date(start_date), to_date(end_date)
+        return self.sessions[
+            self._sessions_before(start_date) : self._sessions_before(end_date)
+            + (end_date in self.positions)
+        ]
+
+
+@functools.cache
+def get_trading_calendar():
+    """
+    Returns the NSE trading calendar from FIRST_YEAR to the end of next year.
+
+    Returns:
+        TradingCalendar: Calendar shared by the process.
+    """
+    return TradingCalendar(
+        date(FIRST_YEAR, 1, 1),
+        date(timezone.localdate().year + 1, 12, 31),
+        NSE_HOLIDAYS,
+    )
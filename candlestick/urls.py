@@ -8,24 +8,37 @@ Paths:
 - Home
 - Upload OHLC stock data
 - Display detected candlestick patterns (e.g., Hammer, Doji, Kicker, Engulfing)
+- Stock detail page with a downsampled candle chart and pattern markers
 - Upstox authentication flow (start + success redirect)
+- Live refresh progress (Server-Sent Events)
+- Streaming CSV / JSON Lines exports of pattern occurrences and OHLC history
+- Read-only JSON API for pattern occurrences, stocks, OHLC ranges and sector breadth
+- Forward-return backtest of every pattern, by pattern and sector
+- Screener query API combining pattern, sector and price conditions
+- Shape-similarity search over the most recent candles of every stock
 """
 
 from django.urls import path
 
+from .api_views import (
+    BacktestAPIView,
+    OHLCListAPIView,
+    PatternOccurrenceListAPIView,
+    ScreenerAPIView,
+    SectorBreadthListAPIView,
+    SimilarityAPIView,
+    StockChartAPIView,
+    StockListAPIView,
+)
 from .views import (
     UploadStockDataView,
-    bearish_engulfing_view,
-    bearish_kicker_view,
-    bullish_engulfing_view,
-    bullish_kicker_view,
     candlestickpatterns_view,
-    doji_view,
-    hammer_view,
+    export_ohlc_view,
+    export_patterns_view,
     home_view,
-    inverted_hammer_view,
-    pro_gap_positive_view,
-    spinning_top_bottom_view,
+    pattern_list_view,
+    refresh_events_view,
+    stock_detail_view,
     upstox_authentication_success,
     upstox_authentication_view,
 )
@@ -34,6 +47,7 @@ urlpatterns = [
     path("", home_view, name="Home"),
     path("upload_stock_data", UploadStockDataView.as_view(), name="Upload Stock Data"),
     path("candlestick", candlestickpatterns_view, name="CandleStick"),
+    path("candlestick/refresh-events", refresh_events_view, name="Refresh-Events"),
     path(
         "upstox-authentication",
         upstox_authentication_view,
@@ -42,15 +56,71 @@ urlpatterns = [
     path(
         "success", upstox_authentication_success, name="upstox_authentication_success"
     ),
-    path("hammer", hammer_view, name="Hammer-Page"),
-    path("inverted-hammer", inverted_hammer_view, name="Inverted-Hammer-Page"),
-    path("doji", doji_view, name="Doji-Page"),
+    path("stock/<int:stock_id>", stock_detail_view, name="Stock-Detail"),
+    path("hammer", pattern_list_view, {"pattern": "hammer"}, name="Hammer-Page"),
+    path(
+        "inverted-hammer",
+        pattern_list_view,
+        {"pattern": "inverted-hammer"},
+        name="Inverted-Hammer-Page",
+    ),
+    path("doji", pattern_list_view, {"pattern": "doji"}, name="Doji-Page"),
+    path(
+        "spinning-top-bottom",
+        pattern_list_view,
+        {"pattern": "spinning-top-bottom"},
+        name="Spinning-Top-Bottom-Page",
+    ),
+    path(
+        "pro-gap-positive",
+        pattern_list_view,
+        {"pattern": "pro-gap-positive"},
+        name="Pro-Gap-Page",
+    ),
+    path(
+        "bullish-engulfing",
+        pattern_list_view,
+        {"pattern": "bullish-engulfing"},
+        name="Bullish-Engulfing-Page",
+    ),
+    path(
+        "bearish-engulfing",
+        pattern_list_view,
+        {"pattern": "bearish-engulfing"},
+        name="Bearish-Engulfing-Page",
+    ),
+    path(
+        "bullish-kicker",
+        pattern_list_view,
+        {"pattern": "bullish-kicker"},
+        name="Bullish-Kicker-Page",
+    ),
+    path(
+        "bearish-kicker",
+        pattern_list_view,
+        {"pattern": "bearish-kicker"},
+        name="Bearish-Kicker-Page",
+    ),
+    path(
+        "api/patterns/<slug:pattern>",
+        PatternOccurrenceListAPIView.as_view(),
+        name="API-Pattern-Occurrences",
+    ),
+    path("api/stocks", StockListAPIView.as_view(), name="API-Stocks"),
+    path("api/stocks/<int:stock_id>/ohlc", OHLCListAPIView.as_view(), name="API-OHLC"),
+    path(
+        "api/stocks/<int:stock_id>/chart",
+        StockChartAPIView.as_view(),
+        name="API-Stock-Chart",
+    ),
     path(
-        "spinning-top-bottom", spinning_top_bottom_view, name="Spinning-Top-Bottom-Page"
+        "api/sectors/breadth",
+        SectorBreadthListAPIView.as_view(),
+        name="API-Sector-Breadth",
     ),
-    path("pro-gap-positive", pro_gap_positive_view, name="Pro-Gap-Page"),
-    path("bullish-engulfing", bullish_engulfing_view, name="Bullish-Engulfing-Page"),
-    path("bearish-engulfing", bearish_engulfing_view, name="Bearish-Engulfing-Page"),
-    path("bullish-kicker", bullish_kicker_view, name="Bullish-Kicker-Page"),
-    path("bearish-kicker", bearish_kicker_view, name="Bearish-Kicker-Page"),
+    path("api/backtest", BacktestAPIView.as_view(), name="API-Backtest"),
+    path("api/screener", ScreenerAPIView.as_view(), name="API-Screener"),
+    path("api/similar", SimilarityAPIView.as_view(), name="API-Similar"),
+    path("export/patterns", export_patterns_view, name="Export-Patterns"),
+    path("export/ohlc", export_ohlc_view, name="Export-OHLC"),
 ]
@@ -3,25 +3,58 @@ Utility module for candlestock app
 """
 
 import logging
-import time
-from datetime import datetime
-
-import requests
-
-from .models import (
-    BearishEngulfing,
-    BearishKicker,
-    BullishEngulfing,
-    BullishKicker,
-    Doji,
-    Hammer,
-    InvertedHammer,
-    OHLCData,
-    ProGapPositive,
-    SpinningTopBottom,
-    Stock,
-    UpatoxAccessToken,
-)
+from datetime import time as clock_time
+
+import numpy as np
+from django.utils import timezone
+
+from .backtest import get_backtest
+from .bitset_index import update_bitset_index
+from .breadth import update_sector_breadth
+from .caching import bump_data_generation
+from .detection import double_candle_signals, single_candle_signals, to_paise
+from .indicators import update_indicators
+from .ingestion import create_shards, ingest_run, worker_name
+from .models import OHLCData
+from .patterns import PATTERNS
+from .progress import RefreshProgress
+from .screener import get_pattern_index
+from .similarity import update_shape_index
+from .summary import update_pattern_summary
+from .timeframes import update_timeframes
+from .tokens import check_access_token, get_access_token
+from .trading_calendar import get_trading_calendar, to_date
+
+# the day's candle is final once the market closes
+MARKET_CLOSE = clock_time(15, 30)
+
+
+def _single_candle_match(slug, open_price, high_price, low_price, close_price):
+    """
+    Runs the vectorized single-candle detector of a pattern on one candle.
+    """
+    signals = single_candle_signals(
+        *(
+            to_paise([price])
+            for price in (open_price, high_price, low_price, close_price)
+        )
+    )
+    return bool(signals[slug][0][0])
+
+
+def _double_candle_match(slug, first_candle, second_candle):
+    """
+    Runs the vectorized double-candle detector of a pattern on one candle pair.
+    """
+
+    def prices(candle):
+        return tuple(
+            to_paise([candle.get(field)])
+            for field in ("open_price", "high_price", "low_price", "close_price")
+        )
+
+    signals = double_candle_signals(prices(first_candle), prices(second_candle))
+    return bool(signals[slug][0][0])
 
 
 def is_hammer(open_price, high_price, low_price, close_price):
@@ -37,25 +70,9 @@ def is_hammer(open_price, high_price, low_price, close_price):
     Returns:
         bool: True or False
     """
-    if open_price == 0 and close_price == 0 and low_price == 0 and high_price == 0:
-        return False
-
-    if open_price == close_price == high_price == low_price:
-        return False
-
-    body = float(abs(close_price - open_price))  # Real body
-    lower_shadow = 0
-    upper_shadow = 0
-    if close_price > open_price:
-        upper_shadow = float(high_price - close_price)
-        lower_shadow = float(open_price - low_price)
-    else:
-        upper_shadow = float(high_price - open_price)
-        lower_shadow = float(close_price - low_price)
-
-    if (lower_shadow >= (body * 2)) and (upper_shadow <= (body * 0.5)):
-        return True
-    return False
+    return _single_candle_match(
+        "hammer", open_price, high_price, low_price, close_price
+    )
 
 
 def is_inverted_hammer(open_price, high_price, low_price, close_price):
@@ -71,25 +88,9 @@ def is_inverted_hammer(open_price, high_price, low_price, close_price):
     Returns:
         bool: True or False
     """
-    if open_price == 0 and close_price == 0 and low_price == 0 and high_price == 0:
-        return False
-
-    if open_price == close_price == high_price == low_price:
-        return False
-
-    body = float(abs(close_price - open_price))  # Real body
-    lower_shadow = 0
-    upper_shadow = 0
-    if close_price > open_price:
-        upper_shadow = float(high_price - close_price)
-        lower_shadow = float(open_price - low_price)
-    else:
-        upper_shadow = float(high_price - open_price)
-        lower_shadow = float(close_price - low_price)
-
-    if (upper_shadow >= (body * 2)) and (lower_shadow <= (body * 0.5)):
-        return True
-    return False
+    return _single_candle_match(
+        "inverted-hammer", open_price, high_price, low_price, close_price
+    )
 
 
 def is_spinning_top_bottom(open_price, high_price, low_price, close_price):
@@ -105,27 +106,9 @@ def is_spinning_top_bottom(open_price, high_price, low_price, close_price):
     Returns:
         bool: True or False
     """
-    if open_price == 0 and close_price == 0 and low_price == 0 and high_price == 0:
-        return False
-
-    if open_price == close_price == high_price == low_price:
-        return False
-
-    body = float(abs(close_price - open_price))  # Real body
-    lower_shadow = 0
-    upper_shadow = 0
-
-    if close_price > open_price:
-        upper_shadow = float(high_price - close_price)
-        lower_shadow = float(open_price - low_price)
-    else:
-        upper_shadow = float(high_price - open_price)
-        lower_shadow = float(close_price - low_price)
-
-    if (lower_shadow >= body * 1.5) and (upper_shadow >= body * 1.5):
-        return True
-
-    return False
+    return _single_candle_match(
+        "spinning-top-bottom", open_price, high_price, low_price, close_price
+    )
 
 
 def is_doji(open_price, high_price, low_price, close_price):
@@ -141,346 +124,308 @@ def is_doji(open_price, high_price, low_price, close_price):
     Returns:
         bool: True or False
     """
-    if open_price == close_price == high_price == low_price:
-        return False
-
-    if open_price == close_price:
-        return True
-
-    return False
+    return _single_candle_match("doji", open_price, high_price, low_price, close_price)
 
 
 def is_bullish_engulfing(first_candle, second_candle):
     """
     Method for bullish engulfing candle stick pattern.
     """
-
-    # first_high = first_candle.get("high_price")
-    # first_low = first_candle.get("low_price")
-    first_open = first_candle.get("open_price")
-    first_close = first_candle.get("close_price")
-
-    # second_high = second_candle.get("high_price")
-    # second_low = second_candle.get("low_price")
-    second_open = second_candle.get("open_price")
-    second_close = second_candle.get("close_price")
-
-    # Check if the first candle is bearish
-    is_first_bearish = first_close < first_open
-
-    # Check if the second candle is bullish
-    is_second_bullish = second_close > second_open
-
-    # Check if the second candle engulfs the first candle
-    is_engulfing = (second_open <= first_close) and (second_close >= first_open)
-
-    # Return True if all conditions are met
-    return is_first_bearish and is_second_bullish and is_engulfing
+    return _double_candle_match("bullish-engulfing", first_candle, second_candle)
 
 
 def is_bearish_engulfing(first_candle, second_candle):
     """
     Method for bearish engulfing candle stick pattern.
     """
-
-    # first_high = first_candle.get("high_price")
-    # first_low = first_candle.get("low_price")
-    first_open = first_candle.get("open_price")
-    first_close = first_candle.get("close_price")
-
-    # second_high = second_candle.get("high_price")
-    # second_low = second_candle.get("low_price")
-    second_open = second_candle.get("open_price")
-    second_close = second_candle.get("close_price")
-
-    # Check if the first candle is bullish
-    is_first_bullish = first_close > first_open
-
-    # Check if the second candle is bearish
-    is_second_bearish = second_close < second_open
-
-    # Check if the second candle engulfs the first candle
-    is_engulfing = (second_open >= first_close) and (second_close <= first_open)
-
-    # Return True if all conditions are met
-    return is_first_bullish and is_second_bearish and is_engulfing
+    return _double_candle_match("bearish-engulfing", first_candle, second_candle)
 
 
 def is_bullish_kicker(first_candle, second_candle):
     """
     Method for bullish kicker candle stick pattern.
     """
-    first_high = first_candle.get("high_price")
-    # first_low = first_candle.get("low_price")
-    first_open = first_candle.get("open_price")
-    first_close = first_candle.get("close_price")
-
-    # second_high = second_candle.get("high_price")
-    second_low = second_candle.get("low_price")
-    second_open = second_candle.get("open_price")
-    second_close = second_candle.get("close_price")
-
-    # check if the first candle is bearish
-    is_first_bearish = first_close < first_open
-
-    # check if the second candle is bullish
-    is_second_bullish = second_close > second_open
-
-    # No overlap in prices
-    no_overlap = first_high <= second_low
-
-    return is_first_bearish and is_second_bullish and no_overlap
+    return _double_candle_match("bullish-kicker", first_candle, second_candle)
 
 
 def is_bearish_kicker(first_candle, second_candle):
     """
     Method for bearish kicker candle stick pattern.
     """
-    # first_high = first_candle.get("high_price")
-    first_low = first_candle.get("low_price")
-    first_open = first_candle.get("open_price")
-    first_close = first_candle.get("close_price")
-
-    second_high = second_candle.get("high_price")
-    # second_low = second_candle.get("low_price")
-    second_open = second_candle.get("open_price")
-    second_close = second_candle.get("close_price")
-
-    # check if the first candle is bullish
-    is_first_bullish = first_close > first_open
-
-    # check if the second candle is bearish
-    is_second_bearish = second_close < second_open
-
-    # No overlap in prices
-    no_overlap = first_low >= second_high
-
-    return is_first_bullish and is_second_bearish and no_overlap
+    return _double_candle_match("bearish-kicker", first_candle, second_candle)
 
 
 def is_pro_gap_positive(first_candle, second_candle):
     """
-    Method for bearish kicker candle stick pattern.
+    Method for pro gap positive candle stick pattern.
     """
-    # first_high = first_candle.get("high_price")
-    # first_low = first_candle.get("low_price")
-    first_open = first_candle.get("open_price")
-    first_close = first_candle.get("close_price")
+    return _double_candle_match("pro-gap-positive", first_candle, second_candle)
 
-    # second_high = second_candle.get("high_price")
-    # second_low = second_candle.get("low_price")
-    second_open = second_candle.get("open_price")
-    second_close = second_candle.get("close_price")
 
-    # check if the first candle is bearish
-    is_first_bearish = first_close < first_open
+SINGLE_CANDLE_PATTERNS = ("hammer", "inverted-hammer", "doji", "spinning-top-bottom")
+DOUBLE_CANDLE_PATTERNS = (
+    "pro-gap-positive",
+    "bullish-engulfing",
+    "bearish-engulfing",
+    "bullish-kicker",
+    "bearish-kicker",
+)
 
-    # check if the second candle is bullish
-    is_second_bullish = second_close > second_open
 
-    # condition for pro gap
-    gap_positive = second_open > first_close
+def store_pattern_signals(signals, stock_ids, dates, selected=None):
+    """
+    Stores the matches of detected patterns with their strength scores.
 
-    return is_first_bearish and is_second_bullish and gap_positive
+    Args:
+        signals (dict): Pattern slug -> (mask, strength) from candlestick.detection.
+        stock_ids (ndarray): Stock id of each candle.
+        dates (list): Date of each candle.
+        selected (ndarray, optional): Mask of the candles that may be stored.
 
+    Returns:
+        int: Number of pattern occurrences stored.
+    """
+    stored = 0
+    for slug, (mask, strength) in signals.items():
+        if selected is not None:
+            mask = mask & selected
+        model = PATTERNS[slug]["model"]
+        occurrences = [
+            model(
+                data_date=dates[i],
+                stock_id=int(stock_ids[i]),
+                strength=round(float(strength[i]), 4),
+            )
+            for i in np.flatnonzero(mask)
+        ]
+        model.objects.bulk_create(occurrences, batch_size=1000)
+        stored += len(occurrences)
+    return stored
 
-def identify_single_candle_pattern():
+
+def identify_single_candle_pattern(start_date, end_date):
     """
-    Method for identify the single candlestick pattern and store in the table
+    Method for identify the single candlestick pattern and store in the table.
+
+    Every candle between start_date and end_date is checked and previous results for
+    those dates are replaced, so older history is kept. Detection and strength
+    scores are computed on whole arrays, see candlestick.detection.
+
+    Returns:
+        int: Number of pattern occurrences stored.
     """
     logger = logging.getLogger("stock_screener_logger")
-    ohlc_data = OHLCData.objects.filter(data_date=datetime.today())
-    hammers = []
-    inverted_hammers = []
-    dojis = []
-    spinning_top_bottoms = []
-
     logger.info("Single CandleStick data loading started..")
 
-    # delete old data
-    Hammer.objects.all().delete()
-    InvertedHammer.objects.all().delete()
-    Doji.objects.all().delete()
-    SpinningTopBottom.objects.all().delete()
+    # delete old data of the refreshed dates
+    for slug in SINGLE_CANDLE_PATTERNS:
+        PATTERNS[slug]["model"].objects.filter(
+            data_date__gte=start_date, data_date__lte=end_date
+        ).delete()
     logger.info("Old data deleted.")
 
-    for ohlc in ohlc_data:
-        if is_hammer(
-            open_price=ohlc.open_price,
-            close_price=ohlc.close_price,
-            high_price=ohlc.high_price,
-            low_price=ohlc.low_price,
-        ):
-            hammers.append(Hammer(data_date=ohlc.data_date, stock=ohlc.stock))
-        if is_inverted_hammer(
-            open_price=ohlc.open_price,
-            close_price=ohlc.close_price,
-            high_price=ohlc.high_price,
-            low_price=ohlc.low_price,
-        ):
-            inverted_hammers.append(
-                InvertedHammer(data_date=ohlc.data_date, stock=ohlc.stock)
-            )
-        if is_doji(
-            open_price=ohlc.open_price,
-            close_price=ohlc.close_price,
-            high_price=ohlc.high_price,
-            low_price=ohlc.low_price,
-        ):
-            dojis.append(Doji(data_date=ohlc.data_date, stock=ohlc.stock))
-        if is_spinning_top_bottom(
-            open_price=ohlc.open_price,
-            close_price=ohlc.close_price,
-            high_price=ohlc.high_price,
-            low_price=ohlc.low_price,
-        ):
-            spinning_top_bottoms.append(
-                SpinningTopBottom(data_date=ohlc.data_date, stock=ohlc.stock)
-            )
-    if hammers:
-        Hammer.objects.bulk_create(hammers, batch_size=200)
-    if inverted_hammers:
-        InvertedHammer.objects.bulk_create(inverted_hammers, batch_size=200)
-    if dojis:
-        Doji.objects.bulk_create(dojis, batch_size=200)
-    if spinning_top_bottoms:
-        SpinningTopBottom.objects.bulk_create(spinning_top_bottoms, batch_size=1000)
+    rows = list(
+        OHLCData.objects.filter(
+            data_date__gte=start_date, data_date__lte=end_date
+        ).values_list(
+            "stock_id",
+            "data_date",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price",
+        )
+    )
+    if not rows:
+        return 0
+    stock_ids, dates, open_, high, low, close = zip(*rows)
+
+    signals = single_candle_signals(
+        to_paise(open_), to_paise(high), to_paise(low), to_paise(close)
+    )
+    stored = store_pattern_signals(signals, np.array(stock_ids), dates)
 
     logger.info("Single CandleStick data loading finished")
+    return stored
 
 
 def identify_double_candle_pattern(start_date, end_date):
     """
-    Method for identify the double candlestick pattern and store in the table
+    Method for identify the double candlestick pattern and store in the table.
+
+    Each stock's candles between start_date and end_date are paired with the
+    stock's previous candle, and previous results for those dates are replaced.
+    Detection and strength scores are computed on whole arrays of candle pairs,
+    see candlestick.detection.
+
+    Returns:
+        int: Number of pattern occurrences stored.
     """
     logger = logging.getLogger("stock_screener_logger")
-    ohlc_data = OHLCData.objects.filter()
-    pro_gap_positive = []
-    bullish_engulfing = []
-    bearish_engulfing = []
-    bullish_kicker = []
-    bearish_kicker = []
-
+    first_date = to_date(start_date)
+    # the first candle of the range is paired with the session before it, which is
+    # not simply the previous day across weekends and holidays
+    previous_session = get_trading_calendar().previous_session(first_date)
     logger.info("Double CandleStick data loading started..")
 
-    # delete old data
-    ProGapPositive.objects.all().delete()
-    BullishEngulfing.objects.all().delete()
-    BearishEngulfing.objects.all().delete()
-    BullishKicker.objects.all().delete()
-    BearishKicker.objects.all().delete()
+    # delete old data of the refreshed dates
+    for slug in DOUBLE_CANDLE_PATTERNS:
+        PATTERNS[slug]["model"].objects.filter(
+            data_date__gte=start_date, data_date__lte=end_date
+        ).delete()
     logger.info("Old data deleted.")
 
-    today_data = ohlc_data.filter(data_date=end_date)
-    yesterday_data = ohlc_data.filter(data_date=start_date)
-
-    for ohlc_today in today_data:
-        ohlc_yesterday = yesterday_data.filter(stock=ohlc_today.stock)
-        first_candle = {
-            "open_price": float(ohlc_yesterday[0].open_price),
-            "close_price": float(ohlc_yesterday[0].close_price),
-            "high_price": float(ohlc_yesterday[0].high_price),
-            "low_price": float(ohlc_yesterday[0].low_price),
-        }
-        second_candle = {
-            "open_price": float(ohlc_today.open_price),
-            "close_price": float(ohlc_today.close_price),
-            "high_price": float(ohlc_today.high_price),
-            "low_price": float(ohlc_today.low_price),
-        }
-
-        if is_pro_gap_positive(first_candle=first_candle, second_candle=second_candle):
-            pro_gap_positive.append(
-                ProGapPositive(data_date=ohlc_today.data_date, stock=ohlc_today.stock)
-            )
-        if is_bullish_engulfing(first_candle=first_candle, second_candle=second_candle):
-            bullish_engulfing.append(
-                BullishEngulfing(data_date=ohlc_today.data_date, stock=ohlc_today.stock)
-            )
-        if is_bearish_engulfing(first_candle=first_candle, second_candle=second_candle):
-            bearish_engulfing.append(
-                BearishEngulfing(data_date=ohlc_today.data_date, stock=ohlc_today.stock)
-            )
-        if is_bullish_kicker(first_candle=first_candle, second_candle=second_candle):
-            bullish_kicker.append(
-                BullishKicker(data_date=ohlc_today.data_date, stock=ohlc_today.stock)
-            )
-        if is_bearish_kicker(first_candle=first_candle, second_candle=second_candle):
-            bearish_kicker.append(
-                BearishKicker(data_date=ohlc_today.data_date, stock=ohlc_today.stock)
-            )
-
-    if pro_gap_positive:
-        ProGapPositive.objects.bulk_create(pro_gap_positive, batch_size=100)
-    if bullish_engulfing:
-        BullishEngulfing.objects.bulk_create(bullish_engulfing, batch_size=100)
-    if bearish_engulfing:
-        BearishEngulfing.objects.bulk_create(bearish_engulfing, batch_size=100)
-    if bullish_kicker:
-        BullishKicker.objects.bulk_create(bullish_kicker, batch_size=100)
-    if bearish_kicker:
-        BearishKicker.objects.bulk_create(bearish_kicker, batch_size=100)
+    rows = list(
+        OHLCData.objects.filter(
+            data_date__gte=previous_session or start_date, data_date__lte=end_date
+        )
+        .order_by("stock_id", "data_date")
+        .values_list(
+            "stock_id",
+            "data_date",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price",
+        )
+    )
+    if len(rows) < 2:
+        return 0
+    stock_ids, dates, open_, high, low, close = zip(*rows)
+    stock_ids = np.array(stock_ids)
+    prices = [to_paise(column) for column in (open_, high, low, close)]
+
+    # candle i + 1 is paired with candle i when both belong to the same stock;
+    # pairs ending before the range were detected by an earlier refresh
+    selected = (stock_ids[1:] == stock_ids[:-1]) & np.array(
+        [data_date >= first_date for data_date in dates[1:]]
+    )
+    signals = double_candle_signals(
+        tuple(column[:-1] for column in prices), tuple(column[1:] for column in prices)
+    )
+    stored = store_pattern_signals(signals, stock_ids[1:], dates[1:], selected)
 
     logger.info("Double CandleStick data loading finished")
+    return stored
+
+
+def resolve_refresh_dates(start_date=None, end_date=None):
+    """
+    Resolves the sessions a refresh should fetch through the trading calendar.
+
+    The range is narrowed to its first and last sessions. Without an end date it
+    ends at the latest session whose candle is final, today's only after the market
+    close; without a start date it begins at the session after the latest stored
+    candle, so a refresh picks up exactly the missing sessions.
+
+    Args:
+        start_date (str, optional): The start date in 'YYYY-MM-DD' format.
+        end_date (str, optional): The end date in 'YYYY-MM-DD' format.
+
+    Returns:
+        tuple: (first session, last session) as 'YYYY-MM-DD' strings, or None when
+        the range holds no session.
+    """
+    calendar = get_trading_calendar()
+    if end_date:
+        end = calendar.session_on_or_before(end_date)
+    else:
+        now = timezone.localtime()
+        end = calendar.session_on_or_before(now.date())
+        if end == now.date() and now.time() < MARKET_CLOSE:
+            end = calendar.previous_session(end)
+
+    if start_date:
+        start = calendar.session_on_or_after(start_date)
+    else:
+        latest = (
+            OHLCData.objects.order_by("-data_date")
+            .values_list("data_date", flat=True)
+            .first()
+        )
+        start = calendar.next_session(latest) if latest else end
+
+    if start is None or end is None or start > end:
+        return None
+    return start.isoformat(), end.isoformat()
 
 
-def refresh_candlestick_data(start_date, end_date):
+def refresh_candlestick_data(start_date=None, end_date=None):
     """
     Fetches OHLC (Open, High, Low, Close) candlestick data for all stocks between the given dates
     using the Upstox API and stores them in the database.
 
+    The dates are resolved through the trading calendar first, see
+    resolve_refresh_dates(), and a range without any session makes no API call.
+
     Args:
-        start_date (str): The start date in 'YYYY-MM-DD' format.
-        end_date (str): The end date in 'YYYY-MM-DD' format.
+        start_date (str, optional): The start date in 'YYYY-MM-DD' format.
+        end_date (str, optional): The end date in 'YYYY-MM-DD' format.
 
     Returns:
-        str: "Success" if data was fetched and stored successfully, otherwise "Error".
+        str: "Success" if data was fetched and stored successfully, "No Sessions" if
+        the range holds no trading session, otherwise "Error".
     """
     logger = logging.getLogger("stock_screener_logger")
     try:
-        stocks = Stock.objects.all()
-        access_token = UpatoxAccessToken.objects.all()[0].token
+        sessions = resolve_refresh_dates(start_date, end_date)
+    except ValueError as e:
+        logger.error(f"Error : {e}")  # pylint: disable=W1203
+        return "Error"
+    if sessions is None:
+        logger.info(  # pylint: disable=W1203
+            f"No trading session between {start_date} and {end_date}, nothing fetched"
+        )
+        return "No Sessions"
+    start_date, end_date = sessions
+    progress = RefreshProgress(start_date=start_date, end_date=end_date)
+    try:
+        # one request proves the token valid before fanning out to every stock
+        access_token = get_access_token()
+        check_access_token(access_token)
 
         logger.info("OHLC Data fetch Starting..")
-        # Delete all old Data
-        OHLCData.objects.all().delete()
-
-        for stock in stocks:
-            # fetch data from upstox
-            url = f"https://api.upstox.com/v3/historical-candle/{stock.isin_code}/days/1/{end_date}/{start_date}"
-            headers = {"Accept": "application/json", "Authorization": access_token}
-            payload = {}
-            response = requests.get(url, headers=headers, data=payload, timeout=120)
-            response_data = response.json()
-
-            if response_data.get("status") == "success":
-                candle_data = response_data.get("data")
-                ohlc_objects = []
-
-                for ohlc in candle_data.get("candles"):
-                    ohlc_objects.append(
-                        OHLCData(
-                            data_date=datetime.fromisoformat(ohlc[0]).date(),
-                            open_price=ohlc[1],
-                            high_price=ohlc[2],
-                            low_price=ohlc[3],
-                            close_price=ohlc[4],
-                            stock=stock,
-                        )
-                    )
-                if ohlc_objects:
-                    # create ohlc data for two days in bulk
-                    OHLCData.objects.bulk_create(ohlc_objects, batch_size=100)
-                    logger.info(  # pylint: disable=W1203
-                        f"Data for {stock.symbol} fetched"
-                    )
-            # sleep half second in between
-            time.sleep(0.5)
+        progress.stage("fetch")
+        # split the stocks into shards that this process and any run_ingest_worker
+        # processes fetch in parallel; detection waits until all are written
+        progress.set_stocks_total(create_shards(progress.run))
+        ingest_run(progress.run, worker_name(), access_token, progress)
         logger.info("OHLC Data fetched Successfully")
+        # advance the indicators first so detection and screens can read them
+        progress.stage("indicators")
+        update_indicators(start_date=start_date)
         # make candle stck pattern and store it.
-        identify_single_candle_pattern()
-        identify_double_candle_pattern(start_date=start_date, end_date=end_date)
-        return "Success"
+        progress.stage("single_candle_patterns")
+        progress.found_patterns(
+            identify_single_candle_pattern(start_date=start_date, end_date=end_date)
+        )
+        progress.stage("double_candle_patterns")
+        progress.found_patterns(
+            identify_double_candle_pattern(start_date=start_date, end_date=end_date)
+        )
+        progress.stage("timeframes")
+        update_timeframes(start_date=start_date, end_date=end_date)
+        progress.stage("sector_breadth")
+        update_sector_breadth(start_date=start_date, end_date=end_date)
+        progress.stage("publish")
+        update_pattern_summary(start_date=start_date, end_date=end_date)
+        # publish the new results, invalidating every cached pattern page
+        bump_data_generation()
     except Exception as e:  # pylint: disable=W0718
         logger.error(f"Error : {e}", exc_info=True)  # pylint: disable=W1203
+        progress.finish("Error", message=str(e))
         return "Error"
+    try:
+        # bring the history bitsets and shape matrix up to date, and precompute the
+        # screener's index and the backtest of the new generation; the data is
+        # already published, and an index left behind is rebuilt on its next read
+        update_bitset_index(start_date=start_date, end_date=end_date)
+        get_pattern_index()
+        update_shape_index(start_date=start_date, end_date=end_date)
+        get_backtest()
+    except Exception as e:  # pylint: disable=W0718
+        logger.warning(  # pylint: disable=W1203
+            f"Indexes not updated : {e}", exc_info=True
+        )
+    progress.finish("Success")
+    return "Success"
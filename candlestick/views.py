@@ -1,20 +1,33 @@
 """
 Module: views.py
 
-Handles stock-related views including uploading stock data, refreshing OHLC candlestick data, and
-managing Upstox authentication for a Django-based stock screener application.
+Handles stock-related views including uploading stock data, refreshing OHLC candlestick data and
+streaming its progress, and managing Upstox authentication for a Django-based stock screener application.
 """
 
 import csv
+import hashlib
 import io
 import logging
+from datetime import date
+from functools import wraps
 
 import requests
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from django.http import HttpResponseRedirect
-from django.shortcuts import redirect, render
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.middleware.csrf import get_token
+from django.shortcuts import aget_object_or_404, redirect, render
 from django.urls import reverse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import condition
 from rest_framework import parsers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -24,27 +37,43 @@ from stock_screener.settings import (
     CLIENT_ID,
     CLIENT_SECRET,
     REDIRCT_URL,
+    UPSTOX_API_URL,
 )
 
-from .models import (
-    BearishEngulfing,
-    BearishKicker,
-    BullishEngulfing,
-    BullishKicker,
-    Doji,
-    Hammer,
-    InvertedHammer,
-    ProGapPositive,
-    SpinningTopBottom,
-    Stock,
-    UpatoxAccessToken,
+from .breadth import update_sector_breadth
+from .caching import (
+    aget_data_generation,
+    bump_data_generation,
+    cache_per_generation,
+    generation_etag,
+    generation_last_modified,
+    with_data_generation,
+)
+from .exports import (
+    EXPORT_FORMATS,
+    OHLC_HEADER,
+    PATTERN_HEADER,
+    aencode_rows,
+    aohlc_rows,
+    apattern_rows,
+    encode_rows,
+    ohlc_rows,
+    pattern_rows,
 )
-from .utils import refresh_candlestick_data
+from .models import Stock
+from .patterns import PAGE_SIZE, PATTERNS, aseek_page, get_pattern_queryset
+from .progress import arefresh_event_stream, refresh_event_stream
+from .scheduler import start_refresh
+from .summary import acached_pattern_overview, update_pattern_summary
+from .timeframes import TIMEFRAMES
+from .tokens import save_token
+from .utils import resolve_refresh_dates
 
 
-def home_view(request):
+async def home_view(request):
     """
-    Renders the homepage.
+    Renders the homepage with the number of pattern matches on the latest session,
+    read from the overview cached per data generation.
 
     Args:
         request (HttpRequest): The HTTP request object.
@@ -52,59 +81,140 @@ def home_view(request):
     Returns:
         HttpResponse: Rendered home.html page.
     """
-    return render(request=request, template_name="home.html")
+    generation = (await aget_data_generation(request))[0]
+    overview = await acached_pattern_overview(generation, sessions=1)
+    return render(
+        request=request,
+        template_name="home.html",
+        context={"date": overview["date"], "total": overview["total"]},
+    )
+
+
+def pop_refresh_result(view_func):
+    """
+    Decorator for the async patterns index moving a pending refresh result from the
+    session onto the request, before condition() evaluates the ETag functions.
+    """
+
+    @wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        request.refresh_result = None
+        if request.method == "GET":
+            request.refresh_result = await request.session.apop("result", None)
+        return await view_func(request, *args, **kwargs)
+
+    return wrapped
+
+
+def patterns_index_etag(request):
+    """
+    ETag of the patterns index, skipped while a refresh result message is pending
+    so the browser does not revalidate away the one-off toast.
+
+    The page embeds a CSRF token that is only valid with the client's CSRF secret,
+    so the ETag carries a digest of the secret as well as the data generation: a
+    client whose secret changed gets a fresh page instead of a 304.
+    """
+    if request.refresh_result:
+        return None
+    get_token(request)
+    secret = hashlib.sha256(request.META["CSRF_COOKIE"].encode()).hexdigest()[:16]
+    return f"{generation_etag(request)}-{secret}"
 
 
 @csrf_protect
-def candlestickpatterns_view(request):
+@cache_control(no_cache=True)
+@with_data_generation
+@pop_refresh_result
+# no Last-Modified: a client revalidating on the date alone would reuse the
+# page's CSRF token after its secret changed
+@condition(etag_func=patterns_index_etag)
+async def candlestickpatterns_view(request):
     """
     Handles GET and POST requests for the candlestick patterns page.
-    On POST, triggers data fetching from Upstox API and displays status messages via session.
+    On POST, starts fetching data from the Upstox API in the background and displays
+    status messages via session; the page then follows the refresh progress.
 
     Args:
         request (HttpRequest): The HTTP request object.
 
     Returns:
-        HttpResponse: Rendered patterns.html page with patterns and result message.
+        HttpResponse: Rendered patterns.html page with each pattern's latest match count,
+        5-session average and sector breakdown, and the result message.
     """
-    patterns = [
-        {"name": "Hammer", "uri": "Hammer-Page"},
-        {"name": "Inverted Hammer", "uri": "Inverted-Hammer-Page"},
-        {"name": "Doji", "uri": "Doji-Page"},
-        {"name": "Spinning Top Bottom", "uri": "Spinning-Top-Bottom-Page"},
-        {"name": "Pro Gap Positive", "uri": "Pro-Gap-Page"},
-        {"name": "Bullish Kicker", "uri": "Bullish-Kicker-Page"},
-        {"name": "Bullish Engulfing", "uri": "Bullish-Engulfing-Page"},
-        {"name": "Bearish Kicker", "uri": "Bearish-Kicker-Page"},
-        {"name": "Bearish Engulfing", "uri": "Bearish-Engulfing-Page"},
-    ]
     if request.method == "POST":
-        start_date = request.POST.get("start_date")
-        end_date = request.POST.get("end_date")
+        # empty dates are resolved through the trading calendar: from the session
+        # after the latest stored candle to the latest closed session
+        start_date = request.POST.get("start_date", "").strip() or None
+        end_date = request.POST.get("end_date", "").strip() or None
 
-        if start_date and end_date:
-            if start_date.strip() and end_date.strip():
-                result = refresh_candlestick_data(
-                    start_date=start_date, end_date=end_date
-                )
-                # Store result in session temporarily
-                request.session["result"] = result
-                return redirect(reverse("CandleStick"))
+        try:
+            sessions = await sync_to_async(resolve_refresh_dates)(
+                start_date=start_date, end_date=end_date
+            )
+        except ValueError:
+            result = "Error"
+        else:
+            if sessions is None:
+                result = "No Sessions"
+            # the refresh runs in the background, the page follows its progress
+            elif await sync_to_async(start_refresh)(*sessions):
+                result = "Started"
+            else:
+                result = "Running"
+        # Store result in session temporarily
+        await request.session.aset("result", result)
+        return redirect(reverse("CandleStick"))
 
     # This is the GET section — safely renders the page
-    result = request.session.pop("result", None)
+    overview = await acached_pattern_overview(request.data_generation[0])
+    result = request.refresh_result
     message = None
     if result:
-        message = (
-            "Data Fetched Successfully!!"
-            if result == "Success"
-            else "Something went wrong!!"
-        )
+        message = {
+            "Started": "Data refresh started.",
+            "Running": "A data refresh is already running.",
+            "No Sessions": "No trading session in the selected dates.",
+        }.get(result, "Something went wrong!!")
 
     return render(
         request=request,
         template_name="patterns.html",
-        context={"patterns": patterns, "result": result, "message": message},
+        context={
+            "patterns": overview["patterns"],
+            "date": overview["date"],
+            "result": result,
+            "message": message,
+            "refreshing": result in ("Started", "Running"),
+        },
+    )
+
+
+async def refresh_events_view(request):
+    """
+    Streams the progress of the running data refresh as Server-Sent Events.
+
+    Events carry the current stage, stocks fetched and failed, per-stage timings and
+    patterns found so far. Under ASGI (stock_screener/asgi.py) the stream is an async
+    generator that holds no worker thread; under WSGI it is a sync generator, which
+    the server sends chunk by chunk but which occupies a thread while open.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: text/event-stream response.
+    """
+    # either server type buffers a generator of the other kind to the end
+    stream = (
+        arefresh_event_stream()
+        if isinstance(request, ASGIRequest)
+        else refresh_event_stream()
+    )
+    return StreamingHttpResponse(
+        stream,
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -118,7 +228,7 @@ def upstox_authentication_view(request):
     Returns:
         HttpResponseRedirect: Redirect to Upstox login page.
     """
-    url = f"https://api.upstox.com/v2/login/authorization/dialog?client_id={CLIENT_ID}&redirect_uri={REDIRCT_URL}"
+    url = f"{UPSTOX_API_URL}/v2/login/authorization/dialog?client_id={CLIENT_ID}&redirect_uri={REDIRCT_URL}"
     return HttpResponseRedirect(url)
 
 
@@ -182,6 +292,10 @@ class UploadStockDataView(APIView):
                         }
                     )
                 logger.info("Stock(Nifty 500) Data Uploded Successfully")
+                # the candles and patterns went with the old stocks, rebuild the analytics
+                transaction.on_commit(update_pattern_summary)
+                transaction.on_commit(update_sector_breadth)
+                transaction.on_commit(bump_data_generation)
                 return Response(
                     {
                         "Status": "Success",
@@ -226,157 +340,226 @@ def upstox_authentication_success(request):
     )
     access_token = response.json().get("access_token")
 
-    UpatoxAccessToken.objects.create(token=access_token)
+    save_token(access_token)
     return render(request=request, template_name="success.html")
 
 
-def hammer_view(request):
+@with_data_generation
+@condition(etag_func=generation_etag, last_modified_func=generation_last_modified)
+@cache_per_generation("pattern-list")
+async def pattern_list_view(request, pattern):
     """
-    View to display all Hammer candlestick patterns.
+    View to display the stocks matching one candlestick pattern.
 
-    Retrieves all Hammer instances from the database and renders them
-    using the 'hammers.html' template. Passes the patterns and a result flag to the template.
-    """
-    hammers = Hammer.objects.all()
+    Serves every pattern page from the PATTERNS registry. Rows are loaded together with
+    their stock in one query, filtered by sector and date in the database, and paged
+    newest first with keyset pagination driven by the 'after' query parameter.
+    With sort=strength the page shows the PAGE_SIZE strongest matches instead, read
+    from the strength index, and volume=confirmed keeps the volume-confirmed matches.
+    timeframe=week or month lists the matches on the weekly or monthly candles.
+    Responses are cached and ETagged per data generation, and the queries run on
+    the async ORM.
 
-    return render(
-        request=request,
-        template_name="hammers.html",
-        context={"hammers": hammers, "result": len(hammers) > 0},
-    )
-
-
-def inverted_hammer_view(request):
-    """
-    View to display all Inverted Hammer candlestick patterns.
+    Args:
+        request (HttpRequest): The HTTP request object.
+        pattern (str): Pattern slug, a key of PATTERNS.
 
-    Retrieves all InvertedHammer instances from the database and renders them
-    using the 'invertedhammers.html' template.
+    Returns:
+        HttpResponse: Rendered patternlist.html page.
     """
-    hammers = InvertedHammer.objects.all()
+    if pattern not in PATTERNS:
+        raise Http404("Unknown candlestick pattern")
+
+    sector = request.GET.get("sector", "").strip()
+    data_date = request.GET.get("date", "").strip()
+    try:
+        data_date = date.fromisoformat(data_date) if data_date else None
+    except ValueError:
+        data_date = None
+
+    sort = "strength" if request.GET.get("sort") == "strength" else "date"
+    confirmed = request.GET.get("volume") == "confirmed"
+    timeframe = request.GET.get("timeframe", "day")
+    if timeframe not in TIMEFRAMES:
+        timeframe = "day"
+    queryset = get_pattern_queryset(
+        pattern,
+        sector=sector,
+        data_date=data_date,
+        sort=sort,
+        confirmed=confirmed,
+        timeframe=timeframe,
+    )
+    if sort == "strength":
+        rows = [row async for row in queryset[:PAGE_SIZE].aiterator()]
+        next_cursor = None
+    else:
+        rows, next_cursor = await aseek_page(queryset, cursor=request.GET.get("after"))
+    sectors = [
+        name
+        async for name in Stock.objects.order_by("sector")
+        .values_list("sector", flat=True)
+        .distinct()
+    ]
 
     return render(
         request=request,
-        template_name="invertedhammers.html",
-        context={"hammers": hammers, "result": len(hammers) > 0},
+        template_name="patternlist.html",
+        context={
+            "pattern": PATTERNS[pattern],
+            "rows": rows,
+            "result": len(rows) > 0,
+            "sectors": sectors,
+            "sector": sector,
+            "date": data_date,
+            "sort": sort,
+            "confirmed": confirmed,
+            "timeframe": timeframe,
+            "timeframes": TIMEFRAMES,
+            "next_cursor": next_cursor,
+            "is_first_page": not request.GET.get("after"),
+        },
     )
 
 
-def doji_view(request):
+async def stock_detail_view(request, stock_id):
     """
-    View to display all Doji candlestick patterns.
-
-    Retrieves all Doji instances and renders them in the 'doji.html' template.
-    """
-    dojis = Doji.objects.all()
-
-    return render(
-        request=request,
-        template_name="doji.html",
-        context={"dojis": dojis, "result": len(dojis) > 0},
-    )
+    View to display one stock's candle chart with its detected patterns.
 
+    The page only renders the stock; the chart fetches its downsampled series from
+    the API-Stock-Chart endpoint at the width it is drawn.
 
-def spinning_top_bottom_view(request):
-    """
-    View to display all Spinning Top and Bottom candlestick patterns.
+    Args:
+        request (HttpRequest): The HTTP request object.
+        stock_id (int): Stock to display.
 
-    Fetches all SpinningTopBottom instances and renders them using the 'spinningtopbottom.html' template.
+    Returns:
+        HttpResponse: Rendered stockdetail.html page.
     """
-    spinning_top_bottoms = SpinningTopBottom.objects.all()
-
+    stock = await aget_object_or_404(Stock, id=stock_id)
     return render(
         request=request,
-        template_name="spinningtopbottom.html",
-        context={
-            "spinning_top_bottoms": spinning_top_bottoms,
-            "result": len(spinning_top_bottoms) > 0,
-        },
+        template_name="stockdetail.html",
+        context={"stock": stock},
     )
 
 
-def pro_gap_positive_view(request):
+def parse_export_params(request):
     """
-    View to display all Pro Gap Positive patterns.
+    Reads the format and date range parameters shared by the export views.
 
-    Fetches all ProGapPositive instances and renders them using the 'progaps.html' template.
-    """
-    pro_gaps = ProGapPositive.objects.all()
-
-    return render(
-        request=request,
-        template_name="progaps.html",
-        context={"pro_gaps": pro_gaps, "result": len(pro_gaps) > 0},
-    )
+    Args:
+        request (HttpRequest): The HTTP request object.
 
+    Returns:
+        tuple: (format, from date, to date).
 
-def bullish_engulfing_view(request):
+    Raises:
+        ValueError: If the format or a date is invalid.
     """
-    View to display all Bullish Engulfing candlestick patterns.
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    from_date = request.GET.get("from", "").strip()
+    to_date = request.GET.get("to", "").strip()
+    from_date = date.fromisoformat(from_date) if from_date else None
+    to_date = date.fromisoformat(to_date) if to_date else None
+    return export_format, from_date, to_date
 
-    Retrieves all BullishEngulfing instances and displays them via the 'bullishengulfing.html' template.
-    """
-    bullish_engulfings = BullishEngulfing.objects.all()
 
-    return render(
-        request=request,
-        template_name="bullishengulfing.html",
-        context={
-            "bullish_engulfings": bullish_engulfings,
-            "result": len(bullish_engulfings) > 0,
-        },
-    )
+def export_response(request, rows, header, export_format, filename):
+    """
+    Encodes export rows into a streaming attachment response.
 
+    Under ASGI the rows come from the async ORM and are encoded by an async
+    generator; under WSGI both are sync generators. Either server would otherwise
+    build the whole export before sending its first byte.
 
-def bearish_engulfing_view(request):
-    """
-    View to display all Bearish Engulfing candlestick patterns.
+    Args:
+        request (HttpRequest): The HTTP request object.
+        rows (tuple): (sync rows function, async rows function, keyword arguments).
+        header (tuple): Column names.
+        export_format (str): "csv" or "jsonl".
+        filename (str): Attachment name without extension.
 
-    Retrieves all BearishEngulfing instances and renders them using the 'bearishengulfing.html' template.
+    Returns:
+        StreamingHttpResponse: The export as a file attachment.
     """
-    bearish_engulfings = BearishEngulfing.objects.all()
-
-    return render(
-        request=request,
-        template_name="bearishengulfing.html",
-        context={
-            "bearish_engulfings": bearish_engulfings,
-            "result": len(bearish_engulfings) > 0,
+    sync_rows, async_rows, filters = rows
+    if isinstance(request, ASGIRequest):
+        chunks = aencode_rows(async_rows(**filters), header, export_format)
+    else:
+        chunks = encode_rows(sync_rows(**filters), header, export_format)
+    content_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingHttpResponse(
+        chunks,
+        content_type=content_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"'
         },
     )
 
 
-def bullish_kicker_view(request):
+async def export_patterns_view(request):
     """
-    View to display all Bullish Kicker candlestick patterns.
+    Streams pattern occurrences as CSV or JSON Lines.
 
-    Fetches all BullishKicker instances and renders them with the 'bullishkicker.html' template.
-    """
-    bullish_kickers = BullishKicker.objects.all()
+    Query parameters: pattern (repeatable, default all), sector, from, to and
+    format ("csv" or "jsonl").
 
-    return render(
-        request=request,
-        template_name="bullishkicker.html",
-        context={
-            "bullish_kickers": bullish_kickers,
-            "result": len(bullish_kickers) > 0,
-        },
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The export as a file attachment.
+    """
+    patterns = request.GET.getlist("pattern")
+    if any(pattern not in PATTERNS for pattern in patterns):
+        raise Http404("Unknown candlestick pattern")
+    try:
+        export_format, from_date, to_date = parse_export_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    filters = {
+        "patterns": patterns,
+        "sector": request.GET.get("sector"),
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+    return export_response(
+        request,
+        (pattern_rows, apattern_rows, filters),
+        PATTERN_HEADER,
+        export_format,
+        "patterns",
     )
 
 
-def bearish_kicker_view(request):
+async def export_ohlc_view(request):
     """
-    View to display all Bearish Kicker candlestick patterns.
+    Streams OHLC history as CSV or JSON Lines.
 
-    Fetches all BearishKicker instances and renders them with the 'bearishkicker.html' template.
-    """
-    bearish_kickers = BearishKicker.objects.all()
+    Query parameters: symbol (repeatable, default every stock), sector, from, to
+    and format ("csv" or "jsonl").
 
-    return render(
-        request=request,
-        template_name="bearishkicker.html",
-        context={
-            "bearish_kickers": bearish_kickers,
-            "result": len(bearish_kickers) > 0,
-        },
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The export as a file attachment.
+    """
+    try:
+        export_format, from_date, to_date = parse_export_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    filters = {
+        "symbols": request.GET.getlist("symbol"),
+        "sector": request.GET.get("sector"),
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+    return export_response(
+        request, (ohlc_rows, aohlc_rows, filters), OHLC_HEADER, export_format, "ohlc"
     )
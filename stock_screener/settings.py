@@ -91,6 +91,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Pattern pages are cached per data generation. Local memory is used by default;
+# set CACHE_DIR to share a file-based cache between worker processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "stock-screener",
+        "TIMEOUT": 60 * 60 * 24,
+    }
+}
+if os.getenv("CACHE_DIR"):
+    CACHES["default"]["BACKEND"] = "django.core.cache.backends.filebased.FileBasedCache"
+    CACHES["default"]["LOCATION"] = os.getenv("CACHE_DIR")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,9 +156,22 @@ os.makedirs(LOGGING_DIR, exist_ok=True)
 LOGGING_CONFIG = None
 logging.config.dictConfig(LOGGING)
 
+# Derived data files (indexes rebuilt from the database when missing); the directory
+# is created by the code writing the files
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "stock_screener_data"))
+PATTERN_BITSET_INDEX_PATH = os.path.join(DATA_DIR, "pattern_bitsets.json.gz")
+SHAPE_INDEX_PATH = os.path.join(DATA_DIR, "shape_index.npz")
+# recorded tick / 1-minute feed replayed by the stream_intraday command
+INTRADAY_REPLAY_PATH = os.getenv(
+    "INTRADAY_REPLAY_PATH", os.path.join(DATA_DIR, "intraday_replay.csv")
+)
+
 
 # Upstox Credentials
 REDIRCT_URL = os.getenv("REDIRCT_URL")
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 ACCESS_TOKEN_URL = os.getenv("ACCESS_TOKEN_URL")
+# base URL of the Upstox API; point it (and ACCESS_TOKEN_URL) at the server of
+# `python manage.py run_fake_upstox` to ingest offline from synthetic data
+UPSTOX_API_URL = os.getenv("UPSTOX_API_URL", "https://api.upstox.com")